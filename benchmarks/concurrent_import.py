@@ -0,0 +1,115 @@
+"""
+Measure the total wall time of many processes concurrently importing the same already built extension.
+
+Holding the build lock exclusively while checking whether the extension is up to date is compared against holding it
+in shared mode, which lets the importers proceed in parallel.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import multiprocessing
+import multiprocessing.queues
+import multiprocessing.synchronize
+import pathlib
+import statistics
+import tempfile
+import time
+import unittest.mock
+from typing import TYPE_CHECKING, Any, Literal
+
+import torch  # noqa: F401
+
+import charonload
+from charonload._finder import _build_lock, _load
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from charonload import ResolvedConfig
+
+PROJECT_DIRECTORY = pathlib.Path(__file__).parents[1] / "tests" / "data" / "torch_cpu"
+MODULE_NAME = "benchmark_concurrent_import"
+
+
+def _importer(
+    build_directory: str,
+    lock_mode: Literal["shared", "exclusive"],
+    barrier: multiprocessing.synchronize.Barrier,
+    timings: multiprocessing.queues.Queue[tuple[float, float]],
+) -> None:
+    if lock_mode == "exclusive":
+
+        @contextlib.contextmanager
+        def _exclusive_build_lock(module_name: str, config: ResolvedConfig, **_: Any) -> Iterator[None]:  # noqa: ANN401
+            with _build_lock(module_name, config, mode="write"):
+                yield
+
+        unittest.mock.patch("charonload._finder._build_lock", _exclusive_build_lock).start()
+
+    charonload.module_config[MODULE_NAME] = charonload.Config(PROJECT_DIRECTORY, build_directory)
+    config = charonload.module_config[MODULE_NAME]
+
+    barrier.wait()
+    t_start = time.perf_counter()
+    _load(MODULE_NAME, config)
+    t_end = time.perf_counter()
+    timings.put((t_start, t_end))
+
+
+def _run(build_directory: str, lock_mode: Literal["shared", "exclusive"], num_importers: int) -> tuple[float, float]:
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(num_importers)
+    timings: multiprocessing.queues.Queue[tuple[float, float]] = context.Queue()
+
+    processes = [
+        context.Process(target=_importer, args=(build_directory, lock_mode, barrier, timings))
+        for _ in range(num_importers)
+    ]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+        if p.exitcode != 0:
+            msg = f"Importer process failed with exit code {p.exitcode}"
+            raise RuntimeError(msg)
+    results = [timings.get() for _ in processes]
+
+    wall_time = max(t_end for _, t_end in results) - min(t_start for t_start, _ in results)
+    latency = statistics.median(t_end - t_start for t_start, t_end in results)
+    return 1000.0 * wall_time, 1000.0 * latency
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--importers", type=int, default=32)
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as build_directory:
+        charonload.module_config[MODULE_NAME] = charonload.Config(PROJECT_DIRECTORY, build_directory)
+
+        print("Cold build ...")
+        t_start = time.perf_counter()
+        _load(MODULE_NAME, charonload.module_config[MODULE_NAME])
+        t_end = time.perf_counter()
+        print(f"Cold build ... done. ({t_end - t_start:.1f}s)")
+
+        lock_modes: list[Literal["shared", "exclusive"]] = ["exclusive", "shared"]
+        results = {
+            lock_mode: [_run(build_directory, lock_mode, args.importers) for _ in range(args.repetitions)]
+            for lock_mode in lock_modes
+        }
+
+    print()
+    print(f"{args.importers} concurrent importers")
+    print(f"{'':<16} {'wall time [ms]':>16} {'median latency [ms]':>20}")
+    for lock_mode, timings in results.items():
+        wall_time = statistics.median(t[0] for t in timings)
+        latency = statistics.median(t[1] for t in timings)
+        print(f"{lock_mode + ' lock':<16} {wall_time:>16.2f} {latency:>20.2f}")
+
+
+if __name__ == "__main__":
+    main()
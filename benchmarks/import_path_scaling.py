@@ -0,0 +1,175 @@
+"""
+Measure how the number of imported JIT compiled extensions affects later imports.
+
+Previously, every JIT compiled extension appended its build directory to ``sys.path`` and left the actual import to
+the built-in finders, so every later lookup of an unrelated module had to check one more directory. Now, the extension
+is loaded via its own spec using :class:`importlib.machinery.ExtensionFileLoader` and ``sys.path`` stays untouched.
+
+This benchmark registers ``N + 1`` extensions in :data:`charonload.module_config`, imports ``N`` of them through
+:class:`charonload.JITCompileFinder`, and then times the import of unrelated modules as well as of the remaining
+extension. Each measurement runs in a fresh interpreter, once with the former behavior emulated by a finder which
+appends the build directory to ``sys.path`` and once with the current finder.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import torch  # noqa: F401
+
+import charonload
+from charonload._finder import _load
+
+PROJECT_DIRECTORY = pathlib.Path(__file__).parents[1] / "tests" / "data" / "torch_cpu"
+
+MODULE_PREFIX = "benchmark_import_path_scaling"
+
+# Pure Python modules of the standard library that are looked up via sys.path, similar to what torch does when
+# importing its submodules
+UNRELATED_MODULE_NAMES = [
+    "calendar",
+    "cmd",
+    "configparser",
+    "csv",
+    "difflib",
+    "filecmp",
+    "fractions",
+    "ftplib",
+    "getopt",
+    "gettext",
+    "imaplib",
+    "mailbox",
+    "netrc",
+    "optparse",
+    "pdb",
+    "plistlib",
+    "poplib",
+    "pprint",
+    "sched",
+    "smtplib",
+    "statistics",
+    "tabnanny",
+    "timeit",
+    "trace",
+    "wave",
+    "zipapp",
+]
+
+
+def _module_names(num_extensions: int) -> list[str]:
+    return [f"{MODULE_PREFIX}_{i}" for i in range(num_extensions)]
+
+
+def _register(num_extensions: int, build_root: pathlib.Path) -> None:
+    for name in _module_names(num_extensions):
+        charonload.module_config[name] = charonload.Config(PROJECT_DIRECTORY, build_root / name)
+
+
+def _use_appending_finder() -> None:
+    class _AppendingJITCompileFinder(charonload.JITCompileFinder):
+        """The former finder which made the build directory importable via ``sys.path``."""
+
+        def find_spec(self, fullname, path, target=None) -> None:  # type: ignore[no-untyped-def]  # noqa: ANN001, ARG002
+            # The built-in finders import the extension from the appended directory afterwards
+            if fullname in charonload.module_config:
+                full_extension_path = _load(fullname, charonload.module_config[fullname])
+                sys.path.append(str(full_extension_path.parent))
+
+    sys.meta_path[:] = [
+        _AppendingJITCompileFinder() if isinstance(f, charonload.JITCompileFinder) else f for f in sys.meta_path
+    ]
+
+
+def _worker(approach: str, num_extensions: int, build_root: pathlib.Path) -> None:
+    _register(num_extensions + 1, build_root)
+    if approach == "sys.path":
+        _use_appending_finder()
+
+    *imported_names, measured_name = _module_names(num_extensions + 1)
+    for name in imported_names:
+        importlib.import_module(name)
+
+    unrelated_names = [name for name in UNRELATED_MODULE_NAMES if name not in sys.modules]
+
+    t_start = time.perf_counter()
+    for name in unrelated_names:
+        importlib.import_module(name)
+    t_unrelated = time.perf_counter()
+    importlib.import_module(measured_name)
+    t_end = time.perf_counter()
+
+    result = {
+        "sys_path_entries": len(sys.path),
+        "unrelated_ms": 1000.0 * (t_unrelated - t_start),
+        "extension_ms": 1000.0 * (t_end - t_unrelated),
+    }
+    print(json.dumps(result))
+
+
+def _measure(approach: str, num_extensions: int, build_root: pathlib.Path, repetitions: int) -> dict[str, float]:
+    results = []
+    for _ in range(repetitions):
+        process = subprocess.run(
+            [sys.executable, __file__, "--worker", approach, str(num_extensions), str(build_root)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        results.append(json.loads(process.stdout.splitlines()[-1]))
+
+    return {key: statistics.median(r[key] for r in results) for key in results[0]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--extensions", type=int, nargs="+", default=[0, 5, 10, 20])
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument(
+        "--build-directory",
+        type=pathlib.Path,
+        default=None,
+        help="Directory keeping the builds of the extensions across runs. Defaults to a temporary directory.",
+    )
+    parser.add_argument(
+        "--worker", nargs=3, metavar=("APPROACH", "EXTENSIONS", "BUILD_DIRECTORY"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        approach, num_extensions, build_root = args.worker
+        _worker(approach, int(num_extensions), pathlib.Path(build_root))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_directory:
+        build_root = args.build_directory if args.build_directory is not None else pathlib.Path(tmp_directory)
+
+        max_extensions = max(args.extensions) + 1
+        print(f"Building {max_extensions} extensions ...")
+        t_start = time.perf_counter()
+        _register(max_extensions, build_root)
+        charonload.build_all(_module_names(max_extensions))
+        t_end = time.perf_counter()
+        print(f"Building {max_extensions} extensions ... done. ({t_end - t_start:.1f}s)")
+        print()
+
+        header = ["extensions", "approach", "sys.path entries", "unrelated [ms]", "extension [ms]"]
+        print(" ".join(f"{h:>{w}}" for h, w in zip(header, [10, 20, 18, 16, 16], strict=True)))
+        for num_extensions in args.extensions:
+            for approach in ["sys.path", "ExtensionFileLoader"]:
+                r = _measure(approach, num_extensions, build_root, args.repetitions)
+                print(
+                    f"{num_extensions:>10} {approach:>20} {r['sys_path_entries']:>18.0f} {r['unrelated_ms']:>16.2f} "
+                    f"{r['extension_ms']:>16.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Measure the throughput of forwarding the output of a subprocess to the console.
+
+A child process writes synthetic compiler output which is forwarded to a null device, once with the previous
+character-wise reading and once with the chunked output pump of charonload.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import IO
+
+from charonload._runner import _PipedProcess, _pump_output
+
+GENERATOR = """
+import sys
+
+line = (
+    b"/usr/include/c++/13/bits/stl_vector.h:1125:7: warning: 'void f(const at::Tensor&)' declared but never "
+    b"defined [-Wunused-function]\\n"
+)
+remaining = int(sys.argv[1])
+while remaining > 0:
+    chunk = line * min(1024, remaining // len(line) + 1)
+    sys.stdout.buffer.write(chunk[:remaining])
+    remaining -= len(chunk)
+sys.stdout.flush()
+"""
+
+
+def _per_character(command_args: list[str], output_streams: list[IO[str]]) -> None:
+    with subprocess.Popen(command_args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, encoding="utf-8") as p:
+        assert p.stdout is not None  # noqa: S101
+        while output_line := p.stdout.read(1):
+            for o in output_streams:
+                o.write(output_line)
+                o.flush()
+
+
+def _chunked(command_args: list[str], output_streams: list[IO[str]]) -> None:
+    with _PipedProcess(command_args) as p:
+        _pump_output(process=p, encoding="utf-8", output_streams=output_streams)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--megabytes", type=int, default=100)
+    args = parser.parse_args()
+
+    num_bytes = args.megabytes * 1024 * 1024
+    command_args = [sys.executable, "-c", GENERATOR, str(num_bytes)]
+
+    print(f"{'':<16} {'time [s]':>12} {'throughput [MB/s]':>18}")
+    with open(os.devnull, "w") as devnull:  # noqa: PTH123
+        for name, pump in [("per character", _per_character), ("chunked", _chunked)]:
+            t_start = time.perf_counter()
+            pump(command_args, [devnull])
+            t_end = time.perf_counter()
+            print(f"{name:<16} {t_end - t_start:>12.2f} {args.megabytes / (t_end - t_start):>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
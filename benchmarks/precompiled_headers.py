@@ -0,0 +1,112 @@
+"""
+Measure the cold build time of an extension with many translation units including the Torch headers.
+
+A synthetic project is built once with the Torch headers parsed in every translation unit and once with a shared
+precompiled header via the ``PRECOMPILE_TORCH_HEADERS`` option of ``charonload_add_torch_library``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import tempfile
+
+import torch  # noqa: F401
+
+import charonload
+from charonload._finder import _load
+
+CMAKE_LISTS = """
+cmake_minimum_required(VERSION 3.27)
+
+project(benchmark_precompiled_headers LANGUAGES CXX)
+
+option(PRECOMPILE_TORCH_HEADERS "Use a precompiled header of the Torch headers" OFF)
+
+find_package(charonload)
+
+if(charonload_FOUND)
+    if(PRECOMPILE_TORCH_HEADERS)
+        charonload_add_torch_library(${TORCH_EXTENSION_NAME} MODULE PRECOMPILE_TORCH_HEADERS)
+    else()
+        charonload_add_torch_library(${TORCH_EXTENSION_NAME} MODULE)
+    endif()
+
+    file(GLOB SOURCES CONFIGURE_DEPENDS "${CMAKE_CURRENT_SOURCE_DIR}/*.cpp")
+    target_sources(${TORCH_EXTENSION_NAME} PRIVATE ${SOURCES})
+endif()
+"""
+
+TRANSLATION_UNIT = """
+#include <torch/extension.h>
+
+at::Tensor
+add_{i}(const at::Tensor& input)
+{{
+    return input + {i};
+}}
+"""
+
+BINDINGS = """
+#include <torch/extension.h>
+
+{declarations}
+
+PYBIND11_MODULE(TORCH_EXTENSION_NAME, m)
+{{
+{definitions}
+}}
+"""
+
+
+def _write_project(project_directory: pathlib.Path, translation_units: int) -> None:
+    (project_directory / "CMakeLists.txt").write_text(CMAKE_LISTS)
+    for i in range(translation_units):
+        (project_directory / f"add_{i}.cpp").write_text(TRANSLATION_UNIT.format(i=i))
+
+    (project_directory / "bindings.cpp").write_text(
+        BINDINGS.format(
+            declarations="\n".join(f"at::Tensor add_{i}(const at::Tensor& input);" for i in range(translation_units)),
+            definitions="\n".join(f'    m.def("add_{i}", &add_{i});' for i in range(translation_units)),
+        )
+    )
+
+
+def _build_time(project_directory: pathlib.Path, build_directory: pathlib.Path, *, precompile: bool) -> float:
+    module_name = f"benchmark_precompiled_headers_{'on' if precompile else 'off'}"
+    charonload.module_config[module_name] = charonload.Config(
+        project_directory,
+        build_directory,
+        cmake_options={"PRECOMPILE_TORCH_HEADERS": "ON" if precompile else "OFF"},
+        artifact_cache=False,
+    )
+
+    charonload.span_recorder.clear()
+    _load(module_name, charonload.module_config[module_name])
+
+    return sum(s.wall_time for s in charonload.span_recorder.spans if s.name == "Build")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--translation-units", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        project_directory = pathlib.Path(directory) / "project"
+        project_directory.mkdir()
+        _write_project(project_directory, args.translation_units)
+
+        results = {
+            name: _build_time(project_directory, pathlib.Path(directory) / f"build_{name}", precompile=precompile)
+            for name, precompile in [("no pch", False), ("shared pch", True)]
+        }
+
+    print(f"{args.translation_units} translation units")
+    print(f"{'':<16} {'build time [s]':>16}")
+    for name, build_time in results.items():
+        print(f"{name:<16} {build_time:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Measure the throughput of the remote artifact cache against a local stand-in HTTP cache server.
+
+Artifact entries of different sizes are uploaded and downloaded repeatedly, once with pooled keep-alive connections and
+once with a new connection for every request.
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.server
+import pathlib
+import shutil
+import tempfile
+import threading
+import time
+
+from charonload._artifact_cache import _ArtifactCache
+from charonload._remote_cache import _RemoteArtifactCache
+
+
+class _CacheRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    blobs: dict[str, bytes] = {}  # noqa: RUF012
+
+    def do_GET(self: _CacheRequestHandler) -> None:
+        blob = self.blobs.get(self.path, b"")
+        self.send_response(200 if blob else 404)
+        self.send_header("Content-Length", str(len(blob)))
+        self.end_headers()
+        self.wfile.write(blob)
+
+    def do_PUT(self: _CacheRequestHandler) -> None:
+        self.blobs[self.path] = self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self: _CacheRequestHandler, *args: object) -> None:
+        pass
+
+
+def _write_entry(artifact_cache: _ArtifactCache, key: str, size: int) -> None:
+    entry_directory = artifact_cache.directory / key
+    entry_directory.mkdir(parents=True)
+    (entry_directory / "test.so").write_bytes((bytes(range(256)) * (size // 256 + 1))[:size])
+    (entry_directory / "entry.json").write_text(
+        '{"module_name": "test", "extension": "test.so", "stubs": [], "windows_dll_directories": "", '
+        '"external_files": {}}'
+    )
+
+
+def _throughput(url: str, directory: pathlib.Path, size: int, repetitions: int, *, pooled: bool) -> tuple[float, float]:
+    artifact_cache = _ArtifactCache(2**40, directory=directory / "artifacts")
+    remote_artifact_cache = _RemoteArtifactCache(url)
+    remote_artifact_cache.pool.close()
+    remote_artifact_cache.pool.max_idle_connections = 4 if pooled else 0
+
+    keys = [f"{'pooled' if pooled else 'unpooled'}_{size}_{i}" for i in range(repetitions)]
+    for key in keys:
+        _write_entry(artifact_cache, key, size)
+
+    start = time.perf_counter()
+    for key in keys:
+        remote_artifact_cache.push(key, artifact_cache).result()
+    upload_time = time.perf_counter() - start
+
+    shutil.rmtree(artifact_cache.directory)
+
+    start = time.perf_counter()
+    for key in keys:
+        remote_artifact_cache.fetch(key, artifact_cache)
+    download_time = time.perf_counter() - start
+
+    total_size = size * repetitions / 1024**2
+    return total_size / upload_time, total_size / download_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64 * 1024, 4 * 1024**2, 64 * 1024**2])
+    parser.add_argument("--repetitions", type=int, default=10)
+    args = parser.parse_args()
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _CacheRequestHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    print(f"{'size [KiB]':>12} {'connections':>12} {'upload [MiB/s]':>16} {'download [MiB/s]':>18}")
+    try:
+        for size in args.sizes:
+            for pooled in [False, True]:
+                with tempfile.TemporaryDirectory() as directory:
+                    upload, download = _throughput(url, pathlib.Path(directory), size, args.repetitions, pooled=pooled)
+                connections = "pooled" if pooled else "per request"
+                print(f"{size // 1024:>12} {connections:>12} {upload:>16.1f} {download:>18.1f}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Measure the full build time of the test projects with and without unity builds.
+
+Each project in ``tests/data`` is built from scratch once with the default per-source compilation and once with the
+``unity_build`` option of :class:`charonload.Config`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import tempfile
+
+import torch  # noqa: F401
+
+import charonload
+from charonload._finder import _load
+
+DATA_DIRECTORY = pathlib.Path(__file__).parents[1] / "tests" / "data"
+
+# Projects which build successfully without CUDA and without further options
+DEFAULT_PROJECTS = [
+    "torch_cpu",
+    "torch_common_shared",
+    "torch_common_static",
+    "torch_cxx11_abi",
+    "torch_pic",
+    "torch_precompiled_headers",
+    "torch_subdirectory",
+    "torch_unity",
+]
+
+
+def _build_time(project: str, build_directory: pathlib.Path, *, unity_build: bool, batch_size: int) -> float:
+    module_name = f"benchmark_unity_build_{project}_{'on' if unity_build else 'off'}"
+    charonload.module_config[module_name] = charonload.Config(
+        DATA_DIRECTORY / project,
+        build_directory,
+        unity_build=unity_build,
+        unity_build_batch_size=batch_size,
+        artifact_cache=False,
+    )
+
+    charonload.span_recorder.clear()
+    _load(module_name, charonload.module_config[module_name])
+
+    return sum(s.wall_time for s in charonload.span_recorder.spans if s.name == "Build")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--projects", nargs="+", default=DEFAULT_PROJECTS)
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'project':<28} {'no unity [s]':>14} {'unity [s]':>14} {'speedup':>10}")
+    total_times = [0.0, 0.0]
+    for project in args.projects:
+        with tempfile.TemporaryDirectory() as directory:
+            build_times = [
+                _build_time(
+                    project,
+                    pathlib.Path(directory) / f"build_{unity_build}",
+                    unity_build=unity_build,
+                    batch_size=args.batch_size,
+                )
+                for unity_build in [False, True]
+            ]
+
+        total_times = [t + b for t, b in zip(total_times, build_times, strict=True)]
+        print(f"{project:<28} {build_times[0]:>14.2f} {build_times[1]:>14.2f} {build_times[0] / build_times[1]:>9.2f}x")
+
+    print(f"{'total':<28} {total_times[0]:>14.2f} {total_times[1]:>14.2f} {total_times[0] / total_times[1]:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
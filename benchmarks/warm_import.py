@@ -0,0 +1,76 @@
+"""
+Measure the latency of importing an already built extension.
+
+The full JIT compile pipeline (exclusive lock, clean check, CMake configure check, build, stub check) is compared
+against the fingerprint-based fast path of ``_load`` which only takes the build lock in shared mode and starts no
+subprocess.
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import statistics
+import tempfile
+import time
+from typing import TYPE_CHECKING
+
+import torch  # noqa: F401
+
+import charonload
+from charonload._finder import _build, _load
+from charonload._fingerprint import _BuildResultMarker, _FingerprintManifest
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+PROJECT_DIRECTORY = pathlib.Path(__file__).parents[1] / "tests" / "data" / "torch_cpu"
+
+
+def _measure_ms(func: Callable[[], object], repetitions: int) -> list[float]:
+    timings = []
+    for _ in range(repetitions):
+        t_start = time.perf_counter()
+        func()
+        t_end = time.perf_counter()
+        timings.append(1000.0 * (t_end - t_start))
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repetitions", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as build_directory:
+        module_name = "benchmark_warm_import"
+        charonload.module_config[module_name] = charonload.Config(PROJECT_DIRECTORY, build_directory)
+        config = charonload.module_config[module_name]
+
+        def pipeline() -> None:
+            # Force running all steps instead of taking the fast path or following a previous build
+            _FingerprintManifest(module_name, config).invalidate()
+            _build(module_name, config, _BuildResultMarker(config).generation())
+
+        print("Cold build ...")
+        t_start = time.perf_counter()
+        pipeline()
+        t_end = time.perf_counter()
+        print(f"Cold build ... done. ({t_end - t_start:.1f}s)")
+
+        full_pipeline = _measure_ms(pipeline, args.repetitions)
+
+        def fast_path() -> None:
+            # Including the shared build lock which is taken by every import
+            _load(module_name, config)
+
+        warm_import = _measure_ms(fast_path, args.repetitions)
+
+    print()
+    print(f"{'':<24} {'median [ms]':>12} {'min [ms]':>12} {'max [ms]':>12}")
+    for name, timings in [("full pipeline", full_pipeline), ("fingerprint fast path", warm_import)]:
+        print(f"{name:<24} {statistics.median(timings):>12.2f} {min(timings):>12.2f} {max(timings):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
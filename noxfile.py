@@ -9,7 +9,7 @@ nox.options.sessions = []
 @nox.session
 def format(session: nox.Session) -> None:  # noqa: A001
     """Format all source files to a consistent style."""
-    sources = ["src", "tests", "docs", "tools", "noxfile.py"]
+    sources = ["src", "tests", "docs", "tools", "benchmarks", "noxfile.py"]
     session.run("isort", *sources, external=True)
     session.run(
         "docformatter",
@@ -95,7 +95,7 @@ def docs_live(session: nox.Session) -> None:
 def lint(session: nox.Session) -> None:
     """Check the source code with linters."""
     failed = False
-    sources = ["src", "tests", "docs", "tools", "noxfile.py"]
+    sources = ["src", "tests", "docs", "tools", "benchmarks", "noxfile.py"]
     try:
         session.run("isort", "--check", *sources, external=True)
     except nox.command.CommandFailed:
@@ -174,6 +174,14 @@ def tests(session: nox.Session) -> None:
     session.run("pytest", external=True)
 
 
+@nox.session
+def benchmarks(session: nox.Session) -> None:
+    """Run the benchmarks. Specific benchmarks can be selected by passing their names, e.g. 'warm_import'."""
+    benchmark_names = session.posargs or sorted(f.stem for f in pathlib.Path("benchmarks").glob("[!_]*.py"))
+    for name in benchmark_names:
+        session.run("python", f"benchmarks/{name}.py", external=True)
+
+
 @nox.session
 def coverage(session: nox.Session) -> None:
     """Compute the code coverage based on the unit tests."""
@@ -32,6 +32,7 @@ del sys
 import email.utils
 import importlib.metadata
 
+from ._build_report import BuildReport, BuildReportEntry
 from ._config import Config, ConfigDict, ResolvedConfig
 from ._errors import (
     BuildError,
@@ -40,7 +41,16 @@ from ._errors import (
     JITCompileError,
     StubGenerationError,
 )
-from ._finder import JITCompileFinder, extension_finder, module_config
+from ._finder import (
+    JITCompileFinder,
+    abuild_all,
+    aload,
+    build_all,
+    build_history,
+    extension_finder,
+    module_config,
+)
+from ._telemetry import Span, SpanRecorder, span_recorder
 from ._version import _version
 
 __author__ = ", ".join(
@@ -54,6 +64,8 @@ __copyright__ = f"2024, {__author__}"
 
 __all__ = [
     "BuildError",
+    "BuildReport",
+    "BuildReportEntry",
     "CMakeConfigureError",
     "CommandNotFoundError",
     "Config",
@@ -61,7 +73,14 @@ __all__ = [
     "JITCompileError",
     "JITCompileFinder",
     "ResolvedConfig",
+    "Span",
+    "SpanRecorder",
     "StubGenerationError",
+    "abuild_all",
+    "aload",
+    "build_all",
+    "build_history",
     "extension_finder",
     "module_config",
+    "span_recorder",
 ]
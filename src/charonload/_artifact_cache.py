@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+import pathlib
+import platform
+import shutil
+import sys
+import sysconfig
+import tarfile
+import threading
+import uuid
+from typing import TYPE_CHECKING, Any
+
+import colorama
+
+from ._compat import hashlib
+from ._config import _user_directory
+from ._fingerprint import _read_json, _torch_version, _walk_files, _write_json_atomic
+from ._version import _version
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ._compat.typing import Self
+    from ._config import ResolvedConfig
+
+colorama.just_fix_windows_console()
+
+
+class _ArtifactKey:
+    """
+    Content-based digest of all inputs which determine the built extension.
+
+    In contrast to :class:`_FingerprintManifest <charonload._fingerprint._FingerprintManifest>`, the digest does not
+    depend on the location of the project, the build directory, or the Python environment, but hashes the full content
+    of the files. Hence, it is only computed when the extension would be built anyway.
+    """
+
+    def __init__(self: Self, module_name: str, config: ResolvedConfig) -> None:
+        self.module_name = module_name
+        self.config = config
+
+    def compute(self: Self) -> str:
+        hasher = hashlib.sha256()
+        hasher.update(json.dumps(self._metadata(), sort_keys=True).encode())
+
+        for root_name, root, files in self._input_files():
+            for file in files:
+                hasher.update(f"{root_name}/{file.relative_to(root).as_posix()}\0".encode())
+                hasher.update(_file_digest(file).encode())
+
+        return hasher.hexdigest()
+
+    def _metadata(self: Self) -> dict[str, Any]:
+        # Locations and flags that do not influence the resulting artifact are excluded
+        config = dataclasses.asdict(self.config)
+        for k in [
+            "full_project_directory",
+            "full_build_directory",
+            "full_stubs_directory",
+            "clean_build",
+            "stubs_invalid_ok",
+            "verbose",
+            "max_build_jobs",
+            "compiler_cache",
+            "compiler_cache_max_size",
+            "artifact_cache",
+            "artifact_cache_max_size",
+            "remote_artifact_cache",
+        ]:
+            config.pop(k, None)
+
+        return {
+            "module_name": self.module_name,
+            "config": {k: str(v) for k, v in config.items()},
+            "python_abi": sysconfig.get_config_var("EXT_SUFFIX"),
+            "platform": [platform.system(), platform.machine()],
+            "torch_version": _torch_version(),
+            "charonload_version": _version(),
+            "toolchain": _toolchain(),
+        }
+
+    def _input_files(self: Self) -> list[tuple[str, pathlib.Path, list[pathlib.Path]]]:
+        excluded_directories = [self.config.full_build_directory]
+        if self.config.full_stubs_directory is not None:
+            excluded_directories.append(self.config.full_stubs_directory)
+
+        cmake_directory = pathlib.Path(__file__).parent / "cmake"
+        return [
+            (
+                "project",
+                self.config.full_project_directory,
+                list(_walk_files(self.config.full_project_directory, excluded_directories=excluded_directories)),
+            ),
+            ("charonload", cmake_directory, list(_walk_files(cmake_directory, excluded_directories=[]))),
+        ]
+
+
+class _ArtifactCache:
+    """
+    Local content-addressed store of built extensions and their stubs with a least-recently-used size limit.
+
+    Each entry is a directory named by its :class:`_ArtifactKey` which contains the extension, the generated stubs, and
+    an ``entry.json`` file. The modification time of the latter tracks the last usage.
+    """
+
+    def __init__(self: Self, max_size: int, *, directory: pathlib.Path | None = None) -> None:
+        self.max_size = max_size
+        self.directory = directory if directory is not None else _user_directory() / "artifacts"
+
+    def restore(
+        self: Self, key: str, module_name: str, config: ResolvedConfig
+    ) -> tuple[pathlib.Path, list[pathlib.Path]] | None:
+        """Place the cached extension and stubs for ``key`` and return the extension path and external files."""
+        entry_directory = self.directory / key
+        entry = _read_json(entry_directory / "entry.json")
+        if entry is None or entry["module_name"] != module_name:
+            return None
+
+        # Sources outside of the project are not part of the key, so check that they have not changed since
+        external_files = {pathlib.Path(f): digest for f, digest in entry["external_files"].items()}
+        if any(not f.exists() or _file_digest(f) != digest for f, digest in external_files.items()):
+            return None
+
+        if config.full_stubs_directory is not None and not entry["stubs"]:
+            return None
+
+        location_directory = config.full_build_directory / "charonload" / config.build_type
+        full_extension_path = location_directory / "artifact" / entry["extension"]
+        try:
+            full_extension_path.parent.mkdir(parents=True, exist_ok=True)
+            _copy_atomic(entry_directory / entry["extension"], full_extension_path)
+
+            if config.full_stubs_directory is not None:
+                config.full_stubs_directory.mkdir(parents=True, exist_ok=True)
+                for stub in entry["stubs"]:
+                    _copy(entry_directory / "stubs" / stub, config.full_stubs_directory / stub)
+        except OSError:  # Evicted by another process in the meantime
+            return None
+
+        (location_directory / "location.txt").write_text(full_extension_path.as_posix())
+        (location_directory / "windows_dll_directories.txt").write_text(entry["windows_dll_directories"])
+
+        (entry_directory / "entry.json").touch(exist_ok=True)
+
+        if config.verbose:
+            print(  # noqa: T201
+                f"[charonload] {colorama.Fore.GREEN}{colorama.Style.BRIGHT}Restored:{colorama.Style.NORMAL} "
+                f'"{full_extension_path.as_posix()}" from artifact cache{colorama.Style.RESET_ALL}'
+            )
+
+        return full_extension_path, sorted(external_files)
+
+    def store(
+        self: Self,
+        key: str,
+        module_name: str,
+        config: ResolvedConfig,
+        *,
+        full_extension_path: pathlib.Path,
+        windows_dll_directories: str,
+        external_files: list[pathlib.Path],
+    ) -> bool:
+        """Add the built extension to the store and return whether it could be cached."""
+        if (self.directory / key).exists() or not _is_self_contained(config, full_extension_path):
+            return False
+
+        stubs = []
+        if config.full_stubs_directory is not None:
+            stubs = [
+                p.name
+                for p in [config.full_stubs_directory / module_name, config.full_stubs_directory / f"{module_name}.pyi"]
+                if p.exists()
+            ]
+
+        # Assemble the entry in a temporary directory to never expose incomplete entries
+        tmp_directory = self.directory / f".{key}.{os.getpid()}.{threading.get_ident()}.{uuid.uuid4().hex}.tmp"
+        try:
+            tmp_directory.mkdir(parents=True)
+            shutil.copy2(full_extension_path, tmp_directory / full_extension_path.name)
+            for stub in stubs:
+                _copy(config.full_stubs_directory / stub, tmp_directory / "stubs" / stub)  # type: ignore[operator]
+
+            _write_json_atomic(
+                tmp_directory / "entry.json",
+                {
+                    "module_name": module_name,
+                    "extension": full_extension_path.name,
+                    "stubs": stubs,
+                    "windows_dll_directories": windows_dll_directories,
+                    "external_files": {f.as_posix(): _file_digest(f) for f in external_files if f.exists()},
+                },
+            )
+
+            tmp_directory.rename(self.directory / key)
+        except OSError:  # Stored by another process in the meantime
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+            return False
+
+        self.evict()
+        return True
+
+    def export_entry(self: Self, key: str, archive: pathlib.Path) -> bool:
+        """Write the entry for ``key`` into the tar file ``archive`` and return whether the entry exists."""
+        entry_directory = self.directory / key
+        try:
+            with tarfile.open(archive, "w") as tar:
+                tar.add(entry_directory, arcname=".")
+        except OSError:  # Evicted by another process in the meantime
+            return False
+        return True
+
+    def import_entry(self: Self, key: str, archive: pathlib.Path) -> bool:
+        """Add the entry contained in the tar file ``archive`` as ``key`` and return whether it could be added."""
+        if (self.directory / key).exists():
+            return True
+
+        tmp_directory = self.directory / f".{key}.{os.getpid()}.{threading.get_ident()}.{uuid.uuid4().hex}.tmp"
+        try:
+            _extract_archive(archive, tmp_directory)
+            if _read_json(tmp_directory / "entry.json") is None:
+                shutil.rmtree(tmp_directory, ignore_errors=True)
+                return False
+
+            tmp_directory.rename(self.directory / key)
+        except (OSError, tarfile.TarError):  # Invalid archive or stored by another process in the meantime
+            shutil.rmtree(tmp_directory, ignore_errors=True)
+            return (self.directory / key).exists()
+
+        self.evict()
+        return True
+
+    def evict(self: Self) -> None:
+        """Remove the least recently used entries until the total size is within the limit."""
+        entries = []
+        for entry_directory in self.directory.iterdir() if self.directory.exists() else []:
+            try:
+                last_used = (entry_directory / "entry.json").stat().st_mtime
+            except OSError:  # Temporary or incomplete entry
+                continue
+            size = sum(f.stat().st_size for f in entry_directory.rglob("*") if f.is_file())
+            entries.append((last_used, size, entry_directory))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, entry_directory in sorted(entries):
+            if total_size <= self.max_size:
+                break
+
+            # Rename first, so concurrent readers never see partially removed entries
+            trash_directory = entry_directory.with_name(f".{entry_directory.name}.{uuid.uuid4().hex}.tmp")
+            try:
+                entry_directory.rename(trash_directory)
+            except OSError:
+                continue
+            shutil.rmtree(trash_directory, ignore_errors=True)
+            total_size -= size
+
+
+def _is_self_contained(config: ResolvedConfig, full_extension_path: pathlib.Path) -> bool:
+    # Extensions may load further shared libraries from their build directory which are not part of the artifact
+    shared_library_suffixes = {".so", ".dylib", ".dll"}
+    return not any(
+        f != full_extension_path and (f.suffix in shared_library_suffixes or ".so." in f.name)
+        for f in config.full_build_directory.rglob("*")
+        if f.is_file() and not f.is_relative_to(config.full_build_directory / "charonload")
+    )
+
+
+def _copy(source: pathlib.Path, destination: pathlib.Path) -> None:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    if source.is_dir():
+        shutil.copytree(source, destination, dirs_exist_ok=True)
+    else:
+        shutil.copy2(source, destination)
+
+
+def _copy_atomic(source: pathlib.Path, destination: pathlib.Path) -> None:
+    # Replace instead of overwriting in-place, since other processes may have mapped the previous file into memory
+    tmp_destination = destination.with_name(f".{destination.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        shutil.copy2(source, tmp_destination)
+        tmp_destination.replace(destination)
+    finally:
+        tmp_destination.unlink(missing_ok=True)
+
+
+def _extract_archive(archive: pathlib.Path, directory: pathlib.Path) -> None:
+    with tarfile.open(archive, "r") as tar:
+        members = tar.getmembers()
+
+        # Archives may come from remote sources, so only accept plain files and directories inside the target
+        for member in members:
+            path = pathlib.PurePosixPath(member.name)
+            if not (member.isfile() or member.isdir()) or path.is_absolute() or ".." in path.parts:
+                msg = f'Unexpected member "{member.name}" in artifact archive'
+                raise tarfile.TarError(msg)
+
+        directory.mkdir(parents=True)
+        if hasattr(tarfile, "data_filter"):
+            tar.extractall(directory, members=members, filter="data")
+        else:  # pragma: no cover
+            tar.extractall(directory, members=members)  # noqa: S202
+
+
+def _file_digest(file: pathlib.Path) -> str:
+    with file.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _toolchain() -> dict[str, Any]:
+    tools = [os.environ.get("CXX", "c++"), os.environ.get("CUDACXX", "nvcc"), "cmake", "ninja"]
+
+    identities: dict[str, str | None] = {}
+    for tool in tools:
+        if (executable := shutil.which(tool)) is None:
+            identities[tool] = None
+            continue
+
+        # Identify the tool by its resolved location and file stats instead of running it
+        real_executable = pathlib.Path(executable).resolve()
+        stat = real_executable.stat()
+        identities[tool] = f"{real_executable.as_posix()}\0{stat.st_size}\0{stat.st_mtime_ns}"
+
+    environment_variables = [
+        "CC",
+        "CFLAGS",
+        "CXXFLAGS",
+        "CUDAFLAGS",
+        "LDFLAGS",
+        "CUDA_HOME",
+        "CUDA_PATH",
+        "TORCH_CUDA_ARCH_LIST",
+    ]
+    return {
+        "tools": identities,
+        "environment": {k: os.environ.get(k) for k in environment_variables},
+        "python_version": sys.version,
+    }
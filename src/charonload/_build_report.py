@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import os
+import pathlib
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import colorama
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ._compat.typing import Self
+    from ._config import ResolvedConfig
+
+colorama.just_fix_windows_console()
+
+
+@dataclass
+class BuildReportEntry:
+    """Timing of a single edge of the native build, e.g. compiling a translation unit or linking the extension."""
+
+    output: str
+    """The path of the generated file relative to the build directory."""
+
+    source: str | None
+    """The absolute path of the compiled source file, or ``None`` if the edge does not compile a translation unit."""
+
+    kind: str
+    """The kind of the edge, i.e. ``"compile"``, ``"link"``, or ``"other"``."""
+
+    start_time: float
+    """The start of the edge in seconds relative to the start of the build tool."""
+
+    duration: float
+    """The elapsed wall time of the edge in seconds."""
+
+
+@dataclass
+class BuildReport:
+    """Per-translation-unit timing report of a single build of an extension, obtained from the log of Ninja."""
+
+    module_name: str
+    """The name of the extension."""
+
+    timestamp: float
+    """The time when the build finished in seconds since the epoch."""
+
+    wall_time: float
+    """The elapsed wall time of all recorded edges in seconds."""
+
+    compile_time: float
+    """The accumulated time of all compile edges in seconds."""
+
+    link_time: float
+    """The accumulated time of all link edges in seconds."""
+
+    entries: list[BuildReportEntry]
+    """All edges executed during the build, ranked by their duration in descending order."""
+
+    critical_path: list[BuildReportEntry]
+    """
+    The estimated chain of edges that determined the wall time, in the order of their execution.
+
+    Since the log does not contain the dependency graph, the chain is estimated by repeatedly going back from an edge
+    to the edge that finished last before it started.
+    """
+
+    compiler_cache_hits: int | None = None
+    """
+    The number of compilations served by the compiler cache, or ``None`` if no compiler cache has been used.
+
+    The statistics of the shared cache directory are compared before and after the build, so concurrent builds using
+    the same compiler cache may also be included.
+    """
+
+    compiler_cache_misses: int | None = None
+    """The number of compilations missed by the compiler cache, or ``None`` if no compiler cache has been used."""
+
+    @property
+    def critical_path_time(self: Self) -> float:
+        """The accumulated time of the edges on the critical path in seconds."""
+        return sum(e.duration for e in self.critical_path)
+
+    @classmethod
+    def _from_dict(cls: type[Self], d: dict[str, Any]) -> Self:
+        return cls(
+            **{
+                **d,
+                "entries": [BuildReportEntry(**e) for e in d["entries"]],
+                "critical_path": [BuildReportEntry(**e) for e in d["critical_path"]],
+            }
+        )
+
+
+@dataclass(frozen=True)
+class _NinjaLogPosition:
+    inode: int
+    size: int
+    lines: frozenset[str]
+    """The edge lines of the log, to recognize the entries which Ninja carries over when recompacting it."""
+
+
+class _NinjaLog:
+    """Reader of the ``.ninja_log`` file which is able to only return the edges appended after a certain position."""
+
+    def __init__(self: Self, build_directory: pathlib.Path) -> None:
+        self.path = build_directory / ".ninja_log"
+
+    def position(self: Self) -> _NinjaLogPosition | None:
+        try:
+            content, inode = self._read()
+        except OSError:
+            return None
+        return _NinjaLogPosition(inode, len(content), frozenset(_edge_lines(content)))
+
+    def read_since(self: Self, position: _NinjaLogPosition | None) -> list[tuple[int, int, str]]:
+        """Read all edges as ``(start_ms, end_ms, output)`` which have been added after ``position``."""
+        try:
+            content, inode = self._read()
+        except OSError:
+            return []
+
+        lines = _edge_lines(content)
+        if position is not None:
+            if inode == position.inode and len(content) >= position.size:
+                lines = _edge_lines(content[position.size :])
+            else:
+                # Ninja occasionally recompacts the log into a new and usually smaller file, which keeps the latest
+                # entry of each output from previous builds unchanged, so only lines unknown at the position are new
+                lines = [line for line in lines if line not in position.lines]
+
+        edges: dict[str, tuple[int, int, str]] = {}
+        for line in lines:
+            fields = line.split("\t")
+            min_number_fields = 4
+            if len(fields) < min_number_fields:
+                continue
+
+            try:
+                start_ms, end_ms = int(fields[0]), int(fields[1])
+            except ValueError:
+                continue
+
+            # Later entries of the same output supersede earlier ones
+            edges[fields[3]] = (start_ms, end_ms, fields[3])
+
+        return list(edges.values())
+
+    def _read(self: Self) -> tuple[bytes, int]:
+        with self.path.open("rb") as f:
+            return f.read(), os.fstat(f.fileno()).st_ino
+
+
+def _edge_lines(content: bytes) -> list[str]:
+    lines = content.decode("utf-8", errors="replace").splitlines()
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+class _BuildHistory:
+    """Persistent list of the most recent build reports of an extension."""
+
+    max_reports = 50
+
+    def __init__(self: Self, config: ResolvedConfig) -> None:
+        self.path = config.full_build_directory / "charonload" / config.build_type / "build_history.jsonl"
+
+    def load(self: Self) -> list[BuildReport]:
+        try:
+            lines = self.path.read_text().splitlines()
+        except OSError:
+            return []
+
+        reports = []
+        for line in lines:
+            try:
+                reports.append(BuildReport._from_dict(json.loads(line)))  # noqa: SLF001
+            except (ValueError, TypeError, KeyError):  # noqa: PERF203
+                continue
+        return reports
+
+    def append(self: Self, report: BuildReport) -> None:
+        reports = [*self.load(), report][-self.max_reports :]
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with tmp_path.open("w") as f:
+            f.writelines(json.dumps(dataclasses.asdict(r)) + "\n" for r in reports)
+        tmp_path.replace(self.path)
+
+
+def _create_build_report(
+    module_name: str,
+    config: ResolvedConfig,
+    edges: list[tuple[int, int, str]],
+    *,
+    compiler_cache_stats: tuple[int, int] | None = None,
+) -> BuildReport | None:
+    if not edges:
+        return None
+
+    sources = _compiled_sources(config.full_build_directory)
+    link_suffixes = {".so", ".pyd", ".dll", ".dylib", ".a", ".lib", ".exe"}
+
+    entries = []
+    for start_ms, end_ms, output in edges:
+        source = sources.get(output)
+        if source is not None:
+            kind = "compile"
+        elif pathlib.PurePath(output).suffix in link_suffixes:
+            kind = "link"
+        else:
+            kind = "other"
+
+        entries.append(
+            BuildReportEntry(
+                output=output,
+                source=source,
+                kind=kind,
+                start_time=start_ms / 1000.0,
+                duration=(end_ms - start_ms) / 1000.0,
+            )
+        )
+
+    entries.sort(key=lambda e: e.duration, reverse=True)
+
+    return BuildReport(
+        module_name=module_name,
+        timestamp=time.time(),
+        wall_time=max(e.start_time + e.duration for e in entries) - min(e.start_time for e in entries),
+        compile_time=sum(e.duration for e in entries if e.kind == "compile"),
+        link_time=sum(e.duration for e in entries if e.kind == "link"),
+        entries=entries,
+        critical_path=_critical_path(entries),
+        compiler_cache_hits=compiler_cache_stats[0] if compiler_cache_stats is not None else None,
+        compiler_cache_misses=compiler_cache_stats[1] if compiler_cache_stats is not None else None,
+    )
+
+
+def _compiled_sources(build_directory: pathlib.Path) -> dict[str, str]:
+    try:
+        with (build_directory / "compile_commands.json").open("r") as f:
+            compile_commands = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    sources = {}
+    for entry in compile_commands:
+        if "output" not in entry:
+            continue
+
+        directory = pathlib.Path(entry["directory"])
+        output = directory / entry["output"]
+        if output.is_relative_to(build_directory):
+            sources[output.relative_to(build_directory).as_posix()] = (directory / entry["file"]).as_posix()
+
+    return sources
+
+
+def _critical_path(entries: list[BuildReportEntry]) -> list[BuildReportEntry]:
+    def _end(e: BuildReportEntry) -> float:
+        return e.start_time + e.duration
+
+    def _key(e: BuildReportEntry) -> tuple[float, float]:
+        # Among edges ending at the same time, prefer actual work over zero-duration edges, e.g. phony ones
+        return _end(e), e.duration
+
+    path = [max(entries, key=_key)]
+    while predecessors := [e for e in entries if e is not path[-1] and _end(e) <= path[-1].start_time]:
+        predecessor = max(predecessors, key=_key)
+
+        # Zero-duration edges may precede each other, so only follow strictly earlier ends to terminate
+        if _end(predecessor) >= _end(path[-1]):
+            break
+        path.append(predecessor)
+
+    return path[::-1]
+
+
+def _print_build_report(report: BuildReport, previous_report: BuildReport | None, *, max_entries: int = 10) -> None:
+    previous_durations = {e.output: e.duration for e in previous_report.entries} if previous_report is not None else {}
+
+    summary = (
+        f"wall {report.wall_time:.1f}s, compile {report.compile_time:.1f}s, link {report.link_time:.1f}s, "
+        f"critical path {report.critical_path_time:.1f}s"
+    )
+    if report.compiler_cache_hits is not None and report.compiler_cache_misses is not None:
+        summary += f", compiler cache {report.compiler_cache_hits} hits / {report.compiler_cache_misses} misses"
+    reset = colorama.Style.RESET_ALL
+    lines = [
+        f"{colorama.Fore.GREEN}{colorama.Style.BRIGHT}Build report:{colorama.Style.NORMAL} {summary}{reset}",
+        f"    {'time [s]':>10} {'change [s]':>10}  {'kind':<8} file",
+    ]
+    for e in report.entries[:max_entries]:
+        change = f"{e.duration - previous_durations[e.output]:+.2f}" if e.output in previous_durations else "-"
+        lines.append(f"    {e.duration:>10.2f} {change:>10}  {e.kind:<8} {e.source or e.output}")
+
+    print("\n".join(f"[charonload] {line}" for line in lines))  # noqa: T201
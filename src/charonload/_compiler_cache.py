@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import shutil
+import subprocess
+import warnings
+from typing import TYPE_CHECKING
+
+from ._config import _user_directory
+from ._errors import CommandNotFoundError
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ._compat.typing import Self
+    from ._config import ResolvedConfig
+
+
+class _CompilerCache:
+    """
+    Compiler launcher like ccache or sccache using a cache directory which is shared by all charonload builds.
+
+    The settings of the tool are passed via environment variables that are baked into the launcher command of CMake, so
+    the builds do not depend on the environment of the calling process and never touch the user's own cache.
+    """
+
+    supported_tools = ("ccache", "sccache")
+
+    def __init__(self: Self, tool: str, executable: str, config: ResolvedConfig) -> None:
+        self.tool = tool
+        self.executable = executable
+        self.directory = _user_directory() / "compiler_cache" / tool
+        self.max_size = config.compiler_cache_max_size
+        self.base_directory = _base_directory(config.full_project_directory)
+
+    @classmethod
+    def find(cls: type[Self], config: ResolvedConfig) -> Self | None:
+        if config.compiler_cache is None:
+            return None
+
+        tools = cls.supported_tools if config.compiler_cache == "auto" else (config.compiler_cache,)
+        for tool in tools:
+            if (executable := shutil.which(tool)) is not None:
+                return cls(tool, pathlib.Path(executable).as_posix(), config)
+
+        if config.compiler_cache == "auto":
+            return None
+
+        raise CommandNotFoundError(config.compiler_cache)
+
+    def environment(self: Self) -> dict[str, str]:
+        if self.tool == "ccache":
+            environment = {
+                "CCACHE_DIR": self.directory.as_posix(),
+                "CCACHE_MAXSIZE": self.max_size,
+                # JIT build directories are frequently recreated, e.g. in new temporary directories or by clean builds,
+                # so their paths should neither end up in the hashes nor in the compile commands
+                "CCACHE_NOHASHDIR": "1",
+            }
+            if self.base_directory is not None:
+                environment["CCACHE_BASEDIR"] = self.base_directory.as_posix()
+            return environment
+
+        # The sccache server picks these up when it is started by the first compile job, but an already running server
+        # ignores them
+        return {
+            "SCCACHE_DIR": self.directory.as_posix(),
+            "SCCACHE_CACHE_SIZE": self.max_size,
+        }
+
+    def launcher(self: Self) -> list[str]:
+        # A missing CMake is reported when running the configure command
+        cmake_executable = shutil.which("cmake") or "cmake"
+
+        return [
+            pathlib.Path(cmake_executable).as_posix(),
+            "-E",
+            "env",
+            *[f"{k}={v}" for k, v in self.environment().items()],
+            self.executable,
+        ]
+
+    def stats(self: Self) -> tuple[int, int] | None:
+        """Query the total number of cache hits and misses, or ``None`` if the statistics are not available."""
+        command_args = (
+            [self.executable, "--print-stats"]
+            if self.tool == "ccache"
+            else [self.executable, "--show-stats", "--stats-format=json"]
+        )
+        try:
+            result = subprocess.run(  # noqa: S603
+                command_args,
+                capture_output=True,
+                check=True,
+                encoding="utf-8",
+                env={**os.environ, **self.environment()},
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+        if self.tool == "ccache":
+            return _parse_ccache_stats(result.stdout)
+
+        self._warn_if_foreign_sccache_server(result.stdout)
+        return _parse_sccache_stats(result.stdout)
+
+    def _warn_if_foreign_sccache_server(self: Self, stats_output: str) -> None:
+        cache_location = _parse_sccache_cache_location(stats_output)
+        if cache_location is None or self.directory.as_posix() in cache_location:
+            return
+
+        if cache_location not in _warned_sccache_cache_locations:
+            _warned_sccache_cache_locations.add(cache_location)
+            msg = (
+                f"[charonload] The running sccache server uses the cache {cache_location} instead of the one "
+                f'managed by charonload "{self.directory.as_posix()}", so the maximum size of the cache is not '
+                'applied. Stop the server via "sccache --stop-server" to let the next build start one with the '
+                "settings of charonload."
+            )
+            warnings.warn(msg, stacklevel=2)
+
+
+def _compiler_cache_stats_difference(
+    before: tuple[int, int] | None, after: tuple[int, int] | None
+) -> tuple[int, int] | None:
+    if before is None or after is None:
+        return None
+
+    # The statistics may have been reset in between, e.g. via "ccache --zero-stats"
+    return max(0, after[0] - before[0]), max(0, after[1] - before[1])
+
+
+def _base_directory(full_project_directory: pathlib.Path) -> pathlib.Path | None:
+    # The build directory is already excluded from the hashes via CCACHE_NOHASHDIR, so only the paths of the project
+    # need to be rewritten. A base directory at the root would rewrite the paths of all system headers as well.
+    return full_project_directory if full_project_directory.parent != full_project_directory else None
+
+
+def _parse_ccache_stats(output: str) -> tuple[int, int] | None:
+    counters = {}
+    for line in output.splitlines():
+        key, _, value = line.partition("\t")
+        if value.strip().isdigit():
+            counters[key.strip()] = int(value)
+
+    # Counter names of ccache 4.x and 3.x
+    hit_keys = ["direct_cache_hit", "preprocessed_cache_hit", "cache_hit_direct", "cache_hit_preprocessed"]
+    miss_keys = ["cache_miss"]
+    if not any(k in counters for k in [*hit_keys, *miss_keys]):
+        return None
+
+    return sum(counters.get(k, 0) for k in hit_keys), sum(counters.get(k, 0) for k in miss_keys)
+
+
+def _parse_sccache_stats(output: str) -> tuple[int, int] | None:
+    try:
+        stats = json.loads(output)["stats"]
+        return sum(stats["cache_hits"]["counts"].values()), sum(stats["cache_misses"]["counts"].values())
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _parse_sccache_cache_location(output: str) -> str | None:
+    try:
+        cache_location = json.loads(output)["cache_location"]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+    return cache_location if isinstance(cache_location, str) else None
+
+
+_warned_sccache_cache_locations: set[str] = set()
@@ -10,17 +10,23 @@ import site
 import sys
 import sysconfig
 import tempfile
+import urllib.parse
 from collections import UserDict
 from dataclasses import KW_ONLY, dataclass
 from typing import TYPE_CHECKING
 
 import colorama
 
+from ._cpu import _cpu_features, _is_x86_64, _resolve_cpu_target, _x86_64_level
+
 if TYPE_CHECKING:  # pragma: no cover
     from ._compat.typing import Self
 
 colorama.just_fix_windows_console()
 
+# Suffix of the build directory of the instrumented variant of pgo="generate"
+_PGO_GENERATE_SUFFIX = "_pgo_generate"
+
 
 @dataclass
 class Config:
@@ -94,6 +100,174 @@ class Config:
       :class:`ResolvedConfig`.
     """
 
+    max_build_jobs: int | None = None
+    """
+    The maximum number of compile jobs shared by all concurrent charonload builds of the current user on this machine.
+
+    Each build acquires job tokens from a machine-wide pool before compiling and passes the number of acquired tokens
+    to the build tool. If not specified, the number of CPU cores is used. Processes configured with different values
+    share a single pool whose size is defined by the process that used it first. Another value only takes effect once
+    no compile job of the pool is running anymore.
+
+    .. admonition:: Overrides
+      :class: important
+
+      If the environment variable ``CHARONLOAD_FORCE_MAX_BUILD_JOBS`` is set, it will replace this value in
+      :class:`ResolvedConfig`.
+    """
+
+    compiler_cache: str | None = None
+    """
+    The compiler cache to speed up rebuilds, i.e. ``"ccache"``, ``"sccache"``, or ``"auto"`` to use the first one found.
+
+    The tool is used as the compiler launcher with a cache directory managed by charonload, so even clean builds, e.g.
+    after updating ``torch``, can reuse the results of previous compilations. If ``"auto"`` is specified and no tool is
+    found, or if set to ``None``, no compiler cache is used.
+
+    The settings of sccache only take effect when charonload starts its server. A server which is already running, e.g.
+    started by another build, keeps its own cache directory and size, which is reported via a warning.
+
+    .. admonition:: Overrides
+      :class: important
+
+      If the environment variable ``CHARONLOAD_FORCE_COMPILER_CACHE`` is set, it will replace this value in
+      :class:`ResolvedConfig`. The value ``"none"`` disables the compiler cache.
+    """
+
+    compiler_cache_max_size: str = "5G"
+    """The maximum size of the cache directory of :attr:`compiler_cache` in the size format of the respective tool."""
+
+    linker: str | None = "auto"
+    """
+    The linker for targets created via :cmake:command:`charonload_add_torch_library`, i.e. ``"mold"``, ``"lld"``, or
+    ``"auto"`` to use the first one supported by the compiler.
+
+    Linking extensions with debug information using the default GNU linker may take a considerable amount of time,
+    which has to be paid on every rebuild. If ``"auto"`` is specified and neither mold nor lld is supported, or if set
+    to ``None``, the default linker of the compiler is used. The selected linker is shown in the verbose output.
+
+    .. admonition:: Overrides
+      :class: important
+
+      If the environment variable ``CHARONLOAD_FORCE_LINKER`` is set, it will replace this value in
+      :class:`ResolvedConfig`. The value ``"none"`` selects the default linker of the compiler.
+    """
+
+    split_debug_info: bool = True
+    """
+    Whether to split the debug information of targets created via :cmake:command:`charonload_add_torch_library` off
+    the extension in the ``Debug`` and ``RelWithDebInfo`` build types.
+
+    The sources are compiled with ``-gsplit-dwarf``, so the bulk of the debug information stays in ``.dwo`` files in
+    the build directory and the remaining debug sections are compressed by the linker. This keeps the extension small,
+    which speeds up linking, checksumming, and copying it, while debugging remains possible. Only supported by GCC and
+    Clang on Linux.
+
+    .. admonition:: Overrides
+      :class: important
+
+      If the environment variable ``CHARONLOAD_FORCE_SPLIT_DEBUG_INFO`` is set, it will replace this value in
+      :class:`ResolvedConfig`.
+    """
+
+    cpu_target: str | None = None
+    """
+    The CPU for which the extension is specialized, i.e. ``"native"`` for the host CPU or an explicit value of the
+    compiler option ``-march`` such as ``"x86-64-v3"``.
+
+    Each CPU target is built in its own directory ``<build directory>_cpu_<target>`` next to the build directory and
+    cached separately, so hosts with different CPUs sharing the build directory, e.g. via NFS, each import their own
+    variant without rebuilding or cleaning the others. ``"native"`` is resolved to the ISA feature level of the host,
+    e.g. the highest supported x86-64 microarchitecture level. Only supported by GCC and Clang. If set to ``None``, the
+    default target of the compiler is used.
+
+    .. admonition:: Overrides
+      :class: important
+
+      If the environment variable ``CHARONLOAD_FORCE_CPU_TARGET`` is set, it will replace this value in
+      :class:`ResolvedConfig`. The value ``"none"`` selects the default target of the compiler.
+    """
+
+    pgo: str | None = None
+    """
+    The mode of profile-guided optimization of targets created via :cmake:command:`charonload_add_torch_library`,
+    i.e. ``"generate"`` or ``"use"``.
+
+    With ``"generate"``, an instrumented variant of the extension is built in the directory
+    ``<build directory>_pgo_generate`` next to the build directory. Running a representative workload with it records
+    profiles, which are merged across runs. With ``"use"``, the extension is built in the build directory and optimized
+    using the recorded profiles. The profiles are keyed by the content of the project and the build options, so any
+    change invalidates them and the workload needs to be run again. Only supported by GCC and Clang. If set to
+    ``None``, no profile-guided optimization is performed.
+
+    .. admonition:: Overrides
+      :class: important
+
+      If the environment variable ``CHARONLOAD_FORCE_PGO`` is set, it will replace this value in
+      :class:`ResolvedConfig`. The value ``"none"`` disables profile-guided optimization.
+    """
+
+    unity_build: bool = False
+    """
+    Whether to enable unity builds for all targets created via :cmake:command:`charonload_add_torch_library`.
+
+    Unity builds combine several C++ sources into a single translation unit, so the Torch headers are parsed less
+    often. This may significantly reduce the build time of extensions with many source files, but requires that the
+    sources do not define colliding internal symbols. CUDA sources are always compiled individually.
+
+    .. admonition:: Overrides
+      :class: important
+
+      If the environment variable ``CHARONLOAD_FORCE_UNITY_BUILD`` is set, it will replace this value in
+      :class:`ResolvedConfig`.
+    """
+
+    unity_build_batch_size: int = 8
+    """The number of C++ sources combined into a single translation unit if :attr:`unity_build` is enabled."""
+
+    artifact_cache: bool = True
+    """
+    Whether to reuse and store built extensions in a local artifact cache shared by all build directories of the user.
+
+    Artifacts are keyed by the content of the project, the build options, the toolchain, the ``torch`` version, and the
+    Python ABI. If a matching artifact exists, e.g. after moving the project or wiping the temporary build directory,
+    it is placed into the build directory directly and both the configuration and the build are skipped. Extensions
+    which depend on further shared libraries of their build directory are not cached.
+
+    .. admonition:: Overrides
+      :class: important
+
+      If the environment variable ``CHARONLOAD_FORCE_ARTIFACT_CACHE`` is set, it will replace this value in
+      :class:`ResolvedConfig`.
+    """
+
+    artifact_cache_max_size: int = 2 * 1024**3
+    """
+    The maximum total size in bytes of the artifact cache.
+
+    The least recently used artifacts are removed when the limit is exceeded.
+    """
+
+    remote_artifact_cache: str | None = None
+    """
+    The URL of an optional remote cache server that shares the artifacts of :attr:`artifact_cache` between machines.
+
+    The server needs to support the HTTP protocol of Bazel's remote caches, i.e. plain ``GET`` and ``PUT`` requests on
+    ``<url>/cas/<sha256>`` and ``<url>/ac/<key>``, e.g. ``bazel-remote`` or a WebDAV-enabled nginx. The archive of each
+    artifact is stored in the content-addressable store under its SHA-256 digest, which is verified before extracting
+    it, and referenced by an entry of the action cache under its key. Artifacts missing in the local artifact
+    cache are downloaded before configuring, and newly built artifacts are uploaded in the background. Pending uploads
+    delay the exit of the interpreter by at most 10 seconds. If the server is unavailable, the extension is built
+    locally. Credentials may be passed as part of the URL. The remote cache is only used if :attr:`artifact_cache` is
+    enabled.
+
+    .. admonition:: Overrides
+      :class: important
+
+      If the environment variable ``CHARONLOAD_FORCE_REMOTE_ARTIFACT_CACHE`` is set, it will replace this value in
+      :class:`ResolvedConfig`. The value ``"none"`` disables the remote cache.
+    """
+
 
 @dataclass
 class ResolvedConfig:
@@ -129,6 +303,42 @@ class ResolvedConfig:
     verbose: bool
     """Flag to enable printing the full log of the JIT compilation."""
 
+    max_build_jobs: int
+    """The maximum number of compile jobs shared by all concurrent builds on this machine."""
+
+    compiler_cache: str | None
+    """The compiler cache tool, ``"auto"`` for detecting it, or ``None`` if disabled."""
+
+    compiler_cache_max_size: str
+    """The maximum size of the cache directory of the compiler cache."""
+
+    linker: str | None
+    """The linker for targets created via :cmake:command:`charonload_add_torch_library`."""
+
+    split_debug_info: bool
+    """Flag to split the debug information off the extension in the ``Debug`` and ``RelWithDebInfo`` build types."""
+
+    cpu_target: str | None
+    """The resolved CPU target, e.g. ``"x86-64-v3"``, or ``None`` if the default target of the compiler is used."""
+
+    pgo: str | None
+    """The mode of profile-guided optimization, i.e. ``"generate"`` or ``"use"``, or ``None`` if disabled."""
+
+    unity_build: bool
+    """Flag to enable unity builds for all targets created via :cmake:command:`charonload_add_torch_library`."""
+
+    unity_build_batch_size: int
+    """The number of C++ sources combined into a single translation unit in unity builds."""
+
+    artifact_cache: bool
+    """Flag to enable reusing and storing built extensions in the local artifact cache."""
+
+    artifact_cache_max_size: int
+    """The maximum total size in bytes of the artifact cache."""
+
+    remote_artifact_cache: str | None
+    """The URL of the remote cache server for the artifact cache."""
+
 
 class ConfigDict(UserDict[str, ResolvedConfig]):
     """
@@ -155,7 +365,11 @@ class ConfigDict(UserDict[str, ResolvedConfig]):
             1) ``config.project_directory``, ``config.build_directory``, or ``config.stubs_directory`` are not
                absolute paths,
             2) ``config.project_directory`` does not exist, or
-            3) ``config.cmake_options`` contains prohibited options.
+            3) ``config.cmake_options`` contains prohibited options,
+            4) ``config.max_build_jobs`` or ``config.unity_build_batch_size`` is not a positive number,
+            5) ``config.compiler_cache``, ``config.linker``, ``config.cpu_target``, or ``config.pgo`` is not
+               supported, or
+            6) ``config.remote_artifact_cache`` is not an HTTP(S) URL.
         """
         super().__setitem__(
             key,
@@ -194,14 +408,24 @@ class ConfigDict(UserDict[str, ResolvedConfig]):
                         msg = f'Found prohibited CMake option="{k}" which is not allowed or supported.'
                         raise ValueError(msg)
 
+        cpu_target = self._str_to_cpu_target(os.environ.get("CHARONLOAD_FORCE_CPU_TARGET", default=config.cpu_target))
+        pgo = self._str_to_pgo(os.environ.get("CHARONLOAD_FORCE_PGO", default=config.pgo))
+
+        full_build_directory = self._find_build_directory(
+            build_directory=config.build_directory,
+            module_name=module_name,
+            project_directory=config.project_directory,
+            verbose=config.verbose,
+        )
+        # Variants are placed next to the build directory, so cleaning one of them never touches the others
+        if cpu_target is not None:
+            full_build_directory = full_build_directory.with_name(f"{full_build_directory.name}_cpu_{cpu_target}")
+        if pgo == "generate":
+            full_build_directory = full_build_directory.with_name(f"{full_build_directory.name}{_PGO_GENERATE_SUFFIX}")
+
         return ResolvedConfig(
             full_project_directory=pathlib.Path(config.project_directory).resolve(),
-            full_build_directory=self._find_build_directory(
-                build_directory=config.build_directory,
-                module_name=module_name,
-                project_directory=config.project_directory,
-                verbose=config.verbose,
-            ),
+            full_build_directory=full_build_directory,
             clean_build=self._str_to_bool(os.environ.get("CHARONLOAD_FORCE_CLEAN_BUILD", default=config.clean_build)),
             build_type=config.build_type,
             cmake_options=config.cmake_options if config.cmake_options is not None else {},
@@ -213,6 +437,31 @@ class ConfigDict(UserDict[str, ResolvedConfig]):
                 os.environ.get("CHARONLOAD_FORCE_STUBS_INVALID_OK", default=config.stubs_invalid_ok)
             ),
             verbose=self._str_to_bool(os.environ.get("CHARONLOAD_FORCE_VERBOSE", default=config.verbose)),
+            max_build_jobs=self._str_to_positive_int(
+                os.environ.get(
+                    "CHARONLOAD_FORCE_MAX_BUILD_JOBS",
+                    default=config.max_build_jobs if config.max_build_jobs is not None else (os.cpu_count() or 1),
+                )
+            ),
+            compiler_cache=self._str_to_compiler_cache(
+                os.environ.get("CHARONLOAD_FORCE_COMPILER_CACHE", default=config.compiler_cache)
+            ),
+            compiler_cache_max_size=config.compiler_cache_max_size,
+            linker=self._str_to_linker(os.environ.get("CHARONLOAD_FORCE_LINKER", default=config.linker)),
+            split_debug_info=self._str_to_bool(
+                os.environ.get("CHARONLOAD_FORCE_SPLIT_DEBUG_INFO", default=config.split_debug_info)
+            ),
+            cpu_target=cpu_target,
+            pgo=pgo,
+            unity_build=self._str_to_bool(os.environ.get("CHARONLOAD_FORCE_UNITY_BUILD", default=config.unity_build)),
+            unity_build_batch_size=self._str_to_positive_int(config.unity_build_batch_size),
+            artifact_cache=self._str_to_bool(
+                os.environ.get("CHARONLOAD_FORCE_ARTIFACT_CACHE", default=config.artifact_cache)
+            ),
+            artifact_cache_max_size=config.artifact_cache_max_size,
+            remote_artifact_cache=self._str_to_remote_artifact_cache(
+                os.environ.get("CHARONLOAD_FORCE_REMOTE_ARTIFACT_CACHE", default=config.remote_artifact_cache)
+            ),
         )
 
     def _str_to_bool(self: Self, s: str | bool) -> bool:  # noqa: FBT001
@@ -227,6 +476,83 @@ class ConfigDict(UserDict[str, ResolvedConfig]):
         msg = f'Cannot convert string "{s}" to bool'
         raise ValueError(msg)
 
+    def _str_to_positive_int(self: Self, s: str | int) -> int:
+        try:
+            i = int(s)
+        except ValueError:
+            msg = f'Cannot convert string "{s}" to int'
+            raise ValueError(msg) from None
+
+        if i < 1:
+            msg = f"Expected positive number, but got {i}"
+            raise ValueError(msg)
+
+        return i
+
+    def _str_to_compiler_cache(self: Self, s: str | None) -> str | None:
+        if s is None or s.lower() == "none":
+            return None
+
+        supported_compiler_caches = ["auto", "ccache", "sccache"]
+        if s.lower() not in supported_compiler_caches:
+            msg = f'Expected compiler cache to be one of {supported_compiler_caches} or "none", but got "{s}"'
+            raise ValueError(msg)
+
+        return s.lower()
+
+    def _str_to_linker(self: Self, s: str | None) -> str | None:
+        if s is None or s.lower() == "none":
+            return None
+
+        supported_linkers = ["auto", "mold", "lld"]
+        if s.lower() not in supported_linkers:
+            msg = f'Expected linker to be one of {supported_linkers} or "none", but got "{s}"'
+            raise ValueError(msg)
+
+        return s.lower()
+
+    def _str_to_cpu_target(self: Self, s: str | None) -> str | None:
+        if s is None or s.lower() == "none":
+            return None
+
+        # The target becomes part of the build directory and a compiler option, so only allow plain names
+        if re.fullmatch(r"[A-Za-z0-9][A-Za-z0-9.+_-]*", s) is None:
+            msg = f'Expected cpu_target to be "native", a CPU name like "x86-64-v3", or "none", but got "{s}"'
+            raise ValueError(msg)
+
+        cpu_target = _resolve_cpu_target(s)
+
+        # Specializing for a higher level than the host supports would crash when importing the extension
+        if (match := re.fullmatch(r"x86-64-v([1-4])", cpu_target)) is not None and _is_x86_64():
+            features = _cpu_features()
+            if features and int(match.group(1)) > (host_level := _x86_64_level(features)):
+                msg = f'Expected cpu_target to be supported by the host CPU (x86-64-v{host_level}), but got "{s}"'
+                raise ValueError(msg)
+
+        return cpu_target
+
+    def _str_to_pgo(self: Self, s: str | None) -> str | None:
+        if s is None or s.lower() == "none":
+            return None
+
+        supported_modes = ["generate", "use"]
+        if s.lower() not in supported_modes:
+            msg = f'Expected pgo to be one of {supported_modes} or "none", but got "{s}"'
+            raise ValueError(msg)
+
+        return s.lower()
+
+    def _str_to_remote_artifact_cache(self: Self, s: str | None) -> str | None:
+        if s is None or s.lower() == "none":
+            return None
+
+        url = urllib.parse.urlsplit(s)
+        if url.scheme not in ["http", "https"] or not url.hostname:
+            msg = f'Expected remote artifact cache to be an HTTP(S) URL or "none", but got "{s}"'
+            raise ValueError(msg)
+
+        return s.rstrip("/")
+
     def _find_build_directory(
         self: Self,
         *,
@@ -266,11 +592,7 @@ class ConfigDict(UserDict[str, ResolvedConfig]):
             hasher.update(bytes(pathlib.Path(sys.executable)))
             path_hash = base64.urlsafe_b64encode(hasher.digest()[:hash_length]).decode("ascii")
 
-            full_build_directory = (
-                pathlib.Path(tempfile.gettempdir())
-                / f"charonload-of-{getpass.getuser()}"
-                / f"{module_name}_build_{path_hash}"
-            )
+            full_build_directory = _user_directory() / f"{module_name}_build_{path_hash}"
 
         return full_build_directory
 
@@ -315,3 +637,8 @@ class ConfigDict(UserDict[str, ResolvedConfig]):
             )
             else None
         )
+
+
+def _user_directory() -> pathlib.Path:
+    """Get the directory shared by all charonload builds of the current user, e.g. for caches and job tokens."""
+    return pathlib.Path(tempfile.gettempdir()) / f"charonload-of-{getpass.getuser()}"
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import hashlib
+import pathlib
+import platform
+import re
+
+# Features of the x86-64 microarchitecture levels as named in /proc/cpuinfo, see the x86-64 psABI
+_X86_64_LEVEL_FEATURES = {
+    2: {"cx16", "lahf_lm", "popcnt", "pni", "sse4_1", "sse4_2", "ssse3"},
+    3: {"abm", "avx", "avx2", "bmi1", "bmi2", "f16c", "fma", "movbe", "xsave"},
+    4: {"avx512bw", "avx512cd", "avx512dq", "avx512f", "avx512vl"},
+}
+
+
+def _cpu_features(cpuinfo_path: pathlib.Path = pathlib.Path("/proc/cpuinfo")) -> frozenset[str]:
+    """Get the ISA features of the host CPU, or an empty set if they cannot be determined on this platform."""
+    try:
+        cpuinfo = cpuinfo_path.read_text()
+    except OSError:
+        return frozenset()
+
+    # x86 lists the features as "flags" and ARM as "Features"
+    match = re.search(r"^(?:flags|Features)\s*:(.*)$", cpuinfo, flags=re.MULTILINE)
+    return frozenset(match.group(1).split()) if match is not None else frozenset()
+
+
+def _x86_64_level(features: frozenset[str]) -> int:
+    level = 1
+    for next_level, level_features in _X86_64_LEVEL_FEATURES.items():
+        if not level_features <= features:
+            break
+        level = next_level
+    return level
+
+
+def _is_x86_64() -> bool:
+    return platform.machine().lower() in {"x86_64", "amd64"}
+
+
+def _resolve_cpu_target(cpu_target: str, features: frozenset[str] | None = None) -> str:
+    """
+    Resolve the CPU target to the name of its ISA feature level.
+
+    On x86-64, ``"native"`` is resolved to the highest supported microarchitecture level, e.g. ``"x86-64-v3"``, so all
+    hosts of the same level share the same variant. On other architectures, it is resolved to ``"native-<digest>"``
+    where the digest identifies the ISA features of the host.
+    """
+    if cpu_target != "native":
+        return cpu_target
+
+    if features is None:
+        features = _cpu_features()
+
+    if _is_x86_64() and features:
+        return f"x86-64-v{_x86_64_level(features)}"
+
+    hasher = hashlib.sha256()
+    hasher.update(platform.machine().encode())
+    hasher.update(" ".join(sorted(features)).encode() if features else platform.processor().encode())
+    return f"native-{hasher.hexdigest()[:8]}"
+
+
+def _march(cpu_target: str) -> str:
+    """Get the value of the compiler option ``-march`` for a resolved CPU target."""
+    return "native" if cpu_target.startswith("native-") else cpu_target
@@ -4,13 +4,15 @@ from abc import ABC
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:  # pragma: no cover
+    import pathlib
+
     from ._compat.typing import Self
 
 
 class JITCompileError(ABC, Exception):
     """Abstract base class for JIT compilation errors."""
 
-    def __init__(self: Self, step_name: str = "", log: str | None = None) -> None:
+    def __init__(self: Self, step_name: str = "", log: str | None = None, log_file: pathlib.Path | None = None) -> None:
         """
         Raise a JIT compilation error.
 
@@ -19,13 +21,18 @@ class JITCompileError(ABC, Exception):
         step_name
             The name of the failed compilation step.
         log
-            The full log from the underlying compiler.
+            The (tail of the) log from the underlying compiler.
+        log_file
+            The path to the file containing the full log.
         """
         self.step_name = step_name
         """The name of the failed compilation step."""
 
         self.log = log
-        """The full log from the underlying compiler."""
+        """The (tail of the) log from the underlying compiler."""
+
+        self.log_file = log_file
+        """The path to the file containing the full log, or ``None`` if the log has not been written to disk."""
 
         msg = ""
         if self.log is not None:
@@ -37,6 +44,8 @@ class JITCompileError(ABC, Exception):
             msg += "----------------------------------------------------------------\n"
         else:
             msg += f"{self.step_name} failed.\n"
+        if self.log_file is not None:
+            msg += f'Full log: "{self.log_file.as_posix()}"\n'
         msg += "\n"
         msg += (
             "charonload might automatically run a clean build on the next call in order to try to resolve the error. "
@@ -53,50 +62,82 @@ class JITCompileError(ABC, Exception):
             raise TypeError(msg)
         return super().__new__(cls)
 
+    def __reduce__(self: Self) -> tuple[Any, ...]:
+        # Restore from the attributes since the constructors of derived classes do not accept the formatted message
+        return (_restore_jit_compile_error, (type(self), self.step_name, self.log, self.log_file))
+
+    @property
+    def full_log(self: Self) -> str | None:
+        """
+        The full log from the underlying compiler.
+
+        The log is loaded from :attr:`log_file` on each access. Falls back to :attr:`log` if the file is not available.
+        """
+        if self.log_file is not None:
+            try:
+                return self.log_file.read_text(encoding="utf-8")
+            except OSError:
+                pass
+        return self.log
+
+
+def _restore_jit_compile_error(
+    cls: type[JITCompileError], step_name: str, log: str | None, log_file: pathlib.Path | None
+) -> JITCompileError:
+    error = cls.__new__(cls)
+    JITCompileError.__init__(error, step_name=step_name, log=log, log_file=log_file)
+    return error
+
 
 class CMakeConfigureError(JITCompileError):
     """Raised when the CMake configure step failed."""
 
-    def __init__(self: Self, log: str | None = None) -> None:
+    def __init__(self: Self, log: str | None = None, log_file: pathlib.Path | None = None) -> None:
         """
         Raise a CMake configure error.
 
         Parameters
         ----------
         log
-            The full log from CMake.
+            The (tail of the) log from CMake.
+        log_file
+            The path to the file containing the full log.
         """
-        super().__init__(step_name="CMake configure", log=log)
+        super().__init__(step_name="CMake configure", log=log, log_file=log_file)
 
 
 class BuildError(JITCompileError):
     """Raised when the build step failed."""
 
-    def __init__(self: Self, log: str | None = None) -> None:
+    def __init__(self: Self, log: str | None = None, log_file: pathlib.Path | None = None) -> None:
         """
         Raise a build error.
 
         Parameters
         ----------
         log
-            The full log from the build tool.
+            The (tail of the) log from the build tool.
+        log_file
+            The path to the file containing the full log.
         """
-        super().__init__(step_name="Building", log=log)
+        super().__init__(step_name="Building", log=log, log_file=log_file)
 
 
 class StubGenerationError(JITCompileError):
     """Raised when the stub generation step failed."""
 
-    def __init__(self: Self, log: str | None = None) -> None:
+    def __init__(self: Self, log: str | None = None, log_file: pathlib.Path | None = None) -> None:
         """
         Raise a stub generation error.
 
         Parameters
         ----------
         log
-            The full log from pybind11-stubgen.
+            The (tail of the) log from pybind11-stubgen.
+        log_file
+            The path to the file containing the full log.
         """
-        super().__init__(step_name="Stub generation", log=log)
+        super().__init__(step_name="Stub generation", log=log, log_file=log_file)
 
 
 class CommandNotFoundError(Exception):
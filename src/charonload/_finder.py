@@ -1,37 +1,82 @@
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
+import contextlib
 import enum
 import importlib.abc
+import importlib.machinery
+import importlib.util
 import multiprocessing
 import os
 import pathlib
 import platform
+import site
 import sys
+import threading
 import time
 import warnings
 import weakref
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Literal
 
 import colorama
 import filelock
 
 from ._compat import hashlib
 
+if platform.system() != "Windows":
+    import fcntl
+
 if TYPE_CHECKING:  # pragma: no cover
+    import types
+    from collections.abc import Iterable, Iterator
     from typing import Any, SupportsIndex
 
     from ._compat.typing import Self
 
-from ._config import ConfigDict, ResolvedConfig
-from ._errors import BuildError, CMakeConfigureError, StubGenerationError
+from ._artifact_cache import _ArtifactCache, _ArtifactKey
+from ._build_report import (
+    BuildReport,
+    _BuildHistory,
+    _create_build_report,
+    _NinjaLog,
+    _print_build_report,
+)
+from ._compiler_cache import _compiler_cache_stats_difference, _CompilerCache
+from ._config import ConfigDict, ResolvedConfig, _user_directory
+from ._cpu import _march
+from ._errors import (
+    BuildError,
+    CMakeConfigureError,
+    JITCompileError,
+    StubGenerationError,
+)
+from ._fingerprint import (
+    _BuildResultMarker,
+    _FingerprintManifest,
+    _read_cmake_cache_variable,
+)
+from ._invalidation import (
+    _charonload_invalidation,
+    _Invalidation,
+    _object_directories,
+    _remove_cmake_cache_entries,
+    _torch_invalidation,
+)
+from ._jobserver import _JobServer
 from ._persistence import (
     _EnumSerializer,
     _PathSerializer,
     _PersistentDict,
     _StrSerializer,
 )
+from ._pgo import _has_profiles, _ProfileStore
+from ._remote_cache import _RemoteArtifactCache
+from ._runner import _event_loop as _runner_event_loop
 from ._runner import _run, _run_if, _StepStatus
+from ._telemetry import span_recorder
+from ._trash import _Trash
 from ._version import _is_compatible, _version
 
 colorama.just_fix_windows_console()
@@ -42,7 +87,7 @@ class JITCompileFinder(importlib.abc.MetaPathFinder):
 
     def find_spec(  # type: ignore[no-untyped-def]
         self: Self, fullname, path, target=None  # noqa: ANN001, ARG002
-    ) -> None:
+    ) -> importlib.machinery.ModuleSpec | None:
         """
         Find the spec of the specified module.
 
@@ -50,7 +95,7 @@ class JITCompileFinder(importlib.abc.MetaPathFinder):
 
         - If a :class:`Config` instance has been registered in :data:`module_config` for ``fullname``:
             - JIT compile the extension following the stored configuration.
-            - Make the compiled extension loaded by Python's built-in importers.
+            - Return a spec which loads the compiled extension directly from its location in the build directory.
         - Otherwise:
             - Fall back to Python's built-in importers.
 
@@ -67,48 +112,455 @@ class JITCompileFinder(importlib.abc.MetaPathFinder):
 
         Returns
         -------
-        NoneType
-            ``None``. This defers the actual import to the built-in Python finders and loaders.
+        importlib.machinery.ModuleSpec | None
+            The spec of the compiled extension using :class:`importlib.machinery.ExtensionFileLoader`, or ``None`` if
+            ``fullname`` has not been registered. The latter defers the import to the built-in Python finders and
+            loaders.
         """
         if fullname in module_config:
-            print(  # noqa: T201
-                f"[charonload] Building module {colorama.Style.BRIGHT}'{fullname}'{colorama.Style.RESET_ALL} ..."
-            )
-            t_start = time.perf_counter()
-            _load(module_name=fullname, config=module_config[fullname])
-            t_end = time.perf_counter()
-            print(  # noqa: T201
-                f"[charonload] Building module {colorama.Style.BRIGHT}'{fullname}'{colorama.Style.RESET_ALL} ... done. "
-                f"({t_end - t_start:.1f}s)"
-            )
-
-            if "torch" not in sys.modules:
-                msg = (
-                    "\n"
-                    f"{colorama.Fore.YELLOW}[charonload] PyTorch seems to be not imported yet. Calling functions from '{fullname}', which internally use Torch on the C++ side, may lead to unexpected behavior.{colorama.Style.RESET_ALL}\n"  # noqa: E501
-                    f"{colorama.Fore.YELLOW}[charonload] Make sure to import PyTorch beforehand:{colorama.Style.RESET_ALL}\n"  # noqa: E501
-                    f"{colorama.Fore.YELLOW}[charonload]{colorama.Style.RESET_ALL}\n"
-                    f"{colorama.Fore.YELLOW}[charonload]     import torch{colorama.Style.RESET_ALL}\n"
-                    f"{colorama.Fore.YELLOW}[charonload]{colorama.Style.RESET_ALL}"
-                )
-                warnings.warn(msg, stacklevel=2)
-
-        return None  # noqa: PLR1711, RET501
-
+            full_extension_path = _load_with_progress(module_name=fullname, config=module_config[fullname])
+            _warn_if_torch_not_imported(fullname, stacklevel=3)
+            return _extension_spec(fullname, full_extension_path)
+
+        return None
+
+
+def _warn_if_torch_not_imported(module_name: str, *, stacklevel: int) -> None:
+    if "torch" not in sys.modules:
+        msg = (
+            "\n"
+            f"{colorama.Fore.YELLOW}[charonload] PyTorch seems to be not imported yet. Calling functions from '{module_name}', which internally use Torch on the C++ side, may lead to unexpected behavior.{colorama.Style.RESET_ALL}\n"  # noqa: E501
+            f"{colorama.Fore.YELLOW}[charonload] Make sure to import PyTorch beforehand:{colorama.Style.RESET_ALL}\n"
+            f"{colorama.Fore.YELLOW}[charonload]{colorama.Style.RESET_ALL}\n"
+            f"{colorama.Fore.YELLOW}[charonload]     import torch{colorama.Style.RESET_ALL}\n"
+            f"{colorama.Fore.YELLOW}[charonload]{colorama.Style.RESET_ALL}"
+        )
+        warnings.warn(msg, stacklevel=stacklevel)
+
+
+def _extension_spec(module_name: str, full_extension_path: pathlib.Path) -> importlib.machinery.ModuleSpec:
+    loader = importlib.machinery.ExtensionFileLoader(module_name, str(full_extension_path))
+    spec = importlib.util.spec_from_file_location(module_name, full_extension_path, loader=loader)
+    assert spec is not None  # noqa: S101
+    return spec
+
+
+def build_all(
+    names: Iterable[str] | None = None,
+    *,
+    max_workers: int | None = None,
+    parallel_jobs: int | None = None,
+) -> None:
+    """
+    JIT compile several registered extensions concurrently without importing them.
+
+    Each extension runs through the same steps as on import, but all builds are executed at the same time in a thread
+    pool. A single budget of parallel compile jobs is split across the concurrent builds to avoid oversubscribing the
+    machine. Importing the extensions afterwards directly loads the already built artifacts.
+
+    Parameters
+    ----------
+    names
+        The names of the extensions registered in :data:`module_config` to build. If ``None``, all registered
+        extensions will be built.
+    max_workers
+        The maximum number of extensions built at the same time. If ``None``, all extensions are built at once.
+    parallel_jobs
+        The total number of parallel compile jobs shared by all builds. If ``None``, the number of CPUs is used. The
+        machine-wide limit of :attr:`Config.max_build_jobs` still applies on top of this budget.
+
+    Raises
+    ------
+    KeyError
+        If any of ``names`` has not been registered in :data:`module_config`.
+    JITCompileError
+        The error of the first failed extension (in the order of ``names``) after all builds have finished.
+    """
+    configs, max_workers, jobs_per_build = _build_plan(names, max_workers=max_workers, parallel_jobs=parallel_jobs)
+    if not configs:
+        return
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="charonload") as executor:
+        futures = [
+            executor.submit(_load_with_progress, module_name=name, config=config, parallel_jobs=jobs_per_build)
+            for name, config in configs.items()
+        ]
 
-def _load(module_name: str, config: ResolvedConfig) -> None:
+    for future in futures:
+        if (e := future.exception()) is not None:
+            raise e
+
+
+def build_history(name: str) -> list[BuildReport]:
+    """
+    Get the recorded per-translation-unit timing reports of the previous builds of an extension.
+
+    A report is recorded after each build which compiled or linked at least one file. Comparing consecutive reports
+    reveals which translation units became slower to compile.
+
+    Parameters
+    ----------
+    name
+        The name of the extension registered in :data:`module_config`.
+
+    Returns
+    -------
+    list[BuildReport]
+        The reports of the most recent builds, ordered from oldest to newest.
+
+    Raises
+    ------
+    KeyError
+        If ``name`` has not been registered in :data:`module_config`.
+    """
+    return _BuildHistory(module_config[name]).load()
+
+
+async def aload(name: str) -> types.ModuleType:
+    """
+    JIT compile and import a registered extension without blocking the running event loop.
+
+    The steps of the JIT compilation run in a worker thread while their subprocesses are executed and streamed on the
+    event loop. Concurrent calls for the same extension share a single build.
+
+    Parameters
+    ----------
+    name
+        The name of the extension registered in :data:`module_config`.
+
+    Returns
+    -------
+    types.ModuleType
+        The imported extension. If it has already been imported, the existing module is returned.
+
+    Raises
+    ------
+    KeyError
+        If ``name`` has not been registered in :data:`module_config`.
+    JITCompileError
+        If the JIT compilation of the extension failed.
+    """
+    if (module := sys.modules.get(name)) is not None:
+        return module
+
+    full_extension_path = await _shared_async_load(name, module_config[name])
+
+    # The extension might have been imported by other means while building
+    if (module := sys.modules.get(name)) is not None:
+        return module
+
+    _warn_if_torch_not_imported(name, stacklevel=3)
+    spec = _extension_spec(name, full_extension_path)
+    assert spec.loader is not None  # noqa: S101
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+
+    return module
+
+
+async def abuild_all(
+    names: Iterable[str] | None = None,
+    *,
+    max_workers: int | None = None,
+    parallel_jobs: int | None = None,
+) -> None:
+    """
+    JIT compile several registered extensions concurrently without importing them or blocking the running event loop.
+
+    This is the awaitable counterpart of :func:`build_all`. Builds of extensions which are concurrently loaded via
+    :func:`aload` are shared.
+
+    Parameters
+    ----------
+    names
+        The names of the extensions registered in :data:`module_config` to build. If ``None``, all registered
+        extensions will be built.
+    max_workers
+        The maximum number of extensions built at the same time. If ``None``, all extensions are built at once.
+    parallel_jobs
+        The total number of parallel compile jobs shared by all builds. If ``None``, the number of CPUs is used. The
+        machine-wide limit of :attr:`Config.max_build_jobs` still applies on top of this budget.
+
+    Raises
+    ------
+    KeyError
+        If any of ``names`` has not been registered in :data:`module_config`.
+    JITCompileError
+        The error of the first failed extension (in the order of ``names``) after all builds have finished.
+    """
+    configs, max_workers, jobs_per_build = _build_plan(names, max_workers=max_workers, parallel_jobs=parallel_jobs)
+    if not configs:
+        return
+
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def _build(name: str, config: ResolvedConfig) -> None:
+        async with semaphore:
+            await _shared_async_load(name, config, parallel_jobs=jobs_per_build)
+
+    results = await asyncio.gather(
+        *[_build(name, config) for name, config in configs.items()],
+        return_exceptions=True,
+    )
+
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+def _build_plan(
+    names: Iterable[str] | None, *, max_workers: int | None, parallel_jobs: int | None
+) -> tuple[dict[str, ResolvedConfig], int, int]:
+    module_names = list(names) if names is not None else list(module_config)
+    configs = {name: module_config[name] for name in module_names}
+    if not configs:
+        return configs, 0, 0
+
+    max_workers = min(max_workers if max_workers is not None else len(configs), len(configs))
+    total_jobs = parallel_jobs if parallel_jobs is not None else (os.cpu_count() or 1)
+    jobs_per_build = max(1, total_jobs // max_workers)
+
+    return configs, max_workers, jobs_per_build
+
+
+async def _shared_async_load(
+    module_name: str, config: ResolvedConfig, *, parallel_jobs: int | None = None
+) -> pathlib.Path:
+    loop = asyncio.get_running_loop()
+    key = (loop, module_name)
+
+    if (task := _async_loads.get(key)) is None:
+        task = loop.create_task(_async_load(module_name, config, parallel_jobs=parallel_jobs))
+        _async_loads[key] = task
+        task.add_done_callback(lambda _: _async_loads.pop(key, None))
+
+    # Cancelling one of the waiting callers must not cancel the build shared with the others
+    return await asyncio.shield(task)
+
+
+async def _async_load(module_name: str, config: ResolvedConfig, *, parallel_jobs: int | None = None) -> pathlib.Path:
+    # The steps block on locks and files, so run them in a thread which delegates its subprocesses back to this loop
+    _runner_event_loop.set(asyncio.get_running_loop())
+    return await asyncio.to_thread(_load_with_progress, module_name, config, parallel_jobs=parallel_jobs)
+
+
+_async_loads: dict[tuple[asyncio.AbstractEventLoop, str], asyncio.Task[pathlib.Path]] = {}
+
+
+def _load_with_progress(module_name: str, config: ResolvedConfig, *, parallel_jobs: int | None = None) -> pathlib.Path:
+    print(  # noqa: T201
+        f"[charonload] Building module {colorama.Style.BRIGHT}'{module_name}'{colorama.Style.RESET_ALL} ..."
+    )
+    t_start = time.perf_counter()
+    with span_recorder._record(module_name, "Load"):  # noqa: SLF001
+        full_extension_path = _load(module_name=module_name, config=config, parallel_jobs=parallel_jobs)
+    t_end = time.perf_counter()
+    print(  # noqa: T201
+        f"[charonload] Building module {colorama.Style.BRIGHT}'{module_name}'{colorama.Style.RESET_ALL} ... done. "
+        f"({t_end - t_start:.1f}s)"
+    )
+
+    return full_extension_path
+
+
+def _load(module_name: str, config: ResolvedConfig, *, parallel_jobs: int | None = None) -> pathlib.Path:
     if not isinstance(config, ResolvedConfig):
         msg = f"Invalid type of configuration: expected 'Config', but got '{config.__class__.__name__}'"  # type: ignore[unreachable]
         raise TypeError(msg)
 
+    # Remember the last build result before waiting for any lock to detect builds finished by others in the meantime
     (config.full_build_directory / "charonload").mkdir(parents=True, exist_ok=True)
-    lock = filelock.FileLock(config.full_build_directory / "charonload" / "build.lock")
+    previous_generation = _BuildResultMarker(config).generation()
+
+    # Up-to-date checks only need a shared lock, so concurrent importers of an existing build do not serialize
+    with _build_lock(module_name, config, mode="read"):
+        if (full_extension_path := _load_up_to_date(module_name, config)) is not None:
+            return full_extension_path
+
+    return _build(module_name, config, previous_generation, parallel_jobs=parallel_jobs)
+
+
+@contextlib.contextmanager
+def _build_lock(module_name: str, config: ResolvedConfig, *, mode: Literal["read", "write"]) -> Iterator[None]:
+    lock = _process_build_lock(config.full_build_directory / "charonload" / "build.lock")
+
+    with contextlib.ExitStack() as stack:
+        with span_recorder._record(module_name, f"Lock ({mode})"):  # noqa: SLF001
+            stack.enter_context(lock.read() if mode == "read" else lock.write())
+        yield
+
+
+class _ProcessBuildLock:
+    """
+    Readers-writer lock of a build directory shared by all threads of the current process.
+
+    Readers only exclude writers and hold a single shared file lock together, since locks on network file systems like
+    NFS are owned by the whole process and would be released by any of the readers otherwise. Waiting writers take
+    precedence over new readers.
+    """
+
+    def __init__(self: Self, lock_file: pathlib.Path) -> None:
+        self.lock_file = lock_file
+        self.condition = threading.Condition()
+        self.readers = 0
+        self.waiting_writers = 0
+        self.writing = False
+        self.shared_file_lock = contextlib.ExitStack()
+
+    @contextlib.contextmanager
+    def read(self: Self) -> Iterator[None]:
+        with self.condition:
+            self.condition.wait_for(lambda: not self.writing and self.waiting_writers == 0)
+            if self.readers == 0:
+                self.shared_file_lock.enter_context(_file_lock(self.lock_file, shared=True))
+            self.readers += 1
+
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.readers -= 1
+                if self.readers == 0:
+                    self.shared_file_lock.close()
+                    self.condition.notify_all()
+
+    @contextlib.contextmanager
+    def write(self: Self) -> Iterator[None]:
+        with self.condition:
+            self.waiting_writers += 1
+            try:
+                self.condition.wait_for(lambda: not self.writing and self.readers == 0)
+            finally:
+                self.waiting_writers -= 1
+            self.writing = True
+
+        try:
+            with _file_lock(self.lock_file, shared=False):
+                yield
+        finally:
+            with self.condition:
+                self.writing = False
+                self.condition.notify_all()
+
+
+_process_build_locks: dict[pathlib.Path, _ProcessBuildLock] = {}
+_process_build_locks_lock = threading.Lock()
+
+
+def _process_build_lock(lock_file: pathlib.Path) -> _ProcessBuildLock:
+    with _process_build_locks_lock:
+        return _process_build_locks.setdefault(lock_file, _ProcessBuildLock(lock_file))
+
+
+@contextlib.contextmanager
+def _file_lock(lock_file: pathlib.Path, *, shared: bool) -> Iterator[None]:
+    if platform.system() == "Windows":  # pragma: no cover
+        # There are no shared locks in the standard library, so fall back to an exclusive lock
+        with filelock.FileLock(lock_file):
+            yield
+        return
+
+    # Only rely on the locking of the file system which, unlike locks stored in SQLite databases, is also reliable on
+    # network file systems like NFS
+    fd = os.open(lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        # Closing the file releases the lock
+        os.close(fd)
+
+
+def _load_up_to_date(module_name: str, config: ResolvedConfig) -> pathlib.Path | None:
+    if config.clean_build:
+        return None
+
+    manifest = _FingerprintManifest(module_name, config)
+    if not manifest.matches():
+        return None
+
+    return _load_built(module_name, config)
+
+
+def _load_built(module_name: str, config: ResolvedConfig) -> pathlib.Path | None:
+    try:
+        full_extension_path, windows_dll_directories = _read_extension_location(config)
+    except OSError:
+        return None
+
+    if not full_extension_path.exists():
+        return None
+
+    if config.full_stubs_directory is not None and not _stubs_exist(module_name, config.full_stubs_directory):
+        return None
+
+    if config.verbose:
+        print(  # noqa: T201
+            f"[charonload] {colorama.Fore.GREEN}{colorama.Style.BRIGHT}Up to date:{colorama.Style.NORMAL} "
+            f'"{full_extension_path.as_posix()}"{colorama.Style.RESET_ALL}'
+        )
+
+    _add_windows_dll_directories(windows_dll_directories, verbose=config.verbose)
+    return full_extension_path
+
+
+def _build(
+    module_name: str, config: ResolvedConfig, previous_generation: str | None, *, parallel_jobs: int | None = None
+) -> pathlib.Path:
+    result_marker = _BuildResultMarker(config)
+
     if config.verbose:
         print(f"[charonload] Acquiring lock (pid={multiprocessing.current_process().pid}) ...")  # noqa: T201
-    with lock:
+    with _build_lock(module_name, config, mode="write"):
         if config.verbose:
             print(f"[charonload] Acquiring lock (pid={multiprocessing.current_process().pid}) ... done.")  # noqa: T201
 
+        # Another process may have finished a build between releasing the shared and acquiring the exclusive lock
+        if (full_extension_path := _load_up_to_date(module_name, config)) is not None:
+            return full_extension_path
+
+        # Snapshot the inputs before building to not miss any changes made in the meantime
+        manifest = _FingerprintManifest(module_name, config)
+        external_files = manifest.external_files()
+        fingerprint = manifest.compute(external_files=external_files)
+
+        # Follow the result of another process that finished building the same inputs while waiting for the lock
+        if (full_extension_path := _follow_build(module_name, config, previous_generation, fingerprint)) is not None:
+            return full_extension_path
+
+        manifest.invalidate()
+
+        artifact_cache = _ArtifactCache(config.artifact_cache_max_size)
+        remote_artifact_cache = (
+            _RemoteArtifactCache(config.remote_artifact_cache, verbose=config.verbose)
+            if config.remote_artifact_cache is not None
+            else None
+        )
+        artifact_key = None
+        # Instrumented extensions and extensions optimized with changing profiles are not reproducible from the key
+        use_artifact_cache = config.artifact_cache and config.pgo is None
+        if use_artifact_cache and not config.clean_build:
+            artifact_key = _ArtifactKey(module_name, config).compute()
+            restored = artifact_cache.restore(artifact_key, module_name, config)
+            if restored is None and remote_artifact_cache is not None:
+                with span_recorder._record(module_name, "Remote Artifact Cache"):  # noqa: SLF001
+                    if remote_artifact_cache.fetch(artifact_key, artifact_cache):
+                        restored = artifact_cache.restore(artifact_key, module_name, config)
+            if restored is not None:
+                full_extension_path, external_files = restored
+                fingerprint = manifest.compute(external_files=external_files)
+                manifest.store(fingerprint, external_files)
+                result_marker.store_success(fingerprint)
+
+                _, windows_dll_directories = _read_extension_location(config)
+                _add_windows_dll_directories(windows_dll_directories, verbose=config.verbose)
+                return full_extension_path
+
         step_classes: list[type[_JITCompileStep]] = [
             _CleanStep,
             _InitializeStep,
@@ -117,9 +569,101 @@ def _load(module_name: str, config: ResolvedConfig) -> None:
             _StubGenerationStep,
             _ImportPathStep,
         ]
-        steps = [cls(module_name, config, (i + 1, len(step_classes))) for i, cls in enumerate(step_classes)]
-        for s in steps:
-            s.run()
+        step_options: dict[type[_JITCompileStep], dict[str, Any]] = {
+            _BuildStep: {"parallel_jobs": parallel_jobs},
+        }
+        steps = [
+            cls(module_name, config, (i + 1, len(step_classes)), **step_options.get(cls, {}))
+            for i, cls in enumerate(step_classes)
+        ]
+        try:
+            for s in steps:
+                s.run()
+        except JITCompileError as e:
+            result_marker.store_failure(fingerprint, type(e).__name__, e.log, e.log_file)
+            raise
+
+        if (new_external_files := manifest.external_files()) != external_files:
+            external_files = new_external_files
+            fingerprint = manifest.compute(external_files=external_files)
+        manifest.store(fingerprint, external_files)
+        result_marker.store_success(fingerprint)
+
+        full_extension_path, windows_dll_directories = _read_extension_location(config)
+
+        if use_artifact_cache:
+            if artifact_key is None:
+                artifact_key = _ArtifactKey(module_name, config).compute()
+            stored = artifact_cache.store(
+                artifact_key,
+                module_name,
+                config,
+                full_extension_path=full_extension_path,
+                windows_dll_directories=windows_dll_directories,
+                external_files=external_files,
+            )
+            if stored and remote_artifact_cache is not None:
+                remote_artifact_cache.push(artifact_key, artifact_cache)
+
+        return full_extension_path
+
+
+def _follow_build(
+    module_name: str, config: ResolvedConfig, previous_generation: str | None, fingerprint: str
+) -> pathlib.Path | None:
+    result = _BuildResultMarker(config).load()
+    if result is None or result.get("generation") == previous_generation or result.get("fingerprint") != fingerprint:
+        return None
+
+    if result.get("status") == "failed" and (error_cls := _followed_errors.get(result.get("error_type", ""))):
+        if config.verbose:
+            print(  # noqa: T201
+                f"[charonload] {colorama.Fore.RED}{colorama.Style.BRIGHT}Failed:{colorama.Style.NORMAL} "
+                f"Build of concurrent process failed{colorama.Style.RESET_ALL}"
+            )
+        log_file = result.get("log_file")
+        raise error_cls(result.get("log"), pathlib.Path(log_file) if log_file is not None else None)
+
+    if result.get("status") == "success":
+        return _load_built(module_name, config)
+
+    return None
+
+
+_followed_errors: dict[str, type[CMakeConfigureError | BuildError | StubGenerationError]] = {
+    "CMakeConfigureError": CMakeConfigureError,
+    "BuildError": BuildError,
+    "StubGenerationError": StubGenerationError,
+}
+
+
+def _read_extension_location(config: ResolvedConfig) -> tuple[pathlib.Path, str]:
+    location_directory = config.full_build_directory / "charonload" / config.build_type
+    full_extension_path = pathlib.Path((location_directory / "location.txt").read_text()).resolve()
+    windows_dll_directories = (location_directory / "windows_dll_directories.txt").read_text()
+    return full_extension_path, windows_dll_directories
+
+
+def _stubs_exist(module_name: str, full_stubs_directory: pathlib.Path) -> bool:
+    return (full_stubs_directory / module_name).exists() or (full_stubs_directory / f"{module_name}.pyi").exists()
+
+
+def _add_windows_dll_directories(windows_dll_directories: str, *, verbose: bool) -> None:
+    if platform.system() == "Windows":  # pragma: no cover
+        number_added_paths = 0
+
+        dll_directory_list = windows_dll_directories.split(";")
+        for d_str in dll_directory_list:
+            d = pathlib.Path(d_str)
+            if d.exists() and d.is_absolute() and d.is_dir():
+                _windows_dll_directories_guard.add(d)
+                number_added_paths += 1
+
+        if verbose and number_added_paths > 0:
+            print(  # noqa: T201
+                f"[charonload] {colorama.Fore.GREEN}{colorama.Style.BRIGHT}Added:{colorama.Style.NORMAL} "
+                f"{number_added_paths} DLL paths (Windows only){colorama.Style.RESET_ALL}"
+            )
 
 
 class _JITCompileStep(ABC):
@@ -135,16 +679,23 @@ class _JITCompileStep(ABC):
         self.cache.register_serializer(enum.Enum, encode=_EnumSerializer.encode, decode=_EnumSerializer.decode)
         self.cache.register_serializer(str, encode=_StrSerializer.encode, decode=_StrSerializer.decode)
 
+    @property
+    def log_file(self: Self) -> pathlib.Path:
+        log_name = self.step_name.lower().replace(" ", "_")
+        return self.config.full_build_directory / "charonload" / "logs" / f"{log_name}.log"
+
     def run(self: Self) -> None:
         if self.config.verbose:
             print(  # noqa: T201
                 f"[charonload] {colorama.Fore.CYAN}[{self.step_number[0]}/{self.step_number[1]}]"
                 f" {colorama.Style.BRIGHT}{self.step_name}{colorama.Style.RESET_ALL}"
             )
-        self._run_impl()
+        with span_recorder._record(self.module_name, self.step_name) as span:  # noqa: SLF001
+            status = self._run_impl()
+            span.skipped = status == _StepStatus.SKIPPED
 
     @abstractmethod  # pragma: no cover
-    def _run_impl(self: Self) -> None:
+    def _run_impl(self: Self) -> _StepStatus:
         pass
 
 
@@ -178,37 +729,61 @@ class _CleanStep(_JITCompileStep):
             str,
             self.config.full_build_directory / "charonload" / self.config.build_type / "torch_version.txt",
         )
+        self.trash = _Trash(self.config.full_build_directory / "charonload" / "trash")
+        self.trash_deletion: concurrent.futures.Future[int] | None = None
 
-    def _run_impl(self: Self) -> None:
-        if (
-            self.config.clean_build
-            or self._version_incompatible()
-            or self._crucial_step_failed()
-            or self._torch_version_changed()
-        ):
-            number_removed_files = 0
-            number_removed_directories = 0
-
-            for file in sorted(self.config.full_build_directory.rglob("*"), reverse=True):
-                if any(file.samefile(f) for f in [self.config.full_build_directory / "charonload" / "build.lock"]):
-                    continue
-
-                if file.is_file():
-                    file.unlink()
-                    number_removed_files += 1
-                elif file.is_dir() and not any(file.iterdir()):
-                    file.rmdir()
-                    number_removed_directories += 1
-
-            if self.config.verbose and (number_removed_files > 0 or number_removed_directories > 0):
+    def _run_impl(self: Self) -> _StepStatus:
+        status = _StepStatus.SKIPPED
+        if self.config.clean_build or self._crucial_step_failed():
+            number_removed_entries = self._move_to_trash(self.config.full_build_directory)
+
+            if self.config.verbose and number_removed_entries > 0:
                 print(  # noqa: T201
                     f"[charonload] {colorama.Fore.GREEN}{colorama.Style.BRIGHT}Removed:{colorama.Style.NORMAL} "
-                    f"{number_removed_files} files, {number_removed_directories} directories{colorama.Style.RESET_ALL}"
+                    f"{number_removed_entries} entries (deleting in background){colorama.Style.RESET_ALL}"
                 )
 
+            status = _StepStatus.SUCCESSFUL
+        elif invalidations := self._invalidations():
+            # Decide on all invalidations first since dropping the state of charonload also drops the recorded versions
+            for invalidation in invalidations:
+                self._invalidate(invalidation)
+
+            status = _StepStatus.SUCCESSFUL
+
+        # Also deletes the entries left behind by previous processes which exited before finishing the deletion
+        self.trash_deletion = self.trash.empty()
+
         if "torch" in sys.modules:
             self.cache["torch_version"] = str(sys.modules["torch"].__version__)
 
+        return status
+
+    def _move_to_trash(self: Self, directory: pathlib.Path) -> int:
+        # Keep the lock file which is held while cleaning, the build reports, so changes of the compile times remain
+        # visible across clean builds, and the recorded profiles, which are only invalidated by changes of the sources
+        # or build options
+        kept_paths = [
+            self.config.full_build_directory / "charonload" / "build.lock",
+            _BuildHistory(self.config).path,
+            _ProfileStore(self.module_name, self.config).directory,
+            self.trash.directory,
+        ]
+
+        number_removed_entries = 0
+        for path in directory.iterdir():
+            if path in kept_paths:
+                continue
+
+            # Only descend into directories containing kept paths, everything else is moved aside as a whole
+            if any(path in kept_path.parents for kept_path in kept_paths):
+                number_removed_entries += self._move_to_trash(path)
+            else:
+                self.trash.move(path)
+                number_removed_entries += 1
+
+        return number_removed_entries
+
     def _crucial_step_failed(self: Self) -> bool:
         is_crucial = {
             "status_cmake_configure": True,
@@ -220,17 +795,53 @@ class _CleanStep(_JITCompileStep):
         }
         return any(is_crucial[step] and failed for step, failed in failed_statuses.items())
 
-    def _version_incompatible(self: Self) -> bool:
-        return not _is_compatible(self.cache.get("version", _version()), _version())
+    def _invalidations(self: Self) -> list[_Invalidation]:
+        invalidations = []
+
+        previous_version: str = self.cache.get("version", _version())
+        if not _is_compatible(previous_version, _version()):
+            invalidations.append(_charonload_invalidation(previous_version, _version()))
 
-    def _torch_version_changed(self: Self) -> bool:
         if "torch" in sys.modules:
             current_torch_version = str(sys.modules["torch"].__version__)
-            previous_torch_version: str = self.cache.get("torch_version", str(sys.modules["torch"].__version__))
+            previous_torch_version: str = self.cache.get("torch_version", current_torch_version)
+            if current_torch_version != previous_torch_version:
+                invalidations.append(
+                    _torch_invalidation(previous_torch_version, current_torch_version, self.config.build_type)
+                )
 
-            return current_torch_version != previous_torch_version
+        return invalidations
 
-        return False
+    def _invalidate(self: Self, invalidation: _Invalidation) -> None:
+        dropped_artifacts = []
+
+        removed_cache_entries = _remove_cmake_cache_entries(
+            self.config.full_build_directory, invalidation.cmake_cache_entries
+        )
+        if removed_cache_entries:
+            dropped_artifacts.append(f"{len(removed_cache_entries)} CMake cache entries")
+
+        for build_type in invalidation.object_build_types:
+            object_directories = _object_directories(self.config.full_build_directory, build_type)
+            for directory in object_directories:
+                self.trash.move(directory)
+            if object_directories:
+                dropped_artifacts.append(f"objects of {len(object_directories)} targets ({build_type})")
+
+        charonload_directory = self.config.full_build_directory / "charonload"
+        if invalidation.charonload_state and charonload_directory.exists():
+            if number_removed_entries := self._move_to_trash(charonload_directory):
+                dropped_artifacts.append(f"{number_removed_entries} state entries of charonload")
+        else:
+            # Dropped cache entries are only recreated by running the configure step again
+            (charonload_directory / "cmake_configure_command.txt").unlink(missing_ok=True)
+
+        if self.config.verbose:
+            print(  # noqa: T201
+                f"[charonload] {colorama.Fore.GREEN}{colorama.Style.BRIGHT}Invalidated:{colorama.Style.NORMAL} "
+                f"{', '.join(dropped_artifacts) if dropped_artifacts else 'nothing'} "
+                f"({invalidation.reason}){colorama.Style.RESET_ALL}"
+            )
 
 
 class _InitializeStep(_JITCompileStep):
@@ -244,12 +855,14 @@ class _InitializeStep(_JITCompileStep):
             self.config.full_build_directory / "charonload" / "version.txt",
         )
 
-    def _run_impl(self: Self) -> None:
+    def _run_impl(self: Self) -> _StepStatus:
         self.cache["version"] = _version()
 
         with (self.config.full_build_directory / ".gitignore").open("w") as f:
             f.write("*")
 
+        return _StepStatus.SUCCESSFUL
+
 
 class _CMakeConfigureStep(_JITCompileStep):
     step_name = "CMake Configure"
@@ -267,7 +880,7 @@ class _CMakeConfigureStep(_JITCompileStep):
             self.config.full_build_directory / "charonload" / "cmake_configure_command.txt",
         )
 
-    def _run_impl(self: Self) -> None:
+    def _run_impl(self: Self) -> _StepStatus:
         configure_command_args = [
             "cmake",
             f"-DCMAKE_CONFIGURATION_TYPES={self.config.build_type}",
@@ -275,6 +888,16 @@ class _CMakeConfigureStep(_JITCompileStep):
             f"-DCMAKE_PROJECT_TOP_LEVEL_INCLUDES={self._cmake_project_top_level_includes()}",
             "-DCHARONLOAD_JIT_COMPILE=ON",
             f"-DCHARONLOAD_PYTHON_EXECUTABLE={pathlib.Path(sys.executable).as_posix()}",
+            f"-DCHARONLOAD_DETECTION_CACHE_DIRECTORY={self._cmake_detection_cache_directory()}",
+            f"-DCHARONLOAD_PREFIX_PATH={self._charonload_prefix_paths()}",
+            *[f"-D{k}={v}" for k, v in self._torch_detection_results().items()],
+            *self._compiler_launchers(),
+            f"-DCHARONLOAD_LINKER={self.config.linker if self.config.linker is not None else 'default'}",
+            f"-DCHARONLOAD_SPLIT_DEBUG_INFO={'ON' if self.config.split_debug_info else 'OFF'}",
+            f"-DCHARONLOAD_CPU_TARGET={self._cmake_cpu_target()}",
+            *self._pgo(),
+            f"-DCHARONLOAD_UNITY_BUILD={'ON' if self.config.unity_build else 'OFF'}",
+            f"-DCHARONLOAD_UNITY_BUILD_BATCH_SIZE={self.config.unity_build_batch_size}",
             f"-DTORCH_EXTENSION_NAME={self.module_name}",
             *[f"-D{k}={v}" for k, v in self.config.cmake_options.items()],
             *self._cmake_generator(),
@@ -292,12 +915,43 @@ class _CMakeConfigureStep(_JITCompileStep):
             ),
             command_args=configure_command_args,
             verbose=self.config.verbose,
+            log_file=self.log_file,
         )
 
         self.cache["cmake_configure_command"] = configure_command
         self.cache["status_cmake_configure"] = status
         if status == _StepStatus.FAILED:
-            raise CMakeConfigureError(log)
+            raise CMakeConfigureError(log, self.log_file)
+
+        if self.config.verbose:
+            linker = _read_cmake_cache_variable(self.config.full_build_directory, "CHARONLOAD_LINKER_TYPE")
+            print(f"[charonload] Linker: {linker if linker is not None else 'default'}")  # noqa: T201
+            print(f"[charonload] CPU target: {self.config.cpu_target or 'default'}")  # noqa: T201
+
+        return status
+
+    def _cmake_cpu_target(self: Self) -> str:
+        return _march(self.config.cpu_target) if self.config.cpu_target is not None else "none"
+
+    def _pgo(self: Self) -> list[str]:
+        if self.config.pgo is None:
+            return ["-DCHARONLOAD_PGO=none"]
+
+        profile_store = _ProfileStore(self.module_name, self.config)
+        profile_directory = profile_store.profile_directory()
+        if self.config.pgo == "generate":
+            profile_store.remove_stale(profile_directory)
+            profile_directory.mkdir(parents=True, exist_ok=True)
+        elif not _has_profiles(profile_directory) and self.config.verbose:
+            print(  # noqa: T201
+                f"{colorama.Fore.YELLOW}[charonload] No profiles found for profile-guided optimization. Build and run "
+                f'the workload with pgo="generate" first.{colorama.Style.RESET_ALL}'
+            )
+
+        return [
+            f"-DCHARONLOAD_PGO={self.config.pgo}",
+            f"-DCHARONLOAD_PGO_PROFILE_DIRECTORY={profile_directory.as_posix()}",
+        ]
 
     def _cmake_generator(self: Self) -> list[str]:
         return ["-G", "Ninja Multi-Config"] if platform.system() != "Windows" else []
@@ -305,6 +959,44 @@ class _CMakeConfigureStep(_JITCompileStep):
     def _cmake_prefix_paths(self: Self) -> str:
         return pathlib.Path(__file__).parent.as_posix()
 
+    def _charonload_prefix_paths(self: Self) -> str:
+        # User site-packages take precedence over global site-packages
+        site_package_directories = [site.getusersitepackages()] if site.ENABLE_USER_SITE else []
+        site_package_directories.extend(site.getsitepackages())
+        return ";".join(pathlib.Path(d).as_posix() for d in site_package_directories)
+
+    def _torch_detection_results(self: Self) -> dict[str, str]:
+        # Only reuse an already imported torch to avoid paying its import time here instead of in CMake
+        if "torch" not in sys.modules:
+            return {}
+
+        torch = sys.modules["torch"]
+        detection_results = {}
+        if torch.version.cuda is None:
+            detection_results["CHARONLOAD_TORCH_CUDA_VERSION"] = "NOTFOUND"
+        elif torch.cuda.is_initialized() or os.environ.get("PYTORCH_NVML_BASED_CUDA_CHECK") == "1":
+            # Querying the devices initializes the CUDA driver unless it already is or NVML is used, which breaks any
+            # later fork-based workers of the user, so otherwise leave the detection to the probe process in CMake
+            detection_results["CHARONLOAD_TORCH_CUDA_VERSION"] = (
+                str(torch.version.cuda) if torch.cuda.is_available() else "NOTFOUND"
+            )
+
+        if platform.system() == "Linux":
+            detection_results["CHARONLOAD_TORCH_CXX11_ABI"] = str(int(torch._C._GLIBCXX_USE_CXX11_ABI))  # noqa: SLF001
+
+        return detection_results
+
+    def _compiler_launchers(self: Self) -> list[str]:
+        compiler_cache = _CompilerCache.find(self.config)
+        if compiler_cache is None:
+            return []
+
+        launcher = ";".join(compiler_cache.launcher())
+        return [f"-DCMAKE_{lang}_COMPILER_LAUNCHER={launcher}" for lang in ["CXX", "CUDA"]]
+
+    def _cmake_detection_cache_directory(self: Self) -> str:
+        return (_user_directory() / "detection_cache").as_posix()
+
     def _cmake_project_top_level_includes(self: Self) -> str:
         return (pathlib.Path(__file__).parent / "cmake" / "detect_configure_failure.cmake").as_posix()
 
@@ -312,8 +1004,16 @@ class _CMakeConfigureStep(_JITCompileStep):
 class _BuildStep(_JITCompileStep):
     step_name = "Build"
 
-    def __init__(self: Self, module_name: str, config: ResolvedConfig, step_number: tuple[int, int]) -> None:
+    def __init__(
+        self: Self,
+        module_name: str,
+        config: ResolvedConfig,
+        step_number: tuple[int, int],
+        *,
+        parallel_jobs: int | None = None,
+    ) -> None:
         super().__init__(module_name, config, step_number)
+        self.parallel_jobs = parallel_jobs
         self.cache.connect(
             "status_cmake_configure",
             _StepStatus,
@@ -325,28 +1025,63 @@ class _BuildStep(_JITCompileStep):
             self.config.full_build_directory / "charonload" / "status_build.txt",
         )
 
-    def _run_impl(self: Self) -> None:
+    def _run_impl(self: Self) -> _StepStatus:
         cmake_configure_passed_file = self.config.full_build_directory / "charonload" / "cmake_configure_passed.txt"
 
-        status, log = _run(
-            command_args=[
-                "cmake",
-                "--build",
-                self.config.full_build_directory.as_posix(),
-                "--config",
-                str(self.config.build_type),
-                "--parallel",
-            ],
-            verbose=self.config.verbose,
+        ninja_log = _NinjaLog(self.config.full_build_directory)
+        ninja_log_position = ninja_log.position()
+
+        compiler_cache = _CompilerCache.find(self.config)
+        compiler_cache_stats_before = compiler_cache.stats() if compiler_cache is not None else None
+
+        job_server = _JobServer(self.config.max_build_jobs)
+        requested_jobs = self.parallel_jobs if self.parallel_jobs is not None else self.config.max_build_jobs
+        with job_server.acquire(requested_jobs, verbose=self.config.verbose) as jobs:
+            status, log = _run(
+                command_args=[
+                    "cmake",
+                    "--build",
+                    self.config.full_build_directory.as_posix(),
+                    "--config",
+                    str(self.config.build_type),
+                    "--parallel",
+                    str(jobs),
+                ],
+                verbose=self.config.verbose,
+                log_file=self.log_file,
+            )
+
+        compiler_cache_stats_after = compiler_cache.stats() if compiler_cache is not None else None
+        self._record_build_report(
+            ninja_log.read_since(ninja_log_position),
+            compiler_cache_stats=_compiler_cache_stats_difference(
+                compiler_cache_stats_before, compiler_cache_stats_after
+            ),
         )
 
         if status == _StepStatus.FAILED and not cmake_configure_passed_file.exists():
             self.cache["status_cmake_configure"] = status
-            raise CMakeConfigureError(log)
+            raise CMakeConfigureError(log, self.log_file)
 
         self.cache["status_build"] = status
         if status == _StepStatus.FAILED:
-            raise BuildError(log)
+            raise BuildError(log, self.log_file)
+
+        return status
+
+    def _record_build_report(
+        self: Self, edges: list[tuple[int, int, str]], *, compiler_cache_stats: tuple[int, int] | None
+    ) -> None:
+        report = _create_build_report(self.module_name, self.config, edges, compiler_cache_stats=compiler_cache_stats)
+        if report is None:
+            return
+
+        history = _BuildHistory(self.config)
+        previous_reports = history.load()
+        history.append(report)
+
+        if self.config.verbose:
+            _print_build_report(report, previous_reports[-1] if previous_reports else None)
 
 
 class _StubGenerationStep(_JITCompileStep):
@@ -375,7 +1110,7 @@ class _StubGenerationStep(_JITCompileStep):
             self.config.full_build_directory / "charonload" / self.config.build_type / "windows_dll_directories.txt",
         )
 
-    def _run_impl(self: Self) -> None:
+    def _run_impl(self: Self) -> _StepStatus:
         full_extension_path: pathlib.Path = self.cache["location"]
         old_checksum: str = self.cache.get("checksum", "")
         new_checksum = self._compute_checksum(full_extension_path)
@@ -386,10 +1121,7 @@ class _StubGenerationStep(_JITCompileStep):
                 and (
                     self.cache.get("status_stub_generation", _StepStatus.SKIPPED) == _StepStatus.FAILED
                     or new_checksum != old_checksum
-                    or (
-                        not (self.config.full_stubs_directory / self.module_name).exists()
-                        and not (self.config.full_stubs_directory / f"{self.module_name}.pyi").exists()
-                    )
+                    or not _stubs_exist(self.module_name, self.config.full_stubs_directory)
                 )
             ),
             command_args=[
@@ -406,12 +1138,15 @@ class _StubGenerationStep(_JITCompileStep):
                 self.module_name,
             ],
             verbose=self.config.verbose,
+            log_file=self.log_file,
         )
 
         self.cache["checksum"] = new_checksum
         self.cache["status_stub_generation"] = status
         if status == _StepStatus.FAILED:
-            raise StubGenerationError(log)
+            raise StubGenerationError(log, self.log_file)
+
+        return status
 
     def _windows_dll_directories(self: Self) -> list[str]:
         windows_dll_directories: str = self.cache["windows_dll_directories"]
@@ -431,40 +1166,18 @@ class _ImportPathStep(_JITCompileStep):
 
     def __init__(self: Self, module_name: str, config: ResolvedConfig, step_number: tuple[int, int]) -> None:
         super().__init__(module_name, config, step_number)
-        self.cache.connect(
-            "location",
-            pathlib.Path,
-            self.config.full_build_directory / "charonload" / self.config.build_type / "location.txt",
-        )
         self.cache.connect(
             "windows_dll_directories",
             str,
             self.config.full_build_directory / "charonload" / self.config.build_type / "windows_dll_directories.txt",
         )
 
-    def _run_impl(self: Self) -> None:
-        full_extension_path: pathlib.Path = self.cache["location"]
+    def _run_impl(self: Self) -> _StepStatus:
         windows_dll_directories: str = self.cache["windows_dll_directories"]
 
-        full_extension_directory = str(full_extension_path.parent)
-        if full_extension_directory not in sys.path:
-            sys.path.append(full_extension_directory)
-
-        if platform.system() == "Windows":  # pragma: no cover
-            number_added_paths = 0
+        _add_windows_dll_directories(windows_dll_directories, verbose=self.config.verbose)
 
-            dll_directory_list = windows_dll_directories.split(";")
-            for d_str in dll_directory_list:
-                d = pathlib.Path(d_str)
-                if d.exists() and d.is_absolute() and d.is_dir():
-                    _windows_dll_directories_guard.add(d)
-                    number_added_paths += 1
-
-            if self.config.verbose and number_added_paths > 0:
-                print(  # noqa: T201
-                    f"[charonload] {colorama.Fore.GREEN}{colorama.Style.BRIGHT}Added:{colorama.Style.NORMAL} "
-                    f"{number_added_paths} DLL paths (Windows only){colorama.Style.RESET_ALL}"
-                )
+        return _StepStatus.SUCCESSFUL
 
 
 module_config: ConfigDict = ConfigDict()
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import importlib.metadata
+import json
+import os
+import pathlib
+import site
+import subprocess
+import sys
+import threading
+import uuid
+from typing import TYPE_CHECKING, Any
+
+from ._version import _version
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterator
+
+    from ._compat.typing import Self
+    from ._config import ResolvedConfig
+
+
+class _FingerprintManifest:
+    """
+    Snapshot of all inputs that determine whether a previously built extension is still up to date.
+
+    The fingerprint only relies on cheap ``stat`` calls and small metadata files, so checking it only requires the
+    build lock in shared mode and no subprocess.
+    """
+
+    def __init__(self: Self, module_name: str, config: ResolvedConfig) -> None:
+        self.module_name = module_name
+        self.config = config
+        self.path = config.full_build_directory / "charonload" / config.build_type / "fingerprint.json"
+
+    def compute(self: Self, *, external_files: list[pathlib.Path] | None = None) -> str:
+        hasher = hashlib.sha256()
+        hasher.update(json.dumps(self._metadata(), sort_keys=True).encode())
+
+        files = [*self._input_files(), *(external_files if external_files is not None else [])]
+        for file in files:
+            try:
+                stat = file.stat()
+            except OSError:  # noqa: PERF203
+                hasher.update(f"{file.as_posix()}\0<missing>\n".encode())
+            else:
+                hasher.update(f"{file.as_posix()}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode())
+
+        return hasher.hexdigest()
+
+    def load(self: Self) -> dict[str, Any] | None:
+        return _read_json(self.path)
+
+    def store(self: Self, fingerprint: str, external_files: list[pathlib.Path]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "fingerprint": fingerprint,
+            "external_files": [f.as_posix() for f in external_files],
+        }
+
+        # Write atomically to never leave a truncated manifest behind if the process gets interrupted
+        _write_json_atomic(self.path, manifest)
+
+    def invalidate(self: Self) -> None:
+        self.path.unlink(missing_ok=True)
+
+    def matches(self: Self) -> bool:
+        manifest = self.load()
+        if manifest is None:
+            return False
+
+        external_files = [pathlib.Path(f) for f in manifest.get("external_files", [])]
+        return bool(manifest.get("fingerprint") == self.compute(external_files=external_files))
+
+    def external_files(self: Self) -> list[pathlib.Path]:
+        """Collect compiled source files and included headers which are located outside of the project directory."""
+        external_files: set[pathlib.Path] = set()
+
+        compile_commands_file = self.config.full_build_directory / "compile_commands.json"
+        try:
+            with compile_commands_file.open("r") as f:
+                compile_commands = json.load(f)
+        except (OSError, ValueError):
+            compile_commands = []
+
+        for entry in compile_commands:
+            file = pathlib.Path(entry["directory"]) / entry["file"]
+            if self._is_external(file):
+                external_files.add(file)
+
+        # Headers of the Python environment, e.g. of torch, are covered by the versions in the metadata
+        python_prefixes = _python_prefixes()
+        for file in _ninja_dependencies(self.config.full_build_directory):
+            if self._is_external(file) and not any(file.is_relative_to(p) for p in python_prefixes):
+                external_files.add(file)
+
+        return sorted(external_files)
+
+    def _is_external(self: Self, file: pathlib.Path) -> bool:
+        return not file.is_relative_to(self.config.full_project_directory) and not file.is_relative_to(
+            self.config.full_build_directory
+        )
+
+    def _metadata(self: Self) -> dict[str, Any]:
+        # Flags that do not influence the resulting artifact are excluded
+        config = dataclasses.asdict(self.config)
+        for k in [
+            "clean_build",
+            "verbose",
+            "max_build_jobs",
+            "artifact_cache",
+            "artifact_cache_max_size",
+            "remote_artifact_cache",
+        ]:
+            config.pop(k, None)
+
+        return {
+            "module_name": self.module_name,
+            "config": {k: str(v) for k, v in config.items()},
+            "python_executable": pathlib.Path(sys.executable).as_posix(),
+            "torch_version": _torch_version(),
+            "charonload_version": _version(),
+        }
+
+    def _input_files(self: Self) -> Iterator[pathlib.Path]:
+        excluded_directories = [self.config.full_build_directory]
+        if self.config.full_stubs_directory is not None:
+            excluded_directories.append(self.config.full_stubs_directory)
+
+        yield from _walk_files(self.config.full_project_directory, excluded_directories=excluded_directories)
+        yield from _walk_files(pathlib.Path(__file__).parent / "cmake", excluded_directories=[])
+
+        # Profiles recorded after a previous optimized build, e.g. one without any profiles, require building again.
+        # The store of ``_ProfileStore`` is located directly since importing it here would be circular.
+        if self.config.pgo == "use":
+            profile_store_directory = self.config.full_build_directory / "charonload" / "pgo"
+            yield from (
+                f
+                for f in _walk_files(profile_store_directory, excluded_directories=[])
+                if f.suffix in {".gcda", ".profraw"}
+            )
+
+
+class _BuildResultMarker:
+    """
+    Record of the outcome of the most recent build of an extension.
+
+    Processes that waited on the build lock while another process was building compare the generation of the marker
+    before and after waiting. If it changed and was created for the same fingerprint, they reuse the result instead of
+    running the pipeline again.
+    """
+
+    def __init__(self: Self, config: ResolvedConfig) -> None:
+        self.path = config.full_build_directory / "charonload" / config.build_type / "build_result.json"
+
+    def load(self: Self) -> dict[str, Any] | None:
+        return _read_json(self.path)
+
+    def generation(self: Self) -> str | None:
+        result = self.load()
+        return str(result["generation"]) if result is not None and "generation" in result else None
+
+    def store_success(self: Self, fingerprint: str) -> None:
+        self._store({"fingerprint": fingerprint, "status": "success"})
+
+    def store_failure(
+        self: Self, fingerprint: str, error_type: str, log: str | None, log_file: pathlib.Path | None
+    ) -> None:
+        self._store(
+            {
+                "fingerprint": fingerprint,
+                "status": "failed",
+                "error_type": error_type,
+                "log": log,
+                "log_file": log_file.as_posix() if log_file is not None else None,
+            }
+        )
+
+    def _store(self: Self, result: dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(self.path, {"generation": uuid.uuid4().hex, **result})
+
+
+def _read_json(path: pathlib.Path) -> dict[str, Any] | None:
+    try:
+        with path.open("r") as f:
+            content: dict[str, Any] = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return content
+
+
+def _write_json_atomic(path: pathlib.Path, content: dict[str, Any]) -> None:
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with tmp_path.open("w") as f:
+        json.dump(content, f)
+    tmp_path.replace(path)
+
+
+def _walk_files(directory: pathlib.Path, *, excluded_directories: list[pathlib.Path]) -> Iterator[pathlib.Path]:
+    excluded = {str(d) for d in excluded_directories}
+
+    for root, dirs, files in os.walk(directory):
+        # Prune in-place to avoid descending into hidden (e.g. .git) and excluded directories
+        dirs[:] = sorted(d for d in dirs if not d.startswith(".") and str(pathlib.Path(root) / d) not in excluded)
+        for file in sorted(files):
+            yield pathlib.Path(root) / file
+
+
+def _ninja_dependencies(full_build_directory: pathlib.Path) -> list[pathlib.Path]:
+    """Get the files which the compiled objects depend on according to the depfiles recorded by Ninja."""
+    make_program = _read_cmake_cache_variable(full_build_directory, "CMAKE_MAKE_PROGRAM")
+    if make_program is None or not pathlib.Path(make_program).name.lower().startswith("ninja"):
+        return []
+
+    try:
+        result = subprocess.run(  # noqa: S603
+            [make_program, "-C", full_build_directory.as_posix(), "-t", "deps"],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return []
+
+    # Each object is followed by its dependencies on indented lines
+    dependencies = set()
+    for line in result.stdout.splitlines():
+        if line.startswith(" ") and (dependency := line.strip()):
+            dependencies.add(full_build_directory / dependency)
+
+    return sorted(dependencies)
+
+
+def _python_prefixes() -> list[pathlib.Path]:
+    prefixes = {sys.prefix, sys.base_prefix, sys.exec_prefix, sys.base_exec_prefix}
+    if site.ENABLE_USER_SITE:
+        prefixes.add(site.getuserbase())
+    return [pathlib.Path(p).resolve() for p in sorted(prefixes)]
+
+
+def _read_cmake_cache_variable(full_build_directory: pathlib.Path, name: str) -> str | None:
+    try:
+        with (full_build_directory / "CMakeCache.txt").open("r") as f:
+            for line in f:
+                key, _, value = line.rstrip("\n").partition("=")
+                if key.partition(":")[0] == name:
+                    return value
+    except OSError:
+        pass
+    return None
+
+
+def _torch_version() -> str:
+    if "torch" in sys.modules:
+        return str(sys.modules["torch"].__version__)
+
+    try:
+        return importlib.metadata.version("torch")
+    except importlib.metadata.PackageNotFoundError:
+        return ""
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import dataclasses
+import fnmatch
+import os
+import re
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    import pathlib
+
+# Cache entries created by find_package(Torch) and by the detection of its properties in charonload
+_TORCH_CACHE_ENTRIES = (
+    "Torch_DIR",
+    "TORCH_*",
+    "Caffe2_DIR",
+    "CAFFE2_*",
+    "C10_*",
+    "c10_*",
+    "kineto_LIBRARY",
+    "CHARONLOAD_TORCH_*",
+)
+
+# Cache entries created by find_package(charonload) and the CMake modules of charonload
+_CHARONLOAD_CACHE_ENTRIES = (
+    "charonload_DIR",
+    "CHARONLOAD_*",
+)
+
+# Entry lines are "NAME:TYPE=VALUE" where the name may be quoted and may have a property suffix, e.g. "-ADVANCED"
+_CMAKE_CACHE_ENTRY_PATTERN = re.compile(r'^"?(?P<name>[^":]+?)"?(?P<property>-ADVANCED|-MODIFIED|-STRINGS)?:\w+=')
+
+
+@dataclasses.dataclass(frozen=True)
+class _Invalidation:
+    """
+    Artifacts of a build directory which depend on a changed input.
+
+    Instead of cleaning the whole build directory, only these artifacts are dropped, so e.g. the results of the
+    compiler checks, the state of the CMake generator, and the objects of other build types survive.
+    """
+
+    reason: str
+    """Human-readable description of the changed input."""
+
+    cmake_cache_entries: tuple[str, ...] = ()
+    """Glob patterns of the names of the CMake cache entries which are derived from the input."""
+
+    object_build_types: tuple[str, ...] = ()
+    """Build types whose object files have been compiled against the input."""
+
+    charonload_state: bool = False
+    """Whether the state of charonload stored in the build directory has been written by the input."""
+
+
+def _torch_invalidation(previous_version: str, current_version: str, build_type: str) -> _Invalidation:
+    # Other build types detect the change on their own when they are built next time
+    return _Invalidation(
+        reason=f"PyTorch version changed from {previous_version} to {current_version}",
+        cmake_cache_entries=_TORCH_CACHE_ENTRIES,
+        object_build_types=(build_type,),
+    )
+
+
+def _charonload_invalidation(previous_version: str, current_version: str) -> _Invalidation:
+    # Changes of the compile options set by charonload are picked up by the build system, so the objects are kept
+    return _Invalidation(
+        reason=f"charonload version changed from {previous_version} to {current_version}",
+        cmake_cache_entries=_CHARONLOAD_CACHE_ENTRIES,
+        charonload_state=True,
+    )
+
+
+def _remove_cmake_cache_entries(build_directory: pathlib.Path, patterns: tuple[str, ...]) -> list[str]:
+    """Remove the entries matching any of ``patterns`` from the CMake cache, and return their names."""
+    cache_file = build_directory / "CMakeCache.txt"
+    try:
+        lines = cache_file.read_text(encoding="utf-8").splitlines(keepends=True)
+    except FileNotFoundError:
+        return []
+
+    kept_lines: list[str] = []
+    removed_entries: list[str] = []
+    comment_lines: list[str] = []
+    for line in lines:
+        # Comments document the entry which follows them
+        if line.startswith("//"):
+            comment_lines.append(line)
+            continue
+
+        match = _CMAKE_CACHE_ENTRY_PATTERN.match(line)
+        if match is not None and any(fnmatch.fnmatchcase(match.group("name"), p) for p in patterns):
+            if match.group("property") is None:
+                removed_entries.append(match.group("name"))
+        else:
+            kept_lines.extend(comment_lines)
+            kept_lines.append(line)
+        comment_lines.clear()
+
+    kept_lines.extend(comment_lines)
+
+    if removed_entries:
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_file.write_text("".join(kept_lines), encoding="utf-8")
+        tmp_file.replace(cache_file)
+
+    return removed_entries
+
+
+def _object_directories(build_directory: pathlib.Path, build_type: str) -> list[pathlib.Path]:
+    """Find the directories containing the object files of all targets for ``build_type``."""
+    # Multi-config generators place the objects into "<binary dir>/CMakeFiles/<target>.dir/<build type>"
+    return sorted(
+        d / build_type
+        for d in build_directory.rglob("*.dir")
+        if d.parent.name == "CMakeFiles" and (d / build_type).is_dir()
+    )
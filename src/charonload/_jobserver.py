@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import contextlib
+import time
+from typing import TYPE_CHECKING
+
+import colorama
+import filelock
+
+from ._config import _user_directory
+
+if TYPE_CHECKING:  # pragma: no cover
+    import pathlib
+    from collections.abc import Iterator
+
+    from ._compat.typing import Self
+
+colorama.just_fix_windows_console()
+
+
+class _JobServer:
+    """
+    Host-wide pool of compile job tokens shared by all charonload builds of the current user.
+
+    Each token is represented by a lock file in a common directory, so the total number of concurrently running compile
+    jobs across processes is bounded by the number of token files. In contrast to a GNU make jobserver FIFO, tokens held
+    by crashed processes are released automatically by the operating system.
+
+    The number of token files, i.e. the size of the pool, is stored in the common directory as well, so all processes
+    enforce the same cap even if they have been configured with different values of ``max_jobs``. A process with a
+    different value only resizes the pool while none of its tokens are in use.
+    """
+
+    def __init__(self: Self, max_jobs: int, *, directory: pathlib.Path | None = None) -> None:
+        if max_jobs < 1:
+            msg = f"Expected at least 1 job, but got {max_jobs}"
+            raise ValueError(msg)
+
+        self.max_jobs = max_jobs
+        self.directory = directory if directory is not None else _default_jobserver_directory()
+
+    @contextlib.contextmanager
+    def acquire(self: Self, jobs: int, *, poll_interval: float = 0.1, verbose: bool = False) -> Iterator[int]:
+        """
+        Block until at least one token is available and yield the number of acquired tokens.
+
+        At most ``min(jobs, max_jobs)`` tokens are taken, where ``max_jobs`` is the size of the shared pool. All tokens
+        are released when leaving the context.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        locks: list[filelock.BaseFileLock] = []
+        waiting = False
+        try:
+            while True:
+                with filelock.FileLock(self.directory / "pool.lock"):
+                    max_jobs = self._pool_size()
+                    requested_jobs = max(1, min(jobs, max_jobs))
+                    locks.extend(self._try_acquire(requested_jobs, max_jobs))
+                if locks:
+                    break
+
+                if verbose and not waiting:
+                    print(  # noqa: T201
+                        f"{colorama.Fore.YELLOW}[charonload] All {max_jobs} compile job tokens are in use. "
+                        f"Waiting ...{colorama.Style.RESET_ALL}"
+                    )
+                    waiting = True
+                time.sleep(poll_interval)
+
+            if verbose:
+                print(  # noqa: T201
+                    f"{colorama.Fore.CYAN}[charonload] Acquired {len(locks)}/{requested_jobs} compile job "
+                    f"tokens.{colorama.Style.RESET_ALL}"
+                )
+
+            yield len(locks)
+        finally:
+            for lock in locks:
+                lock.release()
+
+    def _pool_size(self: Self) -> int:
+        pool_size_file = self.directory / "pool_size.txt"
+        try:
+            pool_size = int(pool_size_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            pool_size = 0
+
+        if pool_size == self.max_jobs:
+            return pool_size
+
+        if pool_size >= 1:
+            # Tokens acquired from the current pool would not be accounted for in a resized one
+            idle_locks = self._try_acquire(pool_size, pool_size)
+            for lock in idle_locks:
+                lock.release()
+            if len(idle_locks) < pool_size:
+                return pool_size
+
+        pool_size_file.write_text(str(self.max_jobs), encoding="utf-8")
+        return self.max_jobs
+
+    def _try_acquire(self: Self, jobs: int, max_jobs: int) -> list[filelock.BaseFileLock]:
+        locks: list[filelock.BaseFileLock] = []
+        for i in range(max_jobs):
+            if len(locks) >= jobs:
+                break
+
+            lock = filelock.FileLock(self.directory / f"token_{i}.lock")
+            try:
+                lock.acquire(timeout=0)
+            except filelock.Timeout:
+                continue
+            locks.append(lock)
+
+        return locks
+
+
+def _default_jobserver_directory() -> pathlib.Path:
+    return _user_directory() / "jobserver"
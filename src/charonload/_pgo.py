@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import dataclasses
+import shutil
+from typing import TYPE_CHECKING
+
+from ._artifact_cache import _ArtifactKey
+from ._config import _PGO_GENERATE_SUFFIX
+
+if TYPE_CHECKING:  # pragma: no cover
+    import pathlib
+
+    from ._compat.typing import Self
+    from ._config import ResolvedConfig
+
+
+class _ProfileStore:
+    """
+    Persistent profiles of the profile-guided optimization of an extension.
+
+    The profiles are recorded by the instrumented extension of ``pgo="generate"`` and consumed by the optimized build of
+    ``pgo="use"``. Each set of profiles is keyed by the :class:`_ArtifactKey <charonload._artifact_cache._ArtifactKey>`
+    of the project without the PGO mode, so any change of the sources or the build options invalidates it. The store
+    lives in the build directory of the optimized build and is kept when cleaning it.
+    """
+
+    def __init__(self: Self, module_name: str, config: ResolvedConfig) -> None:
+        self.module_name = module_name
+        self.config = config
+        self.directory = _optimized_build_directory(config) / "charonload" / "pgo"
+
+    def profile_directory(self: Self) -> pathlib.Path:
+        # Both modes share the key, so the optimized build finds the profiles of the instrumented one
+        config = dataclasses.replace(
+            self.config, full_build_directory=_optimized_build_directory(self.config), pgo=None
+        )
+        return self.directory / _ArtifactKey(self.module_name, config).compute()
+
+    def remove_stale(self: Self, profile_directory: pathlib.Path) -> None:
+        """Remove all profiles which have been recorded for previous versions of the sources or build options."""
+        if not self.directory.exists():
+            return
+
+        for directory in self.directory.iterdir():
+            if directory != profile_directory:
+                shutil.rmtree(directory, ignore_errors=True)
+
+
+def _optimized_build_directory(config: ResolvedConfig) -> pathlib.Path:
+    if config.pgo != "generate":
+        return config.full_build_directory
+
+    # The instrumented variant is built next to the optimized one
+    directory = config.full_build_directory
+    return directory.with_name(directory.name.removesuffix(_PGO_GENERATE_SUFFIX))
+
+
+def _has_profiles(profile_directory: pathlib.Path) -> bool:
+    # GCC records one profile per object file and Clang one raw profile per run
+    return profile_directory.exists() and any(
+        f.suffix in {".gcda", ".profraw", ".profdata"} for f in profile_directory.iterdir()
+    )
@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import atexit
+import base64
+import functools
+import http.client
+import io
+import os
+import shutil
+import threading
+import urllib.parse
+import uuid
+from typing import IO, TYPE_CHECKING
+
+import colorama
+
+from ._compat import hashlib
+from ._worker import _DaemonWorker
+
+if TYPE_CHECKING:  # pragma: no cover
+    import concurrent.futures
+    import pathlib
+
+    from ._artifact_cache import _ArtifactCache
+    from ._compat.typing import Self
+
+colorama.just_fix_windows_console()
+
+
+class _ConnectionPool:
+    """
+    Pool of persistent keep-alive connections to a single HTTP server.
+
+    Consecutive downloads and uploads reuse idle connections and, hence, skip the TCP and TLS handshakes.
+    """
+
+    def __init__(self: Self, url: str, *, timeout: float, max_idle_connections: int = 4) -> None:
+        split_url = urllib.parse.urlsplit(url)
+        self.scheme = split_url.scheme
+        self.host = split_url.hostname or ""
+        self.port = split_url.port
+        self.timeout = timeout
+        self.max_idle_connections = max_idle_connections
+
+        self._idle_connections: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def acquire(self: Self) -> tuple[http.client.HTTPConnection, bool]:
+        """Return an idle or a new connection together with the flag whether it has been used before."""
+        with self._lock:
+            if self._idle_connections:
+                return self._idle_connections.pop(), True
+
+        connection_cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return connection_cls(self.host, self.port, timeout=self.timeout), False
+
+    def release(self: Self, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle_connections) < self.max_idle_connections:
+                self._idle_connections.append(connection)
+                return
+
+        connection.close()
+
+    def close(self: Self) -> None:
+        with self._lock:
+            idle_connections, self._idle_connections = self._idle_connections, []
+
+        for connection in idle_connections:
+            connection.close()
+
+
+class _RemoteArtifactCache:
+    """
+    Client of a remote cache for the entries of :class:`_ArtifactCache` using the HTTP protocol of Bazel remote caches.
+
+    Entries are transferred as tar archives which are streamed from and to disk in chunks. Each archive is stored in the
+    content-addressable store under ``<url>/cas/<sha256 of the archive>`` and referenced by a minimal ``ActionResult``
+    stored in the action cache under ``<url>/ac/<key>``, so servers verifying the digests of uploads accept them.
+    Failures to reach the server are never fatal and only result in a cache miss.
+    """
+
+    timeout = 10.0
+    exit_timeout = 10.0
+    chunk_size = 1024 * 1024
+
+    def __init__(self: Self, url: str, *, verbose: bool = False) -> None:
+        self.url = url
+        self.verbose = verbose
+        self.pool = _connection_pool(url)
+
+        split_url = urllib.parse.urlsplit(url)
+        self.base_path = split_url.path.rstrip("/")
+        self.headers = {}
+        if split_url.username is not None:
+            credentials = f"{urllib.parse.unquote(split_url.username)}:{urllib.parse.unquote(split_url.password or '')}"
+            self.headers["Authorization"] = f"Basic {base64.b64encode(credentials.encode()).decode()}"
+
+    def fetch(self: Self, key: str, artifact_cache: _ArtifactCache) -> bool:
+        """Download the entry for ``key`` into ``artifact_cache`` and return whether it was found."""
+        archive = _temporary_archive(artifact_cache, key)
+        try:
+            archive.parent.mkdir(parents=True, exist_ok=True)
+            action_result = io.BytesIO()
+            status = self._request("GET", f"ac/{key}", response_file=action_result)
+            digest = _decode_action_result(action_result.getvalue()) if status == http.client.OK else None
+
+            found = False
+            if digest is not None:
+                with archive.open("w+b") as f:
+                    status = self._request("GET", f"cas/{digest[0]}", response_file=f)
+
+                # Never extract archives which have been corrupted or tampered with
+                found = (
+                    status == http.client.OK
+                    and _file_digest(archive) == digest
+                    and artifact_cache.import_entry(key, archive)
+                )
+        except (OSError, http.client.HTTPException) as e:
+            self._print_unavailable(e)
+            return False
+        finally:
+            archive.unlink(missing_ok=True)
+
+        if found and self.verbose:
+            print(  # noqa: T201
+                f"[charonload] {colorama.Fore.GREEN}{colorama.Style.BRIGHT}Downloaded:{colorama.Style.NORMAL} "
+                f'"{key}" from remote artifact cache{colorama.Style.RESET_ALL}'
+            )
+
+        return found
+
+    def push(self: Self, key: str, artifact_cache: _ArtifactCache) -> concurrent.futures.Future[bool]:
+        """Upload the entry for ``key`` from ``artifact_cache`` in the background."""
+        return _upload_worker.submit(functools.partial(self._push, key, artifact_cache))
+
+    def _push(self: Self, key: str, artifact_cache: _ArtifactCache) -> bool:
+        archive = _temporary_archive(artifact_cache, key)
+        try:
+            if not artifact_cache.export_entry(key, archive):
+                return False
+
+            # Upload the archive first, so the action cache never references missing content
+            digest = _file_digest(archive)
+            with archive.open("rb") as f:
+                status = self._request("PUT", f"cas/{digest[0]}", body_file=f)
+            if _is_success(status):
+                status = self._request("PUT", f"ac/{key}", body_file=io.BytesIO(_encode_action_result(digest)))
+        except (OSError, http.client.HTTPException) as e:
+            self._print_unavailable(e)
+            return False
+        finally:
+            archive.unlink(missing_ok=True)
+
+        uploaded = _is_success(status)
+        if uploaded and self.verbose:
+            print(  # noqa: T201
+                f"[charonload] {colorama.Fore.GREEN}{colorama.Style.BRIGHT}Uploaded:{colorama.Style.NORMAL} "
+                f'"{key}" to remote artifact cache{colorama.Style.RESET_ALL}'
+            )
+
+        return uploaded
+
+    def _request(
+        self: Self,
+        method: str,
+        path: str,
+        *,
+        body_file: IO[bytes] | None = None,
+        response_file: IO[bytes] | None = None,
+    ) -> int:
+        headers = dict(self.headers)
+        if body_file is not None:
+            headers["Content-Length"] = str(body_file.seek(0, os.SEEK_END))
+
+        while True:
+            connection, reused = self.pool.acquire()
+            try:
+                if body_file is not None:
+                    body_file.seek(0)
+                connection.request(method, f"{self.base_path}/{path}", body=body_file, headers=headers)
+
+                response = connection.getresponse()
+                if response.status == http.client.OK and response_file is not None:
+                    shutil.copyfileobj(response, response_file, self.chunk_size)
+                else:
+                    response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+
+                # The server may have closed an idle connection in the meantime, so retry once with a new connection
+                if reused:
+                    if response_file is not None:
+                        response_file.seek(0)
+                        response_file.truncate()
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+
+            if response.will_close:
+                connection.close()
+            else:
+                self.pool.release(connection)
+            return response.status
+
+    def _print_unavailable(self: Self, e: Exception) -> None:
+        if self.verbose:
+            print(  # noqa: T201
+                f"{colorama.Fore.YELLOW}[charonload] Remote artifact cache {self.url} is unavailable: {e}"
+                f"{colorama.Style.RESET_ALL}"
+            )
+
+
+def _is_success(status: int) -> bool:
+    return http.client.OK <= status < http.client.MULTIPLE_CHOICES
+
+
+def _file_digest(file: pathlib.Path) -> tuple[str, int]:
+    with file.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest(), os.fstat(f.fileno()).st_size
+
+
+# Minimal protobuf encoding of the Remote Execution API message "ActionResult" which only contains a single output file
+_ARCHIVE_NAME = "artifact.tar"
+_WIRE_TYPE_VARINT = 0
+_WIRE_TYPE_LENGTH_DELIMITED = 2
+_ACTION_RESULT_OUTPUT_FILES = 2
+_OUTPUT_FILE_PATH = 1
+_OUTPUT_FILE_DIGEST = 2
+_DIGEST_HASH = 1
+_DIGEST_SIZE_BYTES = 2
+
+
+def _encode_action_result(digest: tuple[str, int]) -> bytes:
+    digest_message = _encode_field(_DIGEST_HASH, digest[0].encode()) + _encode_field(_DIGEST_SIZE_BYTES, digest[1])
+    output_file_message = _encode_field(_OUTPUT_FILE_PATH, _ARCHIVE_NAME.encode()) + _encode_field(
+        _OUTPUT_FILE_DIGEST, digest_message
+    )
+    return _encode_field(_ACTION_RESULT_OUTPUT_FILES, output_file_message)
+
+
+def _decode_action_result(data: bytes) -> tuple[str, int] | None:
+    """Get the digest of the archive referenced by an ``ActionResult``, or ``None`` if it is invalid."""
+    try:
+        for number, output_file_message in _decode_fields(data):
+            if number != _ACTION_RESULT_OUTPUT_FILES or not isinstance(output_file_message, bytes):
+                continue
+
+            output_file = dict(_decode_fields(output_file_message))
+            path, digest_message = output_file.get(_OUTPUT_FILE_PATH), output_file.get(_OUTPUT_FILE_DIGEST)
+            if path != _ARCHIVE_NAME.encode() or not isinstance(digest_message, bytes):
+                continue
+
+            digest = dict(_decode_fields(digest_message))
+            digest_hash, size = digest.get(_DIGEST_HASH, b""), digest.get(_DIGEST_SIZE_BYTES, 0)
+            if isinstance(digest_hash, bytes) and isinstance(size, int):
+                return digest_hash.decode("ascii"), size
+    except (ValueError, IndexError, UnicodeDecodeError):
+        return None
+
+    return None
+
+
+def _encode_varint(value: int) -> bytes:
+    encoded = bytearray()
+    while True:
+        byte, value = value & 0x7F, value >> 7
+        if value == 0:
+            encoded.append(byte)
+            return bytes(encoded)
+        encoded.append(byte | 0x80)
+
+
+def _encode_field(number: int, value: bytes | int) -> bytes:
+    if isinstance(value, int):
+        return _encode_varint(number << 3 | _WIRE_TYPE_VARINT) + _encode_varint(value)
+    return _encode_varint(number << 3 | _WIRE_TYPE_LENGTH_DELIMITED) + _encode_varint(len(value)) + value
+
+
+def _decode_varint(data: bytes, position: int) -> tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        value |= (byte & 0x7F) << shift
+        position += 1
+        if not byte & 0x80:
+            return value, position
+        shift += 7
+
+
+def _decode_fields(data: bytes) -> list[tuple[int, bytes | int]]:
+    fields: list[tuple[int, bytes | int]] = []
+    position = 0
+    while position < len(data):
+        tag, position = _decode_varint(data, position)
+        number, wire_type = tag >> 3, tag & 0x7
+        if wire_type == _WIRE_TYPE_VARINT:
+            value, position = _decode_varint(data, position)
+            fields.append((number, value))
+        elif wire_type == _WIRE_TYPE_LENGTH_DELIMITED:
+            length, position = _decode_varint(data, position)
+            if position + length > len(data):
+                msg = "Truncated protobuf message"
+                raise ValueError(msg)
+            fields.append((number, data[position : position + length]))
+            position += length
+        else:
+            msg = f"Unsupported protobuf wire type {wire_type}"
+            raise ValueError(msg)
+
+    return fields
+
+
+def _connection_pool(url: str) -> _ConnectionPool:
+    # Pools are shared by all builds, so the connections stay alive across imports of several extensions
+    split_url = urllib.parse.urlsplit(url)
+    origin = f"{split_url.scheme}://{split_url.hostname}:{split_url.port}"
+
+    with _connection_pools_lock:
+        if origin not in _connection_pools:
+            _connection_pools[origin] = _ConnectionPool(url, timeout=_RemoteArtifactCache.timeout)
+        return _connection_pools[origin]
+
+
+def _temporary_archive(artifact_cache: _ArtifactCache, key: str) -> pathlib.Path:
+    return artifact_cache.directory / f".{key}.{os.getpid()}.{threading.get_ident()}.{uuid.uuid4().hex}.tar.tmp"
+
+
+_connection_pools: dict[str, _ConnectionPool] = {}
+_connection_pools_lock = threading.Lock()
+
+# Uploads are best-effort, so pending ones only get a bounded amount of time to finish before the interpreter exits
+_upload_worker: _DaemonWorker[bool] = _DaemonWorker("charonload-upload")
+
+
+@atexit.register
+def _wait_for_uploads() -> None:
+    _upload_worker.wait(timeout=_RemoteArtifactCache.exit_timeout)
@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+import codecs
+import collections
+import contextlib
+import contextvars
 import ctypes
 import enum
 import errno
@@ -10,20 +15,23 @@ import shutil
 import subprocess
 import sys
 from abc import ABC, abstractmethod
-from typing import IO, TYPE_CHECKING, Literal
+from typing import IO, TYPE_CHECKING, Any, Literal, TypeVar
 
 import colorama
 
 from ._errors import CommandNotFoundError
 
 if TYPE_CHECKING:  # pragma: no cover
-    from collections.abc import Iterable, Iterator
+    import pathlib
+    from collections.abc import Coroutine
     from types import TracebackType
 
     from ._compat.typing import Self
 
 colorama.just_fix_windows_console()
 
+_T = TypeVar("_T")
+
 
 class _StepStatus(enum.Enum):
     SUCCESSFUL = enum.auto()
@@ -36,7 +44,6 @@ class _Process(ABC):
     def __init__(
         self: Self,
         command_args: list[str],
-        encoding: str,
     ) -> None:  # pragma: no cover
         pass
 
@@ -53,10 +60,9 @@ class _Process(ABC):
     ) -> Literal[False]:  # pragma: no cover
         pass
 
-    @property
     @abstractmethod
-    def stdout(self: Self) -> IO[str]:  # pragma: no cover
-        pass
+    def read(self: Self, n: int) -> bytes:  # pragma: no cover
+        """Block until output is available and return up to ``n`` bytes of it, or ``b""`` at EOF."""
 
     @property
     @abstractmethod
@@ -65,103 +71,9 @@ class _Process(ABC):
 
 
 class _UnixPtyProcess(_Process):
-    class _SafeReadableIO(IO[str]):
-        def __init__(self: Self, stream: IO[str]) -> None:
-            self._stream = stream
-
-        @property
-        def mode(self: Self) -> str:
-            return self._stream.mode
-
-        @property
-        def name(self: Self) -> str:
-            return self._stream.name
-
-        def close(self: Self) -> None:
-            return self._stream.close()
-
-        @property
-        def closed(self: Self) -> bool:
-            return self._stream.closed
-
-        def fileno(self: Self) -> int:
-            return self._stream.fileno()
-
-        def flush(self: Self) -> None:
-            return self._stream.flush()
-
-        def isatty(self: Self) -> bool:
-            return self._stream.isatty()
-
-        def read(self: Self, n: int = -1) -> str:
-            try:
-                return self._stream.read(n)
-            except OSError as e:
-                if e.errno == errno.EIO:  # EIO also means EOF
-                    return ""
-                raise
-
-        def readable(self: Self) -> bool:
-            return self._stream.readable()
-
-        def readline(self: Self, limit: int = -1) -> str:
-            try:
-                return self._stream.readline(limit)
-            except OSError as e:
-                if e.errno == errno.EIO:  # EIO also means EOF
-                    return ""
-                raise
-
-        def readlines(self: Self, hint: int = -1) -> list[str]:
-            try:
-                return self._stream.readlines(hint)
-            except OSError as e:
-                if e.errno == errno.EIO:  # EIO also means EOF
-                    return []
-                raise
-
-        def seek(self: Self, offset: int, whence: int = 0) -> int:
-            return self._stream.seek(offset, whence)
-
-        def seekable(self: Self) -> bool:
-            return self._stream.seekable()
-
-        def tell(self: Self) -> int:
-            return self._stream.tell()
-
-        def truncate(self: Self, size: int | None = None) -> int:
-            return self._stream.truncate(size)
-
-        def writable(self: Self) -> bool:
-            return self._stream.writable()
-
-        def write(self: Self, s: str) -> int:
-            return self._stream.write(s)
-
-        def writelines(self: Self, lines: Iterable[str]) -> None:
-            return self._stream.writelines(lines)
-
-        def __enter__(self: Self) -> IO[str]:
-            return self._stream.__enter__()
-
-        def __exit__(
-            self: Self,
-            exc_type: type[BaseException] | None,
-            exc_value: BaseException | None,
-            exc_tb: TracebackType | None,
-        ) -> None:
-            return self._stream.__exit__(exc_type, exc_value, exc_tb)
-
-        def __iter__(self: Self) -> Iterator[str]:
-            return self._stream.__iter__()
-
-        def __next__(self: Self) -> str:
-            return self._stream.__next__()
-
     def __init__(
         self: Self,
         command_args: list[str],
-        encoding: str,
     ) -> None:
         self._m, self._s = os.openpty()
         self._p = subprocess.Popen(
@@ -171,10 +83,8 @@ class _UnixPtyProcess(_Process):
         )
         # _s is now opened in both this process and _p. Reading from _m will block indefinitely unless *all* _s are
         # closed, so close ours first and wait until _p closes its own one. Reading from _m when both _s are closed
-        # may cases a EIF error which should be caught.
+        # may cases a EIO error which should be caught.
         os.close(self._s)
-        # This reopens _m, so manually closing before is not needed.
-        self._stdout = _UnixPtyProcess._SafeReadableIO(os.fdopen(self._m, encoding=encoding))
 
     def __enter__(self: Self) -> Self:
         self._p.__enter__()  # Only returns p, so just call for completeness
@@ -187,12 +97,16 @@ class _UnixPtyProcess(_Process):
         exc_tb: TracebackType | None,
     ) -> Literal[False]:
         self._p.__exit__(exc_type, exc_value, exc_tb)
-        self._stdout.close()
+        os.close(self._m)
         return False
 
-    @property
-    def stdout(self: Self) -> IO[str]:
-        return self._stdout
+    def read(self: Self, n: int) -> bytes:
+        try:
+            return os.read(self._m, n)
+        except OSError as e:
+            if e.errno == errno.EIO:  # EIO also means EOF
+                return b""
+            raise
 
     @property
     def returncode(self: Self) -> int:
@@ -203,13 +117,11 @@ class _PipedProcess(_Process):
     def __init__(
         self: Self,
         command_args: list[str],
-        encoding: str,
     ) -> None:
         self._p = subprocess.Popen(
             command_args,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            encoding=encoding,
         )
 
     def __enter__(self: Self) -> Self:
@@ -225,20 +137,83 @@ class _PipedProcess(_Process):
         self._p.__exit__(exc_type, exc_value, exc_tb)
         return False
 
+    def read(self: Self, n: int) -> bytes:
+        assert self._p.stdout is not None  # noqa: S101
+        # Bypass the buffered reader to get whatever is available without waiting for n bytes
+        return os.read(self._p.stdout.fileno(), n)
+
     @property
-    def stdout(self: Self) -> IO[str]:
+    def returncode(self: Self) -> int:
+        return self._p.returncode
+
+
+class _AsyncioProcess(_Process):
+    def __init__(
+        self: Self,
+        command_args: list[str],
+    ) -> None:
+        loop = _running_event_loop()
+        assert loop is not None  # noqa: S101
+        self._loop = loop
+        self._p = self._call(
+            asyncio.create_subprocess_exec(
+                *command_args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+        )
+
+    def __enter__(self: Self) -> Self:
+        return self
+
+    def __exit__(
+        self: Self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> Literal[False]:
+        self._call(self._p.wait())
+        return False
+
+    def read(self: Self, n: int) -> bytes:
         assert self._p.stdout is not None  # noqa: S101
-        return self._p.stdout
+        return self._call(self._p.stdout.read(n))
 
     @property
     def returncode(self: Self) -> int:
+        assert self._p.returncode is not None  # noqa: S101
         return self._p.returncode
 
+    def _call(self: Self, coro: Coroutine[Any, Any, _T]) -> _T:
+        # Only the subprocess I/O runs on the event loop, while processing the output stays in the calling thread
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+
+_event_loop: contextvars.ContextVar[asyncio.AbstractEventLoop | None] = contextvars.ContextVar(
+    "_event_loop", default=None
+)
+"""The event loop on which subprocesses should be executed when running in a worker thread of that loop."""
+
+
+def _running_event_loop() -> asyncio.AbstractEventLoop | None:
+    loop = _event_loop.get()
+    if loop is None or loop.is_closed():
+        return None
+
+    # Blocking on the loop from within its own thread would deadlock
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return loop
+    return None
+
 
 def _process_cls(
     *,
     output_streams: list[IO[str]],
 ) -> type[_Process]:
+    if _running_event_loop() is not None:
+        return _AsyncioProcess
     if platform.system() != "Windows" and all(o.isatty() for o in output_streams):
         return _UnixPtyProcess
     return _PipedProcess
@@ -248,6 +223,7 @@ def _run(
     *,
     command_args: list[str],
     verbose: bool = True,
+    log_file: pathlib.Path | None = None,
 ) -> tuple[_StepStatus, str | None]:
     command_args = _find_full_command_path(command_args)
 
@@ -261,14 +237,21 @@ def _run(
     # Windows: Use windll instead of cdll call strategy since GetConsoleOutputCP is flagged with WINAPI/__stdcall
     encoding = "utf-8" if platform.system() != "Windows" else f"cp{ctypes.windll.kernel32.GetConsoleOutputCP()}"  # type: ignore[attr-defined]
 
-    p_output = io.StringIO()
+    p_output = _TailBuffer()
     output_streams: list[IO[str]] = [sys.stdout] if verbose else [p_output]
 
-    with _process_cls(output_streams=output_streams)(command_args, encoding) as p:
-        _incrementally_read_text_stream(
-            input_stream=p.stdout,
-            output_streams=output_streams,
-        )
+    with contextlib.ExitStack() as stack:
+        # Spill the full log to disk and only keep its tail in memory
+        if log_file is not None:
+            log_file.parent.mkdir(parents=True, exist_ok=True)
+            output_streams.append(stack.enter_context(log_file.open("w", encoding="utf-8")))
+
+        with _process_cls(output_streams=output_streams[:1])(command_args) as p:
+            _pump_output(
+                process=p,
+                encoding=encoding,
+                output_streams=output_streams,
+            )
 
     return (
         _StepStatus.SUCCESSFUL if p.returncode == 0 else _StepStatus.FAILED,
@@ -281,8 +264,13 @@ def _run_if(
     condition: bool,
     command_args: list[str],
     verbose: bool = True,
+    log_file: pathlib.Path | None = None,
 ) -> tuple[_StepStatus, str | None]:
-    return _run(command_args=command_args, verbose=verbose) if condition else (_StepStatus.SKIPPED, None)
+    return (
+        _run(command_args=command_args, verbose=verbose, log_file=log_file)
+        if condition
+        else (_StepStatus.SKIPPED, None)
+    )
 
 
 def _find_full_command_path(command_args: list[str]) -> list[str]:
@@ -292,8 +280,48 @@ def _find_full_command_path(command_args: list[str]) -> list[str]:
     return [full_command_path, *command_args[1:]]
 
 
-def _incrementally_read_text_stream(input_stream: IO[str], output_streams: list[IO[str]]) -> None:
-    while output_line := input_stream.read(1):
-        for o in output_streams:
-            o.write(output_line)
-            o.flush()
+class _TailBuffer(io.StringIO):
+    """Text stream which only keeps the last ``max_size`` characters written to it."""
+
+    def __init__(self: Self, max_size: int = 64 * 1024) -> None:
+        super().__init__()
+        self.max_size = max_size
+        self._chunks: collections.deque[str] = collections.deque()
+        self._size = 0
+
+    def write(self: Self, s: str) -> int:
+        self._chunks.append(s)
+        self._size += len(s)
+
+        while self._size - len(self._chunks[0]) >= self.max_size:
+            self._size -= len(self._chunks.popleft())
+
+        return len(s)
+
+    def getvalue(self: Self) -> str:
+        return "".join(self._chunks)[-self.max_size :]
+
+
+_PUMP_CHUNK_SIZE = 64 * 1024
+
+
+def _pump_output(*, process: _Process, encoding: str, output_streams: list[IO[str]]) -> None:
+    # Forward whole chunks as soon as they arrive to keep the output interactive without per-character overhead.
+    # Universal newline translation matches reading the output in text mode, e.g. "\r\n" written by a pty.
+    decoder = io.IncrementalNewlineDecoder(
+        codecs.getincrementaldecoder(encoding)(errors="replace"),
+        translate=True,
+    )
+
+    while chunk := process.read(_PUMP_CHUNK_SIZE):
+        _write_output(decoder.decode(chunk), output_streams)
+    _write_output(decoder.decode(b"", final=True), output_streams)
+
+
+def _write_output(text: str, output_streams: list[IO[str]]) -> None:
+    if not text:
+        return
+
+    for o in output_streams:
+        o.write(text)
+        o.flush()
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import contextlib
+import dataclasses
+import json
+import os
+import pathlib
+import platform
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if platform.system() != "Windows":
+    import resource
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Iterator
+
+    from ._compat.typing import Self
+
+
+@dataclass
+class Span:
+    """
+    Timing and resource record of a single step of the JIT compilation of an extension.
+
+    Resource usage is measured via ``getrusage(RUSAGE_CHILDREN)`` which covers all terminated subprocesses of the
+    current process. Hence, spans of concurrently running builds may also include the usage of each other.
+    """
+
+    module_name: str
+    """The name of the extension."""
+
+    name: str
+    """The name of the recorded step, e.g. ``"Build"``."""
+
+    start_time: float
+    """The start of the step in seconds since the epoch."""
+
+    wall_time: float
+    """The elapsed wall time of the step in seconds."""
+
+    child_cpu_time: float | None
+    """The user and system CPU time in seconds spent in subprocesses during the step, or ``None`` if unsupported."""
+
+    child_max_rss: int | None
+    """The peak resident set size in bytes of the largest subprocess so far, or ``None`` if unsupported."""
+
+    skipped: bool
+    """Whether the step was skipped, e.g. since its results were already up to date."""
+
+    pid: int
+    """The ID of the process which executed the step."""
+
+    thread_id: int
+    """The ID of the thread which executed the step."""
+
+
+class SpanRecorder:
+    """
+    Collection of recorded :class:`Span` instances of all JIT compilations in the current process.
+
+    Recording is thread-safe, so concurrent builds, e.g. via :func:`build_all`, are recorded as well.
+    """
+
+    def __init__(self: Self) -> None:
+        """Create an empty recorder."""
+        self._spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    @property
+    def spans(self: Self) -> list[Span]:
+        """A copy of all recorded spans in the order of their completion."""
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self: Self) -> None:
+        """Remove all recorded spans."""
+        with self._lock:
+            self._spans.clear()
+
+    def to_json(self: Self) -> str:
+        """
+        Serialize all recorded spans into a JSON array.
+
+        Returns
+        -------
+        str
+            The JSON representation of the spans.
+        """
+        return json.dumps([dataclasses.asdict(s) for s in self.spans], indent=2)
+
+    def to_chrome_trace(self: Self) -> str:
+        """
+        Serialize all recorded spans into the Chrome Trace Event format.
+
+        The result can be inspected via ``chrome://tracing`` or `Perfetto <https://ui.perfetto.dev>`_.
+
+        Returns
+        -------
+        str
+            The JSON representation of the trace.
+        """
+        trace_events = [
+            {
+                "name": s.name,
+                "cat": s.module_name,
+                "ph": "X",
+                "ts": 1e6 * s.start_time,
+                "dur": 1e6 * s.wall_time,
+                "pid": s.pid,
+                "tid": s.thread_id,
+                "args": {
+                    "module_name": s.module_name,
+                    "child_cpu_time": s.child_cpu_time,
+                    "child_max_rss": s.child_max_rss,
+                    "skipped": s.skipped,
+                },
+            }
+            for s in self.spans
+        ]
+        return json.dumps({"traceEvents": trace_events, "displayTimeUnit": "ms"}, indent=2)
+
+    def export_json(self: Self, file: pathlib.Path | str) -> None:
+        """
+        Write all recorded spans into a JSON file.
+
+        Parameters
+        ----------
+        file
+            The path of the output file.
+        """
+        pathlib.Path(file).write_text(self.to_json())
+
+    def export_chrome_trace(self: Self, file: pathlib.Path | str) -> None:
+        """
+        Write all recorded spans into a Chrome trace file.
+
+        Parameters
+        ----------
+        file
+            The path of the output file.
+        """
+        pathlib.Path(file).write_text(self.to_chrome_trace())
+
+    @contextlib.contextmanager
+    def _record(self: Self, module_name: str, name: str) -> Iterator[_SpanBuilder]:
+        builder = _SpanBuilder()
+        start_time = time.time()
+        t_start = time.perf_counter()
+        child_cpu_time_start, _ = _child_resource_usage()
+        try:
+            yield builder
+        finally:
+            t_end = time.perf_counter()
+            child_cpu_time_end, child_max_rss = _child_resource_usage()
+
+            span = Span(
+                module_name=module_name,
+                name=name,
+                start_time=start_time,
+                wall_time=t_end - t_start,
+                child_cpu_time=(
+                    child_cpu_time_end - child_cpu_time_start
+                    if child_cpu_time_start is not None and child_cpu_time_end is not None
+                    else None
+                ),
+                child_max_rss=child_max_rss,
+                skipped=builder.skipped,
+                pid=os.getpid(),
+                thread_id=threading.get_ident(),
+            )
+            with self._lock:
+                self._spans.append(span)
+
+
+class _SpanBuilder:
+    def __init__(self: Self) -> None:
+        self.skipped = False
+
+
+def _child_resource_usage() -> tuple[float | None, int | None]:
+    if platform.system() == "Windows":  # pragma: no cover
+        return None, None
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    max_rss_unit = 1 if sys.platform == "darwin" else 1024  # Bytes on macOS, kilobytes otherwise
+    return usage.ru_utime + usage.ru_stime, usage.ru_maxrss * max_rss_unit
+
+
+span_recorder: SpanRecorder = SpanRecorder()
+"""
+The :class:`SpanRecorder` instance collecting the timing and resource usage of all JIT compilation steps.
+
+Each executed step, the waiting time for the build lock, and the total loading time of each extension are recorded.
+"""
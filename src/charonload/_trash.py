@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import concurrent.futures
+import os
+import shutil
+import threading
+import uuid
+from typing import TYPE_CHECKING
+
+from ._worker import _DaemonWorker
+
+if TYPE_CHECKING:  # pragma: no cover
+    import pathlib
+
+    from ._compat.typing import Self
+
+
+class _Trash:
+    """
+    Directory collecting files and directories which are deleted in the background.
+
+    Moving an entry into the trash is a single rename on the same file system, regardless of its size, so the caller
+    can continue right away while the actual deletion is deferred to a daemon thread. Entries left behind, e.g. by a
+    process which exited before the deletion finished, are deleted the next time the trash is emptied.
+    """
+
+    def __init__(self: Self, directory: pathlib.Path) -> None:
+        self.directory = directory
+
+    def move(self: Self, path: pathlib.Path) -> None:
+        """Move ``path`` into the trash, or delete it right away if it cannot be renamed."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        trash_path = self.directory / f"{os.getpid()}.{threading.get_ident()}.{uuid.uuid4().hex}"
+        try:
+            path.rename(trash_path)
+        except OSError:
+            # E.g. files which are still opened by another process on Windows
+            _remove(path)
+
+    def empty(self: Self) -> concurrent.futures.Future[int]:
+        """Delete all entries of the trash in the background."""
+        if not self.directory.exists() or next(self.directory.iterdir(), None) is None:
+            future: concurrent.futures.Future[int] = concurrent.futures.Future()
+            future.set_result(0)
+            return future
+
+        return _deletion_worker.submit(self._empty)
+
+    def _empty(self: Self) -> int:
+        if not self.directory.exists():
+            return 0
+
+        number_removed_entries = 0
+        for path in self.directory.iterdir():
+            # Other processes may empty the same trash concurrently
+            _remove(path)
+            number_removed_entries += 1
+
+        return number_removed_entries
+
+
+def _remove(path: pathlib.Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+# Pending deletions never delay the exit of the interpreter, and the entries left behind are deleted next time
+_deletion_worker: _DaemonWorker[int] = _DaemonWorker("charonload-trash")
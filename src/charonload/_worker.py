@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import concurrent.futures
+import queue
+import threading
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Callable
+
+    from ._compat.typing import Self
+
+_T = TypeVar("_T")
+
+
+class _DaemonWorker(Generic[_T]):
+    """
+    Daemon thread executing the submitted functions one after another.
+
+    In contrast to a :class:`concurrent.futures.ThreadPoolExecutor`, the thread is not joined when the interpreter
+    exits, so pending work never delays the exit. Callers which want to finish the pending work nevertheless may wait
+    for it with a bounded timeout.
+    """
+
+    def __init__(self: Self, name: str) -> None:
+        self.name = name
+        self.queue: queue.SimpleQueue[tuple[concurrent.futures.Future[_T], Callable[[], _T]]] = queue.SimpleQueue()
+        self.pending: set[concurrent.futures.Future[_T]] = set()
+        self.thread: threading.Thread | None = None
+        self.lock = threading.Lock()
+
+    def submit(self: Self, func: Callable[[], _T]) -> concurrent.futures.Future[_T]:
+        future: concurrent.futures.Future[_T] = concurrent.futures.Future()
+
+        with self.lock:
+            self.pending.add(future)
+            self.queue.put((future, func))
+
+            # The thread does not survive forking, so a child process starts its own one
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self.thread.start()
+
+        future.add_done_callback(self._discard)
+        return future
+
+    def wait(self: Self, timeout: float) -> bool:
+        """Wait for all pending work up to ``timeout`` seconds, and return whether it has been finished."""
+        with self.lock:
+            pending = list(self.pending)
+
+        _, not_done = concurrent.futures.wait(pending, timeout=timeout)
+        return not not_done
+
+    def _discard(self: Self, future: concurrent.futures.Future[_T]) -> None:
+        with self.lock:
+            self.pending.discard(future)
+
+    def _run(self: Self) -> None:
+        while True:
+            future, func = self.queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func())
+            except BaseException as e:  # noqa: BLE001
+                future.set_exception(e)
@@ -133,6 +133,9 @@ unset(CHARONLOAD_CUDA_NVCC_FLAGS)
 unset(CHARONLOAD_CMAKE_CUDA_FLAGS)
 
 
+include("${CMAKE_CURRENT_LIST_DIR}/torch/detection_cache.cmake")
+charonload_load_detection_cache()
+
 include("${CMAKE_CURRENT_LIST_DIR}/torch/cxx_standard.cmake")
 charonload_detect_torch_cxx_standard()
 
@@ -145,8 +148,24 @@ charonload_detect_cuda_version()
 include("${CMAKE_CURRENT_LIST_DIR}/torch/cudart_type.cmake")
 charonload_detect_cudart_type()
 
+charonload_store_detection_cache()
+
+
+include("${CMAKE_CURRENT_LIST_DIR}/linker.cmake")
+charonload_detect_linker()
+
+include("${CMAKE_CURRENT_LIST_DIR}/split_debug_info.cmake")
+charonload_detect_split_debug_info()
+
+include("${CMAKE_CURRENT_LIST_DIR}/cpu_target.cmake")
+charonload_detect_cpu_target()
+
+include("${CMAKE_CURRENT_LIST_DIR}/pgo.cmake")
+charonload_detect_pgo()
+
 
 include("${CMAKE_CURRENT_LIST_DIR}/torch/add_torch_library.cmake")
+include("${CMAKE_CURRENT_LIST_DIR}/torch/add_isa_dispatch.cmake")
 
 
 charonload_message(STATUS "")
@@ -0,0 +1,36 @@
+function(charonload_detect_cpu_target)
+    # Only specialize for a CPU if requested, e.g. by charonload when JIT compiling
+    if(NOT CHARONLOAD_CPU_TARGET OR CHARONLOAD_CPU_TARGET STREQUAL "none")
+        set(CHARONLOAD_CPU_TARGET_OPTION "" CACHE INTERNAL "Compile option for the CPU target of charonload" FORCE)
+        return()
+    endif()
+
+    if(NOT CMAKE_CXX_COMPILER_ID MATCHES "GNU|Clang")
+        message(FATAL_ERROR "Specializing for the CPU target \"${CHARONLOAD_CPU_TARGET}\" is not supported by the ${CMAKE_CXX_COMPILER_ID} compiler.")
+    endif()
+
+    include(CheckCXXCompilerFlag)
+
+    # The result is cached, so each target is only checked once per build directory
+    string(MAKE_C_IDENTIFIER ${CHARONLOAD_CPU_TARGET} CPU_TARGET_IDENTIFIER)
+    string(TOUPPER ${CPU_TARGET_IDENTIFIER} CPU_TARGET_IDENTIFIER)
+    set(CMAKE_REQUIRED_QUIET ${charonload_FIND_QUIETLY})
+    check_cxx_compiler_flag("-march=${CHARONLOAD_CPU_TARGET}" CHARONLOAD_CPU_TARGET_${CPU_TARGET_IDENTIFIER}_SUPPORTED)
+    if(NOT CHARONLOAD_CPU_TARGET_${CPU_TARGET_IDENTIFIER}_SUPPORTED)
+        message(FATAL_ERROR "CPU target \"${CHARONLOAD_CPU_TARGET}\" is not supported by the ${CMAKE_CXX_COMPILER_ID} compiler ${CMAKE_CXX_COMPILER_VERSION}.")
+    endif()
+
+    set(CHARONLOAD_CPU_TARGET_OPTION "-march=${CHARONLOAD_CPU_TARGET}" CACHE INTERNAL "Compile option for the CPU target of charonload" FORCE)
+    charonload_message(STATUS "CPU target: ${CHARONLOAD_CPU_TARGET}")
+endfunction()
+
+
+function(charonload_set_cpu_target name)
+    if(NOT CHARONLOAD_CPU_TARGET_OPTION)
+        return()
+    endif()
+
+    # Host code of CUDA sources is specialized as well
+    target_compile_options(${name} PRIVATE "$<$<COMPILE_LANGUAGE:CXX>:${CHARONLOAD_CPU_TARGET_OPTION}>"
+                                           "$<$<COMPILE_LANGUAGE:CUDA>:-Xcompiler=${CHARONLOAD_CPU_TARGET_OPTION}>")
+endfunction()
@@ -0,0 +1,49 @@
+function(charonload_detect_linker)
+    # Only select a linker if requested, e.g. by charonload when JIT compiling, and never override the user's choice
+    if(NOT DEFINED CHARONLOAD_LINKER OR CHARONLOAD_LINKER STREQUAL "default" OR DEFINED CMAKE_LINKER_TYPE
+       OR NOT CMAKE_CXX_COMPILER_ID MATCHES "GNU|Clang")
+        set(CHARONLOAD_LINKER_TYPE "default" CACHE INTERNAL "Linker used for targets created by charonload" FORCE)
+        return()
+    endif()
+
+    if(CHARONLOAD_LINKER STREQUAL "auto")
+        set(LINKER_CANDIDATES mold lld)
+    else()
+        set(LINKER_CANDIDATES ${CHARONLOAD_LINKER})
+    endif()
+
+    include(CheckLinkerFlag)
+
+    set(LINKER_TYPE "default")
+    foreach(linker IN LISTS LINKER_CANDIDATES)
+        string(TOUPPER ${linker} LINKER_UPPER)
+
+        # The result is cached, so each linker is only checked once per build directory
+        set(CMAKE_REQUIRED_QUIET ${charonload_FIND_QUIETLY})
+        check_linker_flag(CXX "-fuse-ld=${linker}" CHARONLOAD_LINKER_${LINKER_UPPER}_SUPPORTED)
+        if(CHARONLOAD_LINKER_${LINKER_UPPER}_SUPPORTED)
+            set(LINKER_TYPE ${linker})
+            break()
+        endif()
+    endforeach()
+
+    if(LINKER_TYPE STREQUAL "default" AND NOT CHARONLOAD_LINKER STREQUAL "auto")
+        message(FATAL_ERROR "Requested linker \"${CHARONLOAD_LINKER}\" is not supported by the ${CMAKE_CXX_COMPILER_ID} compiler.")
+    endif()
+
+    set(CHARONLOAD_LINKER_TYPE ${LINKER_TYPE} CACHE INTERNAL "Linker used for targets created by charonload" FORCE)
+    charonload_message(STATUS "Selected linker: ${CHARONLOAD_LINKER_TYPE}")
+endfunction()
+
+
+function(charonload_set_linker name)
+    get_target_property(NAME_TYPE ${name} TYPE)
+    get_target_property(NAME_LINKER_TYPE ${name} LINKER_TYPE)
+    if(NOT CHARONLOAD_LINKER_TYPE OR CHARONLOAD_LINKER_TYPE STREQUAL "default" OR NAME_TYPE STREQUAL "STATIC_LIBRARY"
+       OR NOT NAME_LINKER_TYPE MATCHES "NOTFOUND")
+        return()
+    endif()
+
+    # Targets consisting only of CUDA sources are linked by nvcc which does not understand the flag
+    target_link_options(${name} PRIVATE "$<$<LINK_LANGUAGE:CXX>:-fuse-ld=${CHARONLOAD_LINKER_TYPE}>")
+endfunction()
@@ -0,0 +1,108 @@
+function(charonload_detect_pgo)
+    # Only instrument or optimize if requested, e.g. by charonload when JIT compiling
+    if(NOT CHARONLOAD_PGO OR CHARONLOAD_PGO STREQUAL "none")
+        set(CHARONLOAD_PGO_COMPILE_OPTIONS "" CACHE INTERNAL "Compile options for profile-guided optimization" FORCE)
+        set(CHARONLOAD_PGO_LINK_OPTIONS "" CACHE INTERNAL "Link options for profile-guided optimization" FORCE)
+        return()
+    endif()
+
+    if(NOT CHARONLOAD_PGO MATCHES "^(generate|use)$")
+        message(FATAL_ERROR "Invalid profile-guided optimization mode \"${CHARONLOAD_PGO}\": Expected \"generate\" or \"use\".")
+    endif()
+
+    if(NOT DEFINED CHARONLOAD_PGO_PROFILE_DIRECTORY)
+        message(FATAL_ERROR "Profile-guided optimization requires CHARONLOAD_PGO_PROFILE_DIRECTORY to be set.")
+    endif()
+
+    if(NOT CMAKE_CXX_COMPILER_ID MATCHES "GNU|Clang")
+        message(FATAL_ERROR "Profile-guided optimization is not supported by the ${CMAKE_CXX_COMPILER_ID} compiler.")
+    endif()
+
+    set(PROFILE_DIRECTORY ${CHARONLOAD_PGO_PROFILE_DIRECTORY})
+
+    if(CMAKE_CXX_COMPILER_ID STREQUAL "GNU")
+        # Name the profiles relative to the build directory, so the instrumented and the optimized build can share them
+        set(PROFILE_PREFIX_OPTION "-fprofile-prefix-path=${CMAKE_BINARY_DIR}")
+
+        if(CHARONLOAD_PGO STREQUAL "generate")
+            set(COMPILE_OPTIONS "-fprofile-generate=${PROFILE_DIRECTORY}" ${PROFILE_PREFIX_OPTION} "-fprofile-update=atomic")
+            set(LINK_OPTIONS "-fprofile-generate=${PROFILE_DIRECTORY}")
+        else()
+            # Profiles of multi-threaded workloads may be slightly inconsistent and sources without profiles are fine
+            set(COMPILE_OPTIONS "-fprofile-use=${PROFILE_DIRECTORY}" ${PROFILE_PREFIX_OPTION} "-fprofile-correction"
+                                "-Wno-missing-profile")
+            set(LINK_OPTIONS "")
+        endif()
+    else()
+        if(CHARONLOAD_PGO STREQUAL "generate")
+            set(COMPILE_OPTIONS "-fprofile-generate=${PROFILE_DIRECTORY}" "-fprofile-update=atomic")
+            set(LINK_OPTIONS "-fprofile-generate=${PROFILE_DIRECTORY}")
+        else()
+            charonload_merge_clang_profiles(${PROFILE_DIRECTORY} PROFILE_DATA)
+            if(PROFILE_DATA)
+                set(COMPILE_OPTIONS "-fprofile-use=${PROFILE_DATA}" "-Wno-profile-instr-unprofiled"
+                                    "-Wno-profile-instr-out-of-date")
+            else()
+                set(COMPILE_OPTIONS "")
+            endif()
+            set(LINK_OPTIONS "")
+        endif()
+    endif()
+
+    if(CHARONLOAD_PGO STREQUAL "generate")
+        include(CheckCXXCompilerFlag)
+
+        # The result is cached, so the flags are only checked once per build directory
+        set(CMAKE_REQUIRED_QUIET ${charonload_FIND_QUIETLY})
+        set(CMAKE_REQUIRED_LINK_OPTIONS ${LINK_OPTIONS})
+        check_cxx_compiler_flag("${COMPILE_OPTIONS}" CHARONLOAD_PGO_GENERATE_SUPPORTED)
+        if(NOT CHARONLOAD_PGO_GENERATE_SUPPORTED)
+            message(FATAL_ERROR "Profile-guided optimization is not supported by the ${CMAKE_CXX_COMPILER_ID} compiler ${CMAKE_CXX_COMPILER_VERSION}.")
+        endif()
+    endif()
+
+    set(CHARONLOAD_PGO_COMPILE_OPTIONS "${COMPILE_OPTIONS}" CACHE INTERNAL "Compile options for profile-guided optimization" FORCE)
+    set(CHARONLOAD_PGO_LINK_OPTIONS "${LINK_OPTIONS}" CACHE INTERNAL "Link options for profile-guided optimization" FORCE)
+    charonload_message(STATUS "Profile-guided optimization: ${CHARONLOAD_PGO} (${PROFILE_DIRECTORY})")
+endfunction()
+
+
+function(charonload_merge_clang_profiles profile_directory output_profile_data)
+    set(PROFILE_DATA "${profile_directory}/merged.profdata")
+
+    # The raw profiles of all runs of the instrumented extension are merged each time the optimized build is configured
+    file(GLOB RAW_PROFILES "${profile_directory}/*.profraw")
+    if(RAW_PROFILES)
+        get_filename_component(COMPILER_DIRECTORY ${CMAKE_CXX_COMPILER} DIRECTORY)
+        string(REGEX MATCH "^[0-9]+" COMPILER_VERSION_MAJOR ${CMAKE_CXX_COMPILER_VERSION})
+        find_program(CHARONLOAD_LLVM_PROFDATA NAMES llvm-profdata llvm-profdata-${COMPILER_VERSION_MAJOR}
+                                              HINTS ${COMPILER_DIRECTORY})
+        if(NOT CHARONLOAD_LLVM_PROFDATA)
+            message(FATAL_ERROR "Merging the profiles of profile-guided optimization requires llvm-profdata.")
+        endif()
+
+        execute_process(COMMAND ${CHARONLOAD_LLVM_PROFDATA} merge "-output=${PROFILE_DATA}" ${RAW_PROFILES}
+                        RESULT_VARIABLE MERGE_RESULT)
+        if(NOT MERGE_RESULT EQUAL 0)
+            message(FATAL_ERROR "Merging the profiles of profile-guided optimization failed.")
+        endif()
+    endif()
+
+    if(EXISTS ${PROFILE_DATA})
+        set(${output_profile_data} ${PROFILE_DATA} PARENT_SCOPE)
+    else()
+        set(${output_profile_data} "" PARENT_SCOPE)
+    endif()
+endfunction()
+
+
+function(charonload_set_pgo name)
+    if(CHARONLOAD_PGO_COMPILE_OPTIONS)
+        target_compile_options(${name} PRIVATE "$<$<COMPILE_LANGUAGE:CXX>:${CHARONLOAD_PGO_COMPILE_OPTIONS}>")
+    endif()
+
+    get_target_property(NAME_TYPE ${name} TYPE)
+    if(CHARONLOAD_PGO_LINK_OPTIONS AND NOT NAME_TYPE MATCHES "STATIC_LIBRARY|OBJECT_LIBRARY")
+        target_link_options(${name} PRIVATE "$<$<LINK_LANGUAGE:CXX>:${CHARONLOAD_PGO_LINK_OPTIONS}>")
+    endif()
+endfunction()
@@ -1,4 +1,8 @@
 function(charonload_determine_prefix_paths)
+    if(DEFINED CACHE{CHARONLOAD_PREFIX_PATH})
+        return()
+    endif()
+
     charonload_message(CHECK_START "Determining prefix paths used for finding dependencies ...")
     execute_process(COMMAND ${Python_EXECUTABLE} "-c" "
 import pathlib
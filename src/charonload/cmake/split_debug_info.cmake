@@ -0,0 +1,53 @@
+function(charonload_detect_split_debug_info)
+    # Only split debug information if requested, e.g. by charonload when JIT compiling
+    if(NOT CHARONLOAD_SPLIT_DEBUG_INFO OR NOT CMAKE_CXX_COMPILER_ID MATCHES "GNU|Clang" OR APPLE OR WIN32)
+        set(CHARONLOAD_SPLIT_DEBUG_INFO_ENABLED OFF CACHE INTERNAL "Split debug information of targets created by charonload" FORCE)
+        set(CHARONLOAD_COMPRESS_DEBUG_SECTIONS_ENABLED OFF CACHE INTERNAL "Compress debug sections of targets created by charonload" FORCE)
+        return()
+    endif()
+
+    include(CheckCXXCompilerFlag)
+    include(CheckLinkerFlag)
+
+    # The results are cached, so the flags are only checked once per build directory
+    set(CMAKE_REQUIRED_QUIET ${charonload_FIND_QUIETLY})
+    check_cxx_compiler_flag("-gsplit-dwarf" CHARONLOAD_SPLIT_DWARF_SUPPORTED)
+
+    # Support for compressing depends on the linker selected by charonload_detect_linker()
+    if(CHARONLOAD_LINKER_TYPE AND NOT CHARONLOAD_LINKER_TYPE STREQUAL "default")
+        set(CMAKE_REQUIRED_LINK_OPTIONS "-fuse-ld=${CHARONLOAD_LINKER_TYPE}")
+        string(TOUPPER ${CHARONLOAD_LINKER_TYPE} LINKER_UPPER)
+    else()
+        set(LINKER_UPPER "DEFAULT")
+    endif()
+    check_linker_flag(CXX "-Wl,--compress-debug-sections=zlib" CHARONLOAD_COMPRESS_DEBUG_SECTIONS_${LINKER_UPPER}_SUPPORTED)
+
+    set(SPLIT_DEBUG_INFO_ENABLED OFF)
+    set(COMPRESS_DEBUG_SECTIONS_ENABLED OFF)
+    if(CHARONLOAD_SPLIT_DWARF_SUPPORTED)
+        set(SPLIT_DEBUG_INFO_ENABLED ON)
+    endif()
+    if(CHARONLOAD_COMPRESS_DEBUG_SECTIONS_${LINKER_UPPER}_SUPPORTED)
+        set(COMPRESS_DEBUG_SECTIONS_ENABLED ON)
+    endif()
+
+    set(CHARONLOAD_SPLIT_DEBUG_INFO_ENABLED ${SPLIT_DEBUG_INFO_ENABLED} CACHE INTERNAL "Split debug information of targets created by charonload" FORCE)
+    set(CHARONLOAD_COMPRESS_DEBUG_SECTIONS_ENABLED ${COMPRESS_DEBUG_SECTIONS_ENABLED} CACHE INTERNAL "Compress debug sections of targets created by charonload" FORCE)
+    charonload_message(STATUS "Split debug information: ${CHARONLOAD_SPLIT_DEBUG_INFO_ENABLED} (compressed: ${CHARONLOAD_COMPRESS_DEBUG_SECTIONS_ENABLED})")
+endfunction()
+
+
+function(charonload_set_split_debug_info name)
+    # Only configurations with debug information are affected
+    set(DEBUG_CONFIGS "$<CONFIG:Debug,RelWithDebInfo>")
+
+    # The debug information stays in .dwo files next to the object files, so linking and hashing the extension is faster
+    if(CHARONLOAD_SPLIT_DEBUG_INFO_ENABLED)
+        target_compile_options(${name} PRIVATE "$<$<AND:$<COMPILE_LANGUAGE:CXX>,${DEBUG_CONFIGS}>:-gsplit-dwarf>")
+    endif()
+
+    get_target_property(NAME_TYPE ${name} TYPE)
+    if(CHARONLOAD_COMPRESS_DEBUG_SECTIONS_ENABLED AND NOT NAME_TYPE MATCHES "STATIC_LIBRARY|OBJECT_LIBRARY")
+        target_link_options(${name} PRIVATE "$<$<AND:$<LINK_LANGUAGE:CXX>,${DEBUG_CONFIGS}>:-Wl,--compress-debug-sections=zlib>")
+    endif()
+endfunction()
@@ -0,0 +1,303 @@
+#[[.rst:
+.. cmake:command:: charonload_add_isa_dispatch
+
+  .. code-block:: cmake
+
+    charonload_add_isa_dispatch(<target> NAMESPACE <namespace> KERNELS <kernels> SOURCES <source>...
+                                [ISAS <isa>...])
+
+  Compiles the C++ sources ``<source>...`` several times into the existing target ``<target>``, e.g. created via
+  :cmake:command:`charonload_add_torch_library`, once for the baseline instruction set of the target and once for each
+  of the instruction sets ``<isa>...``, and generates the glue code that dispatches to the best supported copy at
+  runtime. This allows a single extension to run at peak speed on machines with different CPUs. The following
+  instruction sets are supported (default: ``avx2 avx512``):
+
+  - ``avx2``: AVX2, FMA, BMI1, BMI2, POPCNT, and SSE4.2 (roughly ``x86-64-v3``)
+  - ``avx512``: ``avx2`` and AVX-512 F, BW, CD, DQ, and VL (roughly ``x86-64-v4``)
+
+  Instruction sets are only compiled for x86-64 with GCC or Clang. Otherwise, or if the compiler does not support
+  them, only the baseline copy is built and always selected.
+
+  The kernels to dispatch are listed in the file ``<kernels>`` via the macro
+  ``CHARONLOAD_ISA_KERNEL(<return type>, <name>, (<parameters>), (<arguments>))``. The file may include the headers
+  required by the signatures but must not use ``#pragma once`` since it is included several times:
+
+  .. code-block:: cpp
+
+    #include <torch/torch.h>
+
+    CHARONLOAD_ISA_KERNEL(at::Tensor, two_times, (const at::Tensor& input), (input))
+
+  Each copy of ``<source>...`` is compiled with the macro ``CHARONLOAD_ISA_NAMESPACE`` set to
+  ``<namespace>_<isa>`` or ``<namespace>_baseline``, which must enclose the definitions of the kernels:
+
+  .. code-block:: cpp
+
+    #include <torch/torch.h>
+
+    namespace CHARONLOAD_ISA_NAMESPACE
+    {
+    at::Tensor two_times(const at::Tensor& input) { /* ... */ }
+    }
+
+  The generated header ``<target>_isa_dispatch.h`` declares the dispatching kernels in ``<namespace>`` as well as the
+  function ``const char* <namespace>::selected_isa()`` which returns the name of the selected instruction set. The
+  instruction set is selected once when the extension is loaded, so each call only adds a perfectly predictable
+  branch. Setting the environment variable ``CHARONLOAD_ISA_LIMIT`` to the name of an instruction set, e.g.
+  ``baseline``, limits the selection to this or an older one, which allows testing the other copies on a recent CPU.
+
+  The baseline copy is compiled as part of ``<target>`` while the copy of each instruction set ``<isa>`` is compiled
+  into the static library ``<target>_isa_<isa>`` with hidden visibility which mirrors the compile flags of
+  ``<target>``. These copies are excluded from unity builds and precompiled headers since their compile flags differ
+  from the remaining sources of ``<target>``. CUDA sources are not supported.
+
+  .. important::
+
+    Only the code inside of ``CHARONLOAD_ISA_NAMESPACE`` is guaranteed to be specific to each instruction set. Inline
+    functions and templates from shared headers, e.g. of PyTorch or the standard library, are also emitted into each
+    copy, but the linker merges them into a single definition. Since the libraries of the instruction sets are placed
+    behind the objects of ``<target>`` on the link line, the linker keeps the baseline definition, so the baseline
+    copy never runs instructions of a newer instruction set. As a consequence, such functions only benefit from the
+    instruction sets where the compiler inlined them. Do not link the libraries ``<target>_isa_<isa>`` into other
+    targets directly, as this would break the link order.
+
+#]]
+
+
+function(charonload_isa_flags isa output_flags output_checks)
+    if(isa STREQUAL "avx2")
+        set(FLAGS -msse4.2 -mpopcnt -mavx -mavx2 -mfma -mbmi -mbmi2)
+        set(CHECKS sse4.2 popcnt avx avx2 fma bmi bmi2)
+    elseif(isa STREQUAL "avx512")
+        charonload_isa_flags(avx2 FLAGS CHECKS)
+        list(APPEND FLAGS -mavx512f -mavx512bw -mavx512cd -mavx512dq -mavx512vl)
+        list(APPEND CHECKS avx512f avx512bw avx512cd avx512dq avx512vl)
+    else()
+        message(FATAL_ERROR "Invalid instruction set \"${isa}\": Expected one of \"avx2\" or \"avx512\".")
+    endif()
+
+    set(${output_flags} ${FLAGS} PARENT_SCOPE)
+    set(${output_checks} ${CHECKS} PARENT_SCOPE)
+endfunction()
+
+
+function(charonload_add_isa_dispatch target)
+    cmake_parse_arguments(arg "" "NAMESPACE;KERNELS" "ISAS;SOURCES" ${ARGN})
+    if(arg_UNPARSED_ARGUMENTS OR NOT arg_NAMESPACE OR NOT arg_KERNELS OR NOT arg_SOURCES)
+        message(FATAL_ERROR "Invalid syntax: charonload_add_isa_dispatch(${target} ${ARGN})")
+    endif()
+
+    if(NOT DEFINED arg_ISAS)
+        set(arg_ISAS avx2 avx512)
+    endif()
+
+    # Validate all instruction sets, even if they are not compiled on this platform
+    foreach(isa IN LISTS arg_ISAS)
+        charonload_isa_flags(${isa} ISA_FLAGS ISA_CHECKS)
+    endforeach()
+    list(REMOVE_DUPLICATES arg_ISAS)
+
+    set(ISAS "")
+    if(CMAKE_CXX_COMPILER_ID MATCHES "GNU|Clang" AND CMAKE_SYSTEM_PROCESSOR MATCHES "^(x86_64|AMD64|amd64)$")
+        include(CheckCXXCompilerFlag)
+
+        # Keep the instruction sets ordered from oldest to most recent, so the dispatch prefers the latter
+        foreach(isa IN ITEMS avx2 avx512)
+            if(NOT isa IN_LIST arg_ISAS)
+                continue()
+            endif()
+            charonload_isa_flags(${isa} ISA_FLAGS ISA_CHECKS)
+
+            # The result is cached, so each instruction set is only checked once per build directory
+            string(TOUPPER ${isa} ISA_UPPER)
+            set(CMAKE_REQUIRED_QUIET ON)
+            check_cxx_compiler_flag("${ISA_FLAGS}" CHARONLOAD_ISA_${ISA_UPPER}_SUPPORTED)
+            if(CHARONLOAD_ISA_${ISA_UPPER}_SUPPORTED)
+                list(APPEND ISAS ${isa})
+            endif()
+        endforeach()
+    endif()
+
+    set(DISPATCH_DIRECTORY "${CMAKE_CURRENT_BINARY_DIR}/charonload/isa_dispatch/${target}")
+    cmake_path(ABSOLUTE_PATH arg_KERNELS BASE_DIRECTORY ${CMAKE_CURRENT_SOURCE_DIR} NORMALIZE)
+
+    # - Copies of the sources for each instruction set
+    foreach(isa IN ITEMS baseline ${ISAS})
+        set(ISA_SOURCES "")
+        foreach(source IN LISTS arg_SOURCES)
+            if(source MATCHES "\\.cu$")
+                message(FATAL_ERROR "Invalid source \"${source}\": CUDA sources are not supported by charonload_add_isa_dispatch(${target})")
+            endif()
+
+            cmake_path(ABSOLUTE_PATH source BASE_DIRECTORY ${CMAKE_CURRENT_SOURCE_DIR} NORMALIZE)
+            cmake_path(RELATIVE_PATH source BASE_DIRECTORY ${CMAKE_CURRENT_SOURCE_DIR} OUTPUT_VARIABLE SOURCE_NAME)
+            string(MAKE_C_IDENTIFIER ${SOURCE_NAME} SOURCE_NAME)
+
+            set(ISA_SOURCE "${DISPATCH_DIRECTORY}/${isa}/${SOURCE_NAME}.cpp")
+            file(CONFIGURE OUTPUT ${ISA_SOURCE}
+                 CONTENT "// Generated by charonload to compile \"${source}\" for the instruction set \"${isa}\"\n#define CHARONLOAD_ISA_NAMESPACE ${arg_NAMESPACE}_${isa}\n#include \"${source}\"\n"
+                 @ONLY)
+            list(APPEND ISA_SOURCES ${ISA_SOURCE})
+        endforeach()
+
+        if(isa STREQUAL "baseline")
+            target_sources(${target} PRIVATE ${ISA_SOURCES})
+            set_source_files_properties(${ISA_SOURCES} TARGET_DIRECTORY ${target}
+                                        PROPERTIES SKIP_UNITY_BUILD_INCLUSION ON
+                                                   SKIP_PRECOMPILE_HEADERS ON)
+            continue()
+        endif()
+
+        # Inline functions and templates of shared headers, e.g. of PyTorch or the standard library, are emitted into
+        # every copy and merged by the linker which keeps the first definition it encounters. Static libraries are
+        # placed behind the objects of the target on the link line, so the baseline definitions are always kept.
+        set(ISA_TARGET "${target}_isa_${isa}")
+        add_library(${ISA_TARGET} STATIC ${ISA_SOURCES})
+
+        charonload_isa_flags(${isa} ISA_FLAGS ISA_CHECKS)
+        target_compile_options(${ISA_TARGET} PRIVATE ${ISA_FLAGS})
+
+        # Mirror the compile flags of the target including the ones of its dependencies, e.g. the ABI of PyTorch
+        target_include_directories(${ISA_TARGET} PRIVATE $<TARGET_PROPERTY:${target},INCLUDE_DIRECTORIES>)
+        target_compile_definitions(${ISA_TARGET} PRIVATE $<TARGET_PROPERTY:${target},COMPILE_DEFINITIONS>)
+        target_compile_options(${ISA_TARGET} PRIVATE $<TARGET_PROPERTY:${target},COMPILE_OPTIONS>)
+        target_compile_features(${ISA_TARGET} PRIVATE $<TARGET_PROPERTY:${target},COMPILE_FEATURES>)
+
+        # Hidden symbols keep the copies from being picked by other shared objects at runtime
+        set_target_properties(${ISA_TARGET} PROPERTIES POSITION_INDEPENDENT_CODE ON
+                                                       CXX_VISIBILITY_PRESET "hidden"
+                                                       VISIBILITY_INLINES_HIDDEN ON
+                                                       UNITY_BUILD OFF)
+
+        target_link_libraries(${target} PRIVATE ${ISA_TARGET})
+    endforeach()
+
+    # - Dispatch glue
+    set(KERNEL_DECLARATIONS "")
+    foreach(isa IN ITEMS baseline ${ISAS})
+        string(APPEND KERNEL_DECLARATIONS
+               "namespace ${arg_NAMESPACE}_${isa}\n"
+               "{\n"
+               "#define CHARONLOAD_ISA_KERNEL(ret, name, params, args) ret name params;\n"
+               "#include \"${arg_KERNELS}\"\n"
+               "#undef CHARONLOAD_ISA_KERNEL\n"
+               "}\n\n")
+    endforeach()
+
+    # Prefer the most recent instruction set
+    set(ISA_SELECTION "")
+    set(ISA_NAMES "\"baseline\"")
+    set(KERNEL_CASES "")
+    set(index 0)
+    foreach(isa IN LISTS ISAS)
+        math(EXPR index "${index} + 1")
+        charonload_isa_flags(${isa} ISA_FLAGS ISA_CHECKS)
+        list(TRANSFORM ISA_CHECKS REPLACE "(.+)" "__builtin_cpu_supports(\"\\1\")")
+        list(JOIN ISA_CHECKS " && " ISA_CONDITION)
+
+        string(PREPEND ISA_SELECTION "    if (${ISA_CONDITION})\n    {\n        return ${index};\n    }\n")
+        string(APPEND ISA_NAMES ", \"${isa}\"")
+        string(PREPEND KERNEL_CASES "        case ${index}: return ${arg_NAMESPACE}_${isa}::name args; \\\n")
+    endforeach()
+
+    if(ISAS)
+        set(ISA_SELECTION "    __builtin_cpu_init();\n\n${ISA_SELECTION}")
+    endif()
+
+    file(CONFIGURE OUTPUT "${DISPATCH_DIRECTORY}/include/${target}_isa_dispatch.h"
+         CONTENT [=[// Generated by charonload for the instruction set dispatch of target "@target@"
+#pragma once
+
+// Process the includes of the kernel list outside of any namespace
+#define CHARONLOAD_ISA_KERNEL(ret, name, params, args)
+#include "@arg_KERNELS@"
+#undef CHARONLOAD_ISA_KERNEL
+
+namespace @arg_NAMESPACE@
+{
+
+#define CHARONLOAD_ISA_KERNEL(ret, name, params, args) ret name params;
+#include "@arg_KERNELS@"
+#undef CHARONLOAD_ISA_KERNEL
+
+const char*
+selected_isa();
+
+}
+]=]
+         @ONLY)
+
+    file(CONFIGURE OUTPUT "${DISPATCH_DIRECTORY}/dispatch.cpp"
+         CONTENT [=[// Generated by charonload for the instruction set dispatch of target "@target@"
+#include "@target@_isa_dispatch.h"
+
+#include <cstdlib>
+#include <cstring>
+
+@KERNEL_DECLARATIONS@namespace @arg_NAMESPACE@
+{
+
+namespace
+{
+
+const char* const charonload_isa_names[] = { @ISA_NAMES@ };
+
+int
+charonload_detect_isa()
+{
+@ISA_SELECTION@    return 0;
+}
+
+int
+charonload_select_isa()
+{
+    const int index = charonload_detect_isa();
+
+    // Allow limiting the selection to an older instruction set, e.g. to run the baseline copy on a recent CPU
+    const char* limit = std::getenv("CHARONLOAD_ISA_LIMIT");
+    for (int i = 0; limit != nullptr && i < index; ++i)
+    {
+        if (std::strcmp(limit, charonload_isa_names[i]) == 0)
+        {
+            return i;
+        }
+    }
+
+    return index;
+}
+
+// Calls during static initialization of other translation units still see the zero-initialized baseline
+const int charonload_isa_index = charonload_select_isa();
+
+} // namespace
+
+const char*
+selected_isa()
+{
+    return charonload_isa_names[charonload_isa_index];
+}
+
+#define CHARONLOAD_ISA_KERNEL(ret, name, params, args) \
+    ret name params \
+    { \
+        switch (charonload_isa_index) \
+        { \
+@KERNEL_CASES@        default: return @arg_NAMESPACE@_baseline::name args; \
+        } \
+    }
+#include "@arg_KERNELS@"
+#undef CHARONLOAD_ISA_KERNEL
+
+}
+]=]
+         @ONLY)
+
+    target_sources(${target} PRIVATE "${DISPATCH_DIRECTORY}/dispatch.cpp")
+    target_include_directories(${target} PUBLIC "$<BUILD_INTERFACE:${DISPATCH_DIRECTORY}/include>")
+
+    list(JOIN ISAS ", " ISAS_STRING)
+    if(ISAS_STRING)
+        string(PREPEND ISAS_STRING ", ")
+    endif()
+    message(STATUS "Added instruction set dispatch (baseline${ISAS_STRING}) to target \"${target}\"")
+endfunction()
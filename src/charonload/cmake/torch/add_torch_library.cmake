@@ -3,7 +3,8 @@
 
   .. code-block:: cmake
 
-    charonload_add_torch_library(<name> [MODULE | SHARED | STATIC])
+    charonload_add_torch_library(<name> [MODULE | SHARED | STATIC] [PRECOMPILE_TORCH_HEADERS]
+                                 [UNITY] [UNITY_BATCH_SIZE <size>])
 
   Creates a library target ``<name>`` with the respective type ``MODULE``, ``SHARED``, or ``STATIC``. If no type is
   provided, the default type of :doc:`add_library() <cmake.org:command/add_library>` is used. Furthermore, the
@@ -33,6 +34,41 @@
      - C++11 ABI
      - Position-Independent Code flag
 
+  4. If ``PRECOMPILE_TORCH_HEADERS`` is specified, the C++ sources of ``<name>`` will use a precompiled header of
+     ``<torch/extension.h>`` (``MODULE``) or ``<torch/torch.h>`` (otherwise) instead of parsing the Torch headers in
+     every translation unit. The precompiled header is built once and shared via
+     :doc:`target_precompile_headers(REUSE_FROM) <cmake.org:command/target_precompile_headers>` by all targets with the
+     same library type, Torch version, C++ standard, and C++11 ABI.
+
+  5. If ``UNITY`` is specified, or if unity builds are enabled for JIT compiling via the ``unity_build`` option of
+     :class:`charonload.Config`, a :doc:`unity build <cmake.org:prop_tgt/UNITY_BUILD>` of the C++ sources of ``<name>``
+     is performed, so the Torch headers are only parsed once per batch of ``UNITY_BATCH_SIZE`` sources (default: ``8``
+     or the ``unity_build_batch_size`` option when JIT compiling). CUDA sources are always compiled individually since
+     their compile time is dominated by the device code. The macro ``CHARONLOAD_UNITY_ID`` expands to a unique
+     identifier within each source file and can be used to name otherwise colliding internal symbols. Dependencies which are
+     patched as described in 3. are not affected, since their sources are not necessarily suited for unity builds.
+
+  6. If a faster linker than the default one of the compiler has been selected via the ``linker`` option of
+     :class:`charonload.Config` or the ``CHARONLOAD_LINKER`` variable, i.e. mold or lld, ``<name>`` will be linked
+     with it unless ``<name>`` already specifies its :doc:`LINKER_TYPE <cmake.org:prop_tgt/LINKER_TYPE>` or
+     :doc:`CMAKE_LINKER_TYPE <cmake.org:variable/CMAKE_LINKER_TYPE>` is defined.
+
+  7. If split debug information has been enabled via the ``split_debug_info`` option of :class:`charonload.Config` or
+     the ``CHARONLOAD_SPLIT_DEBUG_INFO`` variable, the C++ sources of ``<name>`` will be compiled with ``-gsplit-dwarf``
+     in the ``Debug`` and ``RelWithDebInfo`` configurations, so the bulk of the debug information stays in ``.dwo``
+     files next to the object files. The remaining debug sections are compressed by the linker if supported. Modules
+     are still stripped, but their remaining debug sections are kept in a separate ``.debug`` file linked via
+     ``.gnu_debuglink`` beforehand, so they can still be debugged while the build directory exists.
+
+  8. If profile-guided optimization has been enabled via the ``pgo`` option of :class:`charonload.Config` or the
+     ``CHARONLOAD_PGO`` and ``CHARONLOAD_PGO_PROFILE_DIRECTORY`` variables, the C++ sources of ``<name>`` will either be
+     instrumented to record profiles into the profile directory (``generate``) or optimized using the recorded profiles
+     (``use``). Only GCC and Clang are supported.
+
+  9. If a CPU target has been selected via the ``cpu_target`` option of :class:`charonload.Config` or the
+     ``CHARONLOAD_CPU_TARGET`` variable, the C++ sources and the host code of the CUDA sources of ``<name>`` will be
+     compiled with ``-march=<target>``. Only GCC and Clang are supported.
+
   .. admonition:: Source Files
     :class: warning
 
@@ -70,10 +106,34 @@ endfunction()
 
 function(charonload_strip name)
     if(CMAKE_STRIP)
-        add_custom_command(TARGET ${name}
-                           POST_BUILD
-                           COMMAND ${CMAKE_STRIP} $<TARGET_FILE:${name}>
-                           VERBATIM)
+        set(STRIP_COMMAND ${CMAKE_STRIP} $<TARGET_FILE:${name}>)
+
+        # Move the skeleton debug information referring to the split debug information into a separate file linked via
+        # .gnu_debuglink before stripping, so debugging still works while the extension stays small
+        if(CHARONLOAD_SPLIT_DEBUG_INFO_ENABLED AND CMAKE_OBJCOPY)
+            set(DEBUG_CONFIGS "$<CONFIG:Debug,RelWithDebInfo>")
+            set(DEBUG_FILE "$<TARGET_FILE:${name}>.debug")
+            set(NO_COMMAND ${CMAKE_COMMAND} -E true)
+
+            set(KEEP_DEBUG_COMMAND ${CMAKE_OBJCOPY} --only-keep-debug $<TARGET_FILE:${name}> ${DEBUG_FILE})
+            set(DEBUG_LINK_COMMAND ${CMAKE_OBJCOPY} --add-gnu-debuglink=${DEBUG_FILE} $<TARGET_FILE:${name}>)
+            list(JOIN KEEP_DEBUG_COMMAND "$<SEMICOLON>" KEEP_DEBUG_COMMAND)
+            list(JOIN DEBUG_LINK_COMMAND "$<SEMICOLON>" DEBUG_LINK_COMMAND)
+            list(JOIN NO_COMMAND "$<SEMICOLON>" NO_COMMAND)
+
+            add_custom_command(TARGET ${name}
+                               POST_BUILD
+                               COMMAND "$<IF:${DEBUG_CONFIGS},${KEEP_DEBUG_COMMAND},${NO_COMMAND}>"
+                               COMMAND ${STRIP_COMMAND}
+                               COMMAND "$<IF:${DEBUG_CONFIGS},${DEBUG_LINK_COMMAND},${NO_COMMAND}>"
+                               COMMAND_EXPAND_LISTS
+                               VERBATIM)
+        else()
+            add_custom_command(TARGET ${name}
+                               POST_BUILD
+                               COMMAND ${STRIP_COMMAND}
+                               VERBATIM)
+        endif()
     endif()
 endfunction()
 
@@ -140,8 +200,94 @@ function(charonload_select_cudart_library name)
 endfunction()
 
 
+function(charonload_set_unity_build name batch_size)
+    set_target_properties(${name} PROPERTIES UNITY_BUILD ON
+                                             UNITY_BUILD_MODE BATCH
+                                             UNITY_BUILD_BATCH_SIZE ${batch_size}
+                                             UNITY_BUILD_UNIQUE_ID CHARONLOAD_UNITY_ID)
+    message(STATUS "Set property UNITY_BUILD=ON with UNITY_BUILD_BATCH_SIZE=${batch_size} to target \"${name}\"")
+
+    # Sources are usually added after creating the target, so defer excluding the CUDA sources
+    cmake_language(EVAL CODE "cmake_language(DEFER DIRECTORY \"${CMAKE_SOURCE_DIR}\" CALL charonload_skip_unity_build_of_cuda_sources \"${name}\")")
+endfunction()
+
+
+function(charonload_skip_unity_build_of_cuda_sources name)
+    get_target_property(NAME_SOURCES ${name} SOURCES)
+    get_target_property(NAME_SOURCE_DIR ${name} SOURCE_DIR)
+
+    foreach(source IN LISTS NAME_SOURCES)
+        if(source MATCHES "\\$<")  # Generator expressions can not be resolved at configure time
+            continue()
+        endif()
+
+        cmake_path(ABSOLUTE_PATH source BASE_DIRECTORY ${NAME_SOURCE_DIR})
+        get_source_file_property(SOURCE_LANGUAGE ${source} TARGET_DIRECTORY ${name} LANGUAGE)
+        if(SOURCE_LANGUAGE STREQUAL "CUDA" OR (SOURCE_LANGUAGE MATCHES "NOTFOUND" AND source MATCHES "\\.cu$"))
+            list(APPEND CUDA_SOURCES ${source})
+        endif()
+    endforeach()
+
+    if(CUDA_SOURCES)
+        set_source_files_properties(${CUDA_SOURCES} TARGET_DIRECTORY ${name} PROPERTIES SKIP_UNITY_BUILD_INCLUSION ON)
+    endif()
+endfunction()
+
+
+function(charonload_add_torch_precompiled_headers name)
+    get_target_property(NAME_TYPE ${name} TYPE)
+    if(NAME_TYPE STREQUAL "MODULE_LIBRARY")
+        set(PCH_TYPE "module")
+        set(PCH_HEADER "<torch/extension.h>")
+    else()
+        set(PCH_TYPE "library")
+        set(PCH_HEADER "<torch/torch.h>")
+    endif()
+
+    # Targets may only reuse a precompiled header which has been built with compatible flags
+    set(PCH_KEY "${PCH_TYPE}_torch${Torch_VERSION}_cxx$CACHE{CHARONLOAD_TORCH_STANDARD}_abi$CACHE{CHARONLOAD_TORCH_CXX11_ABI}")
+    string(MAKE_C_IDENTIFIER ${PCH_KEY} PCH_KEY)
+    set(PCH_TARGET "charonload_torch_pch_${PCH_KEY}")
+
+    if(NOT TARGET ${PCH_TARGET})
+        set(PCH_SOURCE "${CMAKE_BINARY_DIR}/charonload/torch/${PCH_TARGET}.cpp")
+        file(CONFIGURE OUTPUT ${PCH_SOURCE}
+             CONTENT "// Generated by charonload to build the precompiled header of ${PCH_HEADER}\n"
+             @ONLY)
+
+        add_library(${PCH_TARGET} OBJECT ${PCH_SOURCE})
+        target_link_libraries(${PCH_TARGET} PRIVATE charonload::torch)
+        set_target_properties(${PCH_TARGET} PROPERTIES POSITION_INDEPENDENT_CODE ON)
+        if(NOT $CACHE{CHARONLOAD_TORCH_STANDARD} STREQUAL "NOTFOUND")
+            target_compile_features(${PCH_TARGET} PRIVATE cxx_std_$CACHE{CHARONLOAD_TORCH_STANDARD})
+        endif()
+
+        # Mirror the compile flags of the bindings target
+        if(PCH_TYPE STREQUAL "module")
+            target_compile_definitions(${PCH_TARGET} PRIVATE "TORCH_EXTENSION_NAME=${TORCH_EXTENSION_NAME}")
+            target_link_libraries(${PCH_TARGET} PRIVATE charonload::torch_python Python::Module)
+
+            charonload_set_visibility(${PCH_TARGET})
+            charonload_compile_options(${PCH_TARGET})
+            if(NOT DEFINED CMAKE_INTERPROCEDURAL_OPTIMIZATION)
+                charonload_lto(${PCH_TARGET})
+            endif()
+        endif()
+
+        charonload_set_split_debug_info(${PCH_TARGET})
+        charonload_set_cpu_target(${PCH_TARGET})
+        charonload_set_pgo(${PCH_TARGET})
+
+        target_precompile_headers(${PCH_TARGET} PRIVATE "$<$<COMPILE_LANGUAGE:CXX>:${PCH_HEADER}>")
+        message(STATUS "Added precompiled header ${PCH_HEADER} in target \"${PCH_TARGET}\"")
+    endif()
+
+    target_precompile_headers(${name} REUSE_FROM ${PCH_TARGET})
+endfunction()
+
+
 function(charonload_add_torch_library name)
-    cmake_parse_arguments(arg "MODULE;SHARED;STATIC" "" "" ${ARGN})
+    cmake_parse_arguments(arg "MODULE;SHARED;STATIC;PRECOMPILE_TORCH_HEADERS;UNITY" "UNITY_BATCH_SIZE" "" ${ARGN})
     if(arg_UNPARSED_ARGUMENTS)
         message(STATUS "Unparsed: ${arg_UNPARSED_ARGUMENTS}")
         message(FATAL_ERROR "Invalid syntax: charonload_add_torch_library(${name} ${ARGN})")
@@ -196,6 +342,35 @@ function(charonload_add_torch_library name)
         set_target_properties(${name} PROPERTIES CUDA_RUNTIME_LIBRARY Shared)
     endif()
 
+    # - Precompiled Torch headers
+    if(arg_PRECOMPILE_TORCH_HEADERS)
+        charonload_add_torch_precompiled_headers(${name})
+    endif()
+
+    # - Fast linker
+    charonload_set_linker(${name})
+
+    # - Split debug information
+    charonload_set_split_debug_info(${name})
+
+    # - CPU target
+    charonload_set_cpu_target(${name})
+
+    # - Profile-guided optimization
+    charonload_set_pgo(${name})
+
+    # - Unity build
+    if(arg_UNITY OR CHARONLOAD_UNITY_BUILD)
+        if(NOT arg_UNITY_BATCH_SIZE)
+            if(DEFINED CHARONLOAD_UNITY_BUILD_BATCH_SIZE)
+                set(arg_UNITY_BATCH_SIZE ${CHARONLOAD_UNITY_BUILD_BATCH_SIZE})
+            else()
+                set(arg_UNITY_BATCH_SIZE 8)
+            endif()
+        endif()
+        charonload_set_unity_build(${name} ${arg_UNITY_BATCH_SIZE})
+    endif()
+
     # Required for charonload_patch_dependencies() and charonload_check_binding_target()
     set_target_properties(${name} PROPERTIES CHARONLOAD_IS_HANDLED_TARGET TRUE)
 
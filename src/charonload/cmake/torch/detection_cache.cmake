@@ -0,0 +1,59 @@
+set(CHARONLOAD_DETECTION_CACHE_VARIABLES
+    CHARONLOAD_TORCH_STANDARD
+    CHARONLOAD_TORCH_CXX11_ABI
+    CHARONLOAD_TORCH_CUDA_VERSION
+)
+
+
+function(charonload_detection_cache_file output_file)
+    if(NOT DEFINED CHARONLOAD_DETECTION_CACHE_DIRECTORY)
+        set(${output_file} "" PARENT_SCOPE)
+        return()
+    endif()
+
+    # Every input that may change the outcome of the detection is part of the key
+    string(JOIN "\n" DETECTION_CACHE_KEY
+           "Torch: ${Torch_VERSION} ${Torch_DIR}"
+           "CXX: ${CMAKE_CXX_COMPILER_ID} ${CMAKE_CXX_COMPILER_VERSION}"
+           "CUDA: ${CMAKE_CUDA_COMPILER_ID} ${CMAKE_CUDA_COMPILER_VERSION} ${CMAKE_CUDA_ARCHITECTURES} $ENV{CUDA_VISIBLE_DEVICES}"
+           "Python: ${Python_SOABI} ${Python_EXECUTABLE}"
+    )
+    string(SHA256 DETECTION_CACHE_HASH "${DETECTION_CACHE_KEY}")
+    string(SUBSTRING ${DETECTION_CACHE_HASH} 0 16 DETECTION_CACHE_HASH)
+
+    set(${output_file} "${CHARONLOAD_DETECTION_CACHE_DIRECTORY}/torch_${DETECTION_CACHE_HASH}.cmake" PARENT_SCOPE)
+endfunction()
+
+
+function(charonload_load_detection_cache)
+    # Values which are already defined, e.g. passed in by charonload, are not overwritten
+    charonload_detection_cache_file(DETECTION_CACHE_FILE)
+    if(DETECTION_CACHE_FILE AND EXISTS ${DETECTION_CACHE_FILE})
+        include(${DETECTION_CACHE_FILE})
+        charonload_message(STATUS "Loaded detection results of Torch from cache: ${DETECTION_CACHE_FILE}")
+    endif()
+endfunction()
+
+
+function(charonload_store_detection_cache)
+    charonload_detection_cache_file(DETECTION_CACHE_FILE)
+    if(NOT DETECTION_CACHE_FILE OR EXISTS ${DETECTION_CACHE_FILE})
+        return()
+    endif()
+
+    # A failed C++ standard detection may be caused by a broken environment, so do not persist it
+    if($CACHE{CHARONLOAD_TORCH_STANDARD} STREQUAL "NOTFOUND")
+        return()
+    endif()
+
+    foreach(var IN LISTS CHARONLOAD_DETECTION_CACHE_VARIABLES)
+        get_property(DOCSTRING CACHE ${var} PROPERTY HELPSTRING)
+        string(APPEND DETECTION_CACHE_CONTENT "set(${var} \"$CACHE{${var}}\" CACHE STRING \"${DOCSTRING}\")\n")
+    endforeach()
+
+    # Write to a unique temporary file first, so concurrent configure runs never observe a partially written file
+    string(RANDOM LENGTH 8 DETECTION_CACHE_SUFFIX)
+    file(WRITE "${DETECTION_CACHE_FILE}.${DETECTION_CACHE_SUFFIX}.tmp" ${DETECTION_CACHE_CONTENT})
+    file(RENAME "${DETECTION_CACHE_FILE}.${DETECTION_CACHE_SUFFIX}.tmp" ${DETECTION_CACHE_FILE})
+    charonload_message(STATUS "Stored detection results of Torch in cache: ${DETECTION_CACHE_FILE}")
+endfunction()
@@ -0,0 +1,16 @@
+#include <torch/python.h>
+
+#include "torch_isa_dispatch_static_isa_dispatch.h"
+
+using namespace pybind11::literals;
+
+#define STRINGIFY_IMPL(x) #x
+#define STRINGIFY(a) STRINGIFY_IMPL(a)
+
+PYBIND11_MODULE(TORCH_EXTENSION_NAME, m)
+{
+    m.doc() = "A C++/CUDA extension module named \"" STRINGIFY(TORCH_EXTENSION_NAME) "\" that is built just-in-time.";
+
+    m.def("two_times", &kernels::two_times, "input"_a, "Multiply the given input tensor by a factor of 2 on the CPU.");
+    m.def("selected_isa", &kernels::selected_isa, "Get the instruction set selected at runtime.");
+}
@@ -0,0 +1,18 @@
+#include <torch/python.h>
+
+#include "functions_cpu.h"
+
+using namespace pybind11::literals;
+
+#define STRINGIFY_IMPL(x) #x
+#define STRINGIFY(a) STRINGIFY_IMPL(a)
+
+PYBIND11_MODULE(TORCH_EXTENSION_NAME, m)
+{
+    m.doc() = "A C++/CUDA extension module named \"" STRINGIFY(TORCH_EXTENSION_NAME) "\" that is built just-in-time.";
+
+    m.def("two_times", &two_times, "input"_a, "Multiply the given input tensor by a factor of 2 on the CPU.");
+    m.def("three_times", &three_times, "input"_a, "Multiply the given input tensor by a factor of 3 on the CPU.");
+    m.def("plus_one", &plus_one, "input"_a, "Add 1 to the given input tensor on the CPU.");
+    m.def("plus_two", &plus_two, "input"_a, "Add 2 to the given input tensor on the CPU.");
+}
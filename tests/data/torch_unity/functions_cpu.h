@@ -0,0 +1,15 @@
+#pragma once
+
+#include <ATen/core/Tensor.h>
+
+at::Tensor
+two_times(const at::Tensor& input);
+
+at::Tensor
+three_times(const at::Tensor& input);
+
+at::Tensor
+plus_one(const at::Tensor& input);
+
+at::Tensor
+plus_two(const at::Tensor& input);
@@ -0,0 +1,28 @@
+#include "functions_cpu.h"
+
+#include <ATen/Dispatch.h>
+#include <ATen/ops/zeros_like.h>
+
+// Colliding internal symbols which would break unity builds
+namespace
+{
+constexpr int offset = 1;
+}
+
+at::Tensor
+plus_one(const at::Tensor& input)
+{
+    auto output = at::zeros_like(input);
+
+    AT_DISPATCH_ALL_TYPES(input.scalar_type(),
+                          "plus_one_cpu",
+                          [&]()
+                          {
+                              for (std::size_t i = 0; i < input.numel(); ++i)
+                              {
+                                  output.data_ptr<scalar_t>()[i] = input.data_ptr<scalar_t>()[i] + scalar_t(offset);
+                              }
+                          });
+
+    return output;
+}
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import os
+import pathlib
+import shutil
+import subprocess
+
+import pytest
+
+import charonload
+from charonload._artifact_cache import _ArtifactCache, _ArtifactKey
+from charonload._fingerprint import _FingerprintManifest
+
+
+def _write_project(project_directory: pathlib.Path) -> None:
+    project_directory.mkdir(parents=True, exist_ok=True)
+    (project_directory / "CMakeLists.txt").write_text("project(test LANGUAGES CXX)\n")
+    (project_directory / "test.cpp").write_text("int test() { return 0; }\n")
+
+
+def _resolved_config(
+    project_directory: pathlib.Path, build_directory: pathlib.Path, *, stubs_directory: pathlib.Path | None = None
+) -> charonload.ResolvedConfig:
+    module_config = charonload.ConfigDict()
+    module_config["test"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=stubs_directory,
+    )
+    return module_config["test"]
+
+
+def _write_build(config: charonload.ResolvedConfig, size: int = 16) -> pathlib.Path:
+    full_extension_path = config.full_build_directory / "test.cpython.so"
+    full_extension_path.parent.mkdir(parents=True, exist_ok=True)
+    full_extension_path.write_bytes(b"\0" * size)
+
+    if config.full_stubs_directory is not None:
+        (config.full_stubs_directory / "test").mkdir(parents=True, exist_ok=True)
+        (config.full_stubs_directory / "test" / "__init__.pyi").write_text("def test() -> int: ...\n")
+
+    return full_extension_path
+
+
+def test_key_relocated_project(tmp_path: pathlib.Path) -> None:
+    _write_project(tmp_path / "project_a")
+    shutil.copytree(tmp_path / "project_a", tmp_path / "project_b")
+
+    key_a = _ArtifactKey("test", _resolved_config(tmp_path / "project_a", tmp_path / "build_a")).compute()
+    key_b = _ArtifactKey("test", _resolved_config(tmp_path / "project_b", tmp_path / "build_b")).compute()
+
+    assert key_a == key_b
+
+
+def test_key_changed_content(tmp_path: pathlib.Path) -> None:
+    _write_project(tmp_path / "project")
+    config = _resolved_config(tmp_path / "project", tmp_path / "build")
+
+    key = _ArtifactKey("test", config).compute()
+
+    # Content changes are detected even if the size and modification time are restored
+    source_file = tmp_path / "project" / "test.cpp"
+    stat = source_file.stat()
+    source_file.write_text("int test() { return 1; }\n")
+    os.utime(source_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert _ArtifactKey("test", config).compute() != key
+    assert _ArtifactKey("other", config).compute() != key
+
+
+def test_key_ignores_build_directory(tmp_path: pathlib.Path) -> None:
+    _write_project(tmp_path / "project")
+    config = _resolved_config(tmp_path / "project", tmp_path / "project" / "build")
+
+    key = _ArtifactKey("test", config).compute()
+    _write_build(config)
+
+    assert _ArtifactKey("test", config).compute() == key
+
+
+def test_store_restore(tmp_path: pathlib.Path) -> None:
+    _write_project(tmp_path / "project")
+    config = _resolved_config(tmp_path / "project", tmp_path / "build_a", stubs_directory=tmp_path / "stubs_a")
+    artifact_cache = _ArtifactCache(1024**2, directory=tmp_path / "artifacts")
+
+    key = _ArtifactKey("test", config).compute()
+    assert artifact_cache.restore(key, "test", config) is None
+
+    full_extension_path = _write_build(config)
+    assert artifact_cache.store(
+        key, "test", config, full_extension_path=full_extension_path, windows_dll_directories="", external_files=[]
+    )
+    assert not artifact_cache.store(
+        key, "test", config, full_extension_path=full_extension_path, windows_dll_directories="", external_files=[]
+    )
+
+    restored_config = _resolved_config(tmp_path / "project", tmp_path / "build_b", stubs_directory=tmp_path / "stubs_b")
+    restored = artifact_cache.restore(key, "test", restored_config)
+
+    assert restored is not None
+    restored_extension_path, external_files = restored
+    assert restored_extension_path.is_relative_to(restored_config.full_build_directory)
+    assert restored_extension_path.read_bytes() == full_extension_path.read_bytes()
+    assert (tmp_path / "stubs_b" / "test" / "__init__.pyi").exists()
+    assert external_files == []
+
+    location_file = restored_config.full_build_directory / "charonload" / restored_config.build_type / "location.txt"
+    assert pathlib.Path(location_file.read_text()) == restored_extension_path
+
+
+def test_restore_replaces_extension(tmp_path: pathlib.Path) -> None:
+    _write_project(tmp_path / "project")
+    config = _resolved_config(tmp_path / "project", tmp_path / "build")
+    artifact_cache = _ArtifactCache(1024**2, directory=tmp_path / "artifacts")
+
+    key = _ArtifactKey("test", config).compute()
+    assert artifact_cache.store(
+        key, "test", config, full_extension_path=_write_build(config), windows_dll_directories="", external_files=[]
+    )
+
+    restored = artifact_cache.restore(key, "test", config)
+    assert restored is not None
+    restored_extension_path, _ = restored
+
+    # Another process may still have the previous extension mapped, so it must not be overwritten in-place
+    with restored_extension_path.open("rb") as f:
+        previous_inode = os.fstat(f.fileno()).st_ino
+        assert artifact_cache.restore(key, "test", config) is not None
+
+        assert restored_extension_path.stat().st_ino != previous_inode
+        assert f.read() == restored_extension_path.read_bytes()
+
+    assert not [p for p in restored_extension_path.parent.iterdir() if p.name.endswith(".tmp")]
+
+
+@pytest.mark.skipif(shutil.which("ninja") is None, reason="Requires Ninja")
+def test_restore_changed_external_header(tmp_path: pathlib.Path) -> None:
+    external_header = tmp_path / "external" / "external.h"
+    external_header.parent.mkdir()
+    external_header.write_text("#define EXTERNAL_VALUE 0\n")
+
+    project_directory = tmp_path / "project"
+    project_directory.mkdir()
+    (project_directory / "CMakeLists.txt").write_text(
+        "cmake_minimum_required(VERSION 3.20)\n"
+        "project(test LANGUAGES CXX)\n"
+        "add_library(test STATIC test.cpp)\n"
+        f'target_include_directories(test PRIVATE "{external_header.parent.as_posix()}")\n'
+    )
+    (project_directory / "test.cpp").write_text('#include "external.h"\nint test() { return EXTERNAL_VALUE; }\n')
+
+    config = _resolved_config(project_directory, tmp_path / "build")
+    build_directory = config.full_build_directory.as_posix()
+    subprocess.run(  # noqa: S603
+        ["cmake", "-G", "Ninja", "-S", project_directory.as_posix(), "-B", build_directory],  # noqa: S607
+        check=True,
+        capture_output=True,
+    )
+    subprocess.run(["cmake", "--build", build_directory], check=True, capture_output=True)  # noqa: S603, S607
+
+    external_files = _FingerprintManifest("test", config).external_files()
+    assert external_header in external_files
+
+    artifact_cache = _ArtifactCache(1024**2, directory=tmp_path / "artifacts")
+    key = _ArtifactKey("test", config).compute()
+    assert artifact_cache.store(
+        key,
+        "test",
+        config,
+        full_extension_path=_write_build(config),
+        windows_dll_directories="",
+        external_files=external_files,
+    )
+    assert artifact_cache.restore(key, "test", config) is not None
+
+    external_header.write_text("#define EXTERNAL_VALUE 1\n")
+
+    assert artifact_cache.restore(key, "test", config) is None
+
+
+def test_restore_changed_external_file(tmp_path: pathlib.Path) -> None:
+    _write_project(tmp_path / "project")
+    external_file = tmp_path / "external" / "external.cpp"
+    external_file.parent.mkdir()
+    external_file.write_text("int external() { return 0; }\n")
+
+    config = _resolved_config(tmp_path / "project", tmp_path / "build")
+    artifact_cache = _ArtifactCache(1024**2, directory=tmp_path / "artifacts")
+
+    key = _ArtifactKey("test", config).compute()
+    assert artifact_cache.store(
+        key,
+        "test",
+        config,
+        full_extension_path=_write_build(config),
+        windows_dll_directories="",
+        external_files=[external_file],
+    )
+
+    restored = artifact_cache.restore(key, "test", config)
+    assert restored is not None
+    assert restored[1] == [external_file]
+
+    external_file.write_text("int external() { return 1; }\n")
+
+    assert artifact_cache.restore(key, "test", config) is None
+
+
+def test_store_not_self_contained(tmp_path: pathlib.Path) -> None:
+    _write_project(tmp_path / "project")
+    config = _resolved_config(tmp_path / "project", tmp_path / "build")
+    artifact_cache = _ArtifactCache(1024**2, directory=tmp_path / "artifacts")
+
+    full_extension_path = _write_build(config)
+    (config.full_build_directory / "libdependency.so").write_bytes(b"\0")
+
+    key = _ArtifactKey("test", config).compute()
+    assert not artifact_cache.store(
+        key, "test", config, full_extension_path=full_extension_path, windows_dll_directories="", external_files=[]
+    )
+    assert artifact_cache.restore(key, "test", config) is None
+
+
+def test_evict_least_recently_used(tmp_path: pathlib.Path) -> None:
+    extension_size = 1024
+    artifact_cache = _ArtifactCache(3 * extension_size, directory=tmp_path / "artifacts")
+
+    keys = []
+    for i in range(3):
+        _write_project(tmp_path / f"project_{i}")
+        config = _resolved_config(tmp_path / f"project_{i}", tmp_path / f"build_{i}")
+        key = _ArtifactKey(f"test_{i}", config).compute()
+        assert artifact_cache.store(
+            key,
+            f"test_{i}",
+            config,
+            full_extension_path=_write_build(config, extension_size),
+            windows_dll_directories="",
+            external_files=[],
+        )
+
+        # Make the order of usage independent of the timestamp resolution of the file system
+        os.utime(artifact_cache.directory / key / "entry.json", (i, i))
+        keys.append(key)
+
+    assert not (artifact_cache.directory / keys[0]).exists()
+    assert (artifact_cache.directory / keys[1]).exists()
+    assert (artifact_cache.directory / keys[2]).exists()
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+import charonload
+from charonload._build_report import (
+    _BuildHistory,
+    _create_build_report,
+    _NinjaLog,
+    _print_build_report,
+)
+
+if TYPE_CHECKING:
+    import pathlib
+
+
+def _write_build_tree(build_directory: pathlib.Path, ninja_log_lines: list[str]) -> None:
+    build_directory.mkdir(parents=True, exist_ok=True)
+
+    compile_commands = [
+        {
+            "directory": build_directory.as_posix(),
+            "command": f"c++ -c /src/{name}.cpp",
+            "file": f"/src/{name}.cpp",
+            "output": f"CMakeFiles/ext.dir/Release/{name}.cpp.o",
+        }
+        for name in ["a", "b", "c"]
+    ]
+    (build_directory / "compile_commands.json").write_text(json.dumps(compile_commands))
+    (build_directory / ".ninja_log").write_text("# ninja log v7\n" + "".join(f"{line}\n" for line in ninja_log_lines))
+
+
+@pytest.fixture
+def build_tree(tmp_path: pathlib.Path) -> pathlib.Path:
+    build_directory = tmp_path / "build"
+    _write_build_tree(
+        build_directory,
+        [
+            "0\t1000\t0\tCMakeFiles/ext.dir/Release/a.cpp.o\t1",
+            "0\t3000\t0\tCMakeFiles/ext.dir/Release/b.cpp.o\t2",
+            "1000\t2000\t0\tCMakeFiles/ext.dir/Release/c.cpp.o\t3",
+            "3000\t3500\t0\tRelease/ext.so\t4",
+        ],
+    )
+    return build_directory
+
+
+def _report(module_name: str, tmp_path: pathlib.Path, build_directory: pathlib.Path) -> charonload.BuildReport:
+    charonload.module_config[module_name] = charonload.Config(tmp_path, build_directory)
+    edges = _NinjaLog(build_directory).read_since(None)
+    report = _create_build_report(module_name, charonload.module_config[module_name], edges)
+    assert report is not None
+    return report
+
+
+def test_build_report(tmp_path: pathlib.Path, build_tree: pathlib.Path) -> None:
+    report = _report("test_build_report", tmp_path, build_tree)
+
+    assert [e.output for e in report.entries] == [
+        "CMakeFiles/ext.dir/Release/b.cpp.o",
+        "CMakeFiles/ext.dir/Release/a.cpp.o",
+        "CMakeFiles/ext.dir/Release/c.cpp.o",
+        "Release/ext.so",
+    ]
+    assert [e.kind for e in report.entries] == ["compile", "compile", "compile", "link"]
+    assert report.entries[0].source == "/src/b.cpp"
+    assert report.entries[-1].source is None
+
+    assert report.compile_time == pytest.approx(5.0)
+    assert report.link_time == pytest.approx(0.5)
+    assert report.wall_time == pytest.approx(3.5)
+
+    assert [e.output for e in report.critical_path] == ["CMakeFiles/ext.dir/Release/b.cpp.o", "Release/ext.so"]
+    assert report.critical_path_time == pytest.approx(3.5)
+
+
+def test_build_report_zero_duration(tmp_path: pathlib.Path) -> None:
+    build_directory = tmp_path / "build"
+    _write_build_tree(
+        build_directory,
+        [
+            "1000\t1000\t0\tphony_a\t1",
+            "1000\t1000\t0\tphony_b\t2",
+            "0\t1000\t0\tCMakeFiles/ext.dir/Release/a.cpp.o\t3",
+            "1500\t1500\t0\tall\t4",
+            "1000\t1500\t0\tRelease/ext.so\t5",
+            "1500\t1500\t0\tinstall\t6",
+        ],
+    )
+
+    report = _report("test_build_report_zero_duration", tmp_path, build_directory)
+
+    assert [e.output for e in report.critical_path] == ["CMakeFiles/ext.dir/Release/a.cpp.o", "Release/ext.so"]
+    assert report.critical_path_time == pytest.approx(1.5)
+
+
+def test_build_report_only_zero_duration(tmp_path: pathlib.Path) -> None:
+    build_directory = tmp_path / "build"
+    _write_build_tree(
+        build_directory,
+        [
+            "1000\t1000\t0\tphony_a\t1",
+            "1000\t1000\t0\tphony_b\t2",
+        ],
+    )
+
+    report = _report("test_build_report_only_zero_duration", tmp_path, build_directory)
+
+    assert [e.output for e in report.critical_path] == ["phony_a"]
+    assert report.critical_path_time == pytest.approx(0.0)
+
+
+def test_ninja_log_read_since(tmp_path: pathlib.Path, build_tree: pathlib.Path) -> None:
+    ninja_log = _NinjaLog(build_tree)
+    position = ninja_log.position()
+
+    assert ninja_log.read_since(position) == []
+
+    with ninja_log.path.open("a") as f:
+        f.write("0\t1500\t0\tCMakeFiles/ext.dir/Release/a.cpp.o\t5\n")
+        f.write("1500\t1800\t0\tRelease/ext.so\t6\n")
+
+    assert ninja_log.read_since(position) == [
+        (0, 1500, "CMakeFiles/ext.dir/Release/a.cpp.o"),
+        (1500, 1800, "Release/ext.so"),
+    ]
+
+    # Replaced logs are read entirely, skipping the entries known at the position and keeping the latest per output
+    _write_build_tree(
+        tmp_path / "replaced",
+        [
+            "0\t1000\t0\tCMakeFiles/ext.dir/Release/a.cpp.o\t1",
+            "0\t2000\t0\tCMakeFiles/ext.dir/Release/a.cpp.o\t1",
+        ],
+    )
+    (tmp_path / "replaced" / ".ninja_log").replace(ninja_log.path)
+
+    assert ninja_log.read_since(position) == [(0, 2000, "CMakeFiles/ext.dir/Release/a.cpp.o")]
+
+
+def test_ninja_log_read_since_recompacted(build_tree: pathlib.Path) -> None:
+    ninja_log = _NinjaLog(build_tree)
+    position = ninja_log.position()
+
+    # Ninja keeps the latest entry of each output from previous builds and appends the edges of the current build
+    recompacted_log = build_tree / ".ninja_log.recompact"
+    recompacted_log.write_text(
+        "# ninja log v7\n"
+        "0\t1000\t0\tCMakeFiles/ext.dir/Release/a.cpp.o\t1\n"
+        "0\t3000\t0\tCMakeFiles/ext.dir/Release/b.cpp.o\t2\n"
+        "0\t1200\t0\tCMakeFiles/ext.dir/Release/c.cpp.o\t7\n"
+    )
+    recompacted_log.replace(ninja_log.path)
+
+    assert ninja_log.read_since(position) == [(0, 1200, "CMakeFiles/ext.dir/Release/c.cpp.o")]
+
+
+def test_ninja_log_missing(tmp_path: pathlib.Path) -> None:
+    ninja_log = _NinjaLog(tmp_path)
+
+    assert ninja_log.position() is None
+    assert ninja_log.read_since(None) == []
+
+
+def test_build_history(tmp_path: pathlib.Path, build_tree: pathlib.Path) -> None:
+    report = _report("test_build_history", tmp_path, build_tree)
+
+    assert charonload.build_history("test_build_history") == []
+
+    history = _BuildHistory(charonload.module_config["test_build_history"])
+    for _ in range(history.max_reports + 1):
+        history.append(report)
+
+    reports = charonload.build_history("test_build_history")
+    assert len(reports) == history.max_reports
+    assert reports[-1] == report
+
+
+def test_build_history_not_registered() -> None:
+    with pytest.raises(KeyError):
+        charonload.build_history("test_build_history_not_registered")
+
+
+def test_print_build_report(
+    tmp_path: pathlib.Path, build_tree: pathlib.Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    report = _report("test_print_build_report", tmp_path, build_tree)
+    _print_build_report(report, report, max_entries=2)
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 4  # noqa: PLR2004
+    assert all(line.startswith("[charonload]") for line in lines)
+    assert "/src/b.cpp" in lines[2]
+    assert "+0.00" in lines[2]
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+import pathlib
+import platform
+import stat
+
+import pytest
+
+import charonload
+from charonload._compiler_cache import (
+    _compiler_cache_stats_difference,
+    _CompilerCache,
+    _parse_ccache_stats,
+    _parse_sccache_stats,
+)
+
+pytestmark = pytest.mark.skipif(platform.system() == "Windows", reason="Fake compiler caches are shell scripts")
+
+CCACHE_STATS = "direct_cache_hit\t3\npreprocessed_cache_hit\t1\ncache_miss\t2\nfiles_in_cache\t12\n"
+
+SCCACHE_STATS = {
+    "stats": {
+        "compile_requests": 6,
+        "cache_hits": {"counts": {"C/C++": 4}},
+        "cache_misses": {"counts": {"C/C++": 1, "CUDA": 1}},
+    }
+}
+
+
+def _write_fake_tool(directory: pathlib.Path, name: str, stats: str) -> pathlib.Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    tool = directory / name
+    tool.write_text(f"#!/bin/sh\nprintf '%s' '{stats}'\n")
+    tool.chmod(tool.stat().st_mode | stat.S_IEXEC)
+    return tool
+
+
+def _resolved_config(tmp_path: pathlib.Path, compiler_cache: str | None) -> charonload.ResolvedConfig:
+    project_directory = tmp_path / "project"
+    project_directory.mkdir(exist_ok=True)
+
+    module_config = charonload.ConfigDict()
+    module_config["test"] = charonload.Config(
+        project_directory,
+        tmp_path / "build",
+        compiler_cache=compiler_cache,
+        compiler_cache_max_size="1G",
+    )
+    return module_config["test"]
+
+
+def test_find_auto(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    tools_directory = tmp_path / "bin"
+    _write_fake_tool(tools_directory, "sccache", json.dumps(SCCACHE_STATS))
+    monkeypatch.setenv("PATH", tools_directory.as_posix())
+
+    compiler_cache = _CompilerCache.find(_resolved_config(tmp_path, "auto"))
+
+    assert compiler_cache is not None
+    assert compiler_cache.tool == "sccache"
+    assert compiler_cache.environment()["SCCACHE_CACHE_SIZE"] == "1G"
+    assert compiler_cache.stats() == (4, 2)
+
+
+def test_find_auto_not_found(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PATH", (tmp_path / "bin").as_posix())
+
+    assert _CompilerCache.find(_resolved_config(tmp_path, "auto")) is None
+
+
+def test_find_disabled(tmp_path: pathlib.Path) -> None:
+    assert _CompilerCache.find(_resolved_config(tmp_path, None)) is None
+
+
+def test_find_explicit_not_found(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PATH", (tmp_path / "bin").as_posix())
+
+    with pytest.raises(charonload.CommandNotFoundError) as exc_info:
+        _CompilerCache.find(_resolved_config(tmp_path, "ccache"))
+
+    assert exc_info.value.command_name == "ccache"
+
+
+def test_ccache(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    tools_directory = tmp_path / "bin"
+    ccache = _write_fake_tool(tools_directory, "ccache", CCACHE_STATS)
+    monkeypatch.setenv("PATH", tools_directory.as_posix())
+
+    compiler_cache = _CompilerCache.find(_resolved_config(tmp_path, "ccache"))
+
+    assert compiler_cache is not None
+    environment = compiler_cache.environment()
+    assert pathlib.Path(environment["CCACHE_DIR"]).name == "ccache"
+    assert environment["CCACHE_MAXSIZE"] == "1G"
+    assert environment["CCACHE_NOHASHDIR"] == "1"
+    assert environment["CCACHE_BASEDIR"] == (tmp_path / "project").resolve().as_posix()
+
+    launcher = compiler_cache.launcher()
+    assert launcher[1:3] == ["-E", "env"]
+    assert launcher[-1] == ccache.as_posix()
+    assert compiler_cache.stats() == (4, 2)
+
+
+def test_sccache_foreign_server(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    tools_directory = tmp_path / "bin"
+    stats = {**SCCACHE_STATS, "cache_location": f'Local disk: "{(tmp_path / "foreign").as_posix()}"'}
+    _write_fake_tool(tools_directory, "sccache", json.dumps(stats))
+    monkeypatch.setenv("PATH", tools_directory.as_posix())
+
+    compiler_cache = _CompilerCache.find(_resolved_config(tmp_path, "sccache"))
+    assert compiler_cache is not None
+
+    with pytest.warns(UserWarning, match="sccache --stop-server"):
+        assert compiler_cache.stats() == (4, 2)
+
+
+def test_sccache_own_server(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    tools_directory = tmp_path / "bin"
+    _write_fake_tool(tools_directory, "sccache", "{}")
+    monkeypatch.setenv("PATH", tools_directory.as_posix())
+
+    compiler_cache = _CompilerCache.find(_resolved_config(tmp_path, "sccache"))
+    assert compiler_cache is not None
+
+    stats = {**SCCACHE_STATS, "cache_location": f'Local disk: "{compiler_cache.directory.as_posix()}"'}
+    _write_fake_tool(tools_directory, "sccache", json.dumps(stats))
+
+    # Warnings are turned into errors
+    assert compiler_cache.stats() == (4, 2)
+
+
+def test_parse_ccache_stats() -> None:
+    assert _parse_ccache_stats(CCACHE_STATS) == (4, 2)
+    assert _parse_ccache_stats("cache_hit_direct\t5\ncache_hit_preprocessed\t1\ncache_miss\t0\n") == (6, 0)
+    assert _parse_ccache_stats("unknown option") is None
+
+
+def test_parse_sccache_stats() -> None:
+    assert _parse_sccache_stats(json.dumps(SCCACHE_STATS)) == (4, 2)
+    assert _parse_sccache_stats("{}") is None
+    assert _parse_sccache_stats("not json") is None
+
+
+def test_compiler_cache_stats_difference() -> None:
+    assert _compiler_cache_stats_difference((4, 2), (10, 3)) == (6, 1)
+    assert _compiler_cache_stats_difference((4, 2), (1, 0)) == (0, 0)
+    assert _compiler_cache_stats_difference(None, (1, 0)) is None
+    assert _compiler_cache_stats_difference((4, 2), None) is None
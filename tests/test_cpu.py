@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from charonload._cpu import _cpu_features, _march, _resolve_cpu_target, _x86_64_level
+
+if TYPE_CHECKING:
+    import pathlib
+
+
+_X86_64_V2_FEATURES = frozenset({"fpu", "sse2", "cx16", "lahf_lm", "popcnt", "pni", "sse4_1", "sse4_2", "ssse3"})
+_X86_64_V3_FEATURES = _X86_64_V2_FEATURES | {"abm", "avx", "avx2", "bmi1", "bmi2", "f16c", "fma", "movbe", "xsave"}
+_X86_64_V4_FEATURES = _X86_64_V3_FEATURES | {"avx512bw", "avx512cd", "avx512dq", "avx512f", "avx512vl"}
+
+
+def test_cpu_features_x86_64(tmp_path: pathlib.Path) -> None:
+    cpuinfo_path = tmp_path / "cpuinfo"
+    cpuinfo_path.write_text(
+        "processor\t: 0\nmodel name\t: Test CPU\nflags\t\t: fpu sse2 avx2\n\n"
+        "processor\t: 1\nmodel name\t: Test CPU\nflags\t\t: fpu sse2 avx2\n"
+    )
+
+    assert _cpu_features(cpuinfo_path) == {"fpu", "sse2", "avx2"}
+
+
+def test_cpu_features_aarch64(tmp_path: pathlib.Path) -> None:
+    cpuinfo_path = tmp_path / "cpuinfo"
+    cpuinfo_path.write_text("processor\t: 0\nFeatures\t: fp asimd sve\nCPU implementer\t: 0x41\n")
+
+    assert _cpu_features(cpuinfo_path) == {"fp", "asimd", "sve"}
+
+
+def test_cpu_features_unavailable(tmp_path: pathlib.Path) -> None:
+    assert _cpu_features(tmp_path / "cpuinfo") == frozenset()
+
+
+@pytest.mark.parametrize(
+    ("features", "expected_level"),
+    [
+        (frozenset({"fpu", "sse2"}), 1),
+        (_X86_64_V2_FEATURES, 2),
+        (_X86_64_V3_FEATURES, 3),
+        (_X86_64_V4_FEATURES, 4),
+        (_X86_64_V2_FEATURES | {"avx512f", "avx512bw", "avx512cd", "avx512dq", "avx512vl"}, 2),
+    ],
+)
+def test_x86_64_level(features: frozenset[str], expected_level: int) -> None:
+    assert _x86_64_level(features) == expected_level
+
+
+def test_resolve_explicit() -> None:
+    assert _resolve_cpu_target("x86-64-v2") == "x86-64-v2"
+    assert _resolve_cpu_target("neoverse-v1") == "neoverse-v1"
+
+
+def test_resolve_native(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("platform.machine", lambda: "x86_64")
+    assert _resolve_cpu_target("native", _X86_64_V3_FEATURES) == "x86-64-v3"
+
+    monkeypatch.setattr("platform.machine", lambda: "aarch64")
+    cpu_target = _resolve_cpu_target("native", frozenset({"fp", "asimd"}))
+    assert cpu_target.startswith("native-")
+    assert _resolve_cpu_target("native", frozenset({"fp", "asimd"})) == cpu_target
+    assert _resolve_cpu_target("native", frozenset({"fp", "asimd", "sve"})) != cpu_target
+    assert _march(cpu_target) == "native"
+
+
+def test_march() -> None:
+    assert _march("x86-64-v3") == "x86-64-v3"
+    assert _march("native-0123abcd") == "native"
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import pickle
 from typing import TYPE_CHECKING
 
 import pytest
 
 if TYPE_CHECKING:  # pragma: no cover
+    import pathlib
+
     from charonload._compat.typing import Self
 
 import charonload
@@ -29,3 +32,45 @@ def test_derived_error() -> None:
         raise DerivedError(step_name, log=log)
 
     assert exc_info.type is DerivedError
+
+
+@pytest.mark.parametrize(
+    "error_cls", [charonload.CMakeConfigureError, charonload.BuildError, charonload.StubGenerationError]
+)
+def test_error_pickle(
+    error_cls: type[charonload.CMakeConfigureError | charonload.BuildError | charonload.StubGenerationError],
+    tmp_path: pathlib.Path,
+) -> None:
+    error = error_cls("Some log", tmp_path / "step.log")
+
+    restored_error = pickle.loads(pickle.dumps(error))  # noqa: S301
+
+    assert type(restored_error) is error_cls
+    assert restored_error.step_name == error.step_name
+    assert restored_error.log == error.log
+    assert restored_error.log_file == error.log_file
+    assert str(restored_error) == str(error)
+
+
+def test_error_full_log(tmp_path: pathlib.Path) -> None:
+    log_file = tmp_path / "build.log"
+    log_file.write_text("Full log\nSome log")
+
+    error = charonload.BuildError("Some log", log_file)
+
+    assert error.log == "Some log"
+    assert error.full_log == "Full log\nSome log"
+    assert log_file.as_posix() in str(error)
+
+
+def test_error_full_log_missing_file(tmp_path: pathlib.Path) -> None:
+    error = charonload.BuildError("Some log", tmp_path / "build.log")
+
+    assert error.full_log == "Some log"
+
+
+def test_error_full_log_no_file() -> None:
+    error = charonload.BuildError("Some log")
+
+    assert error.log_file is None
+    assert error.full_log == "Some log"
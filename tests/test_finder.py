@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import contextlib
 import importlib
+import importlib.machinery
 import importlib.util
 import io
+import json
 import multiprocessing
 import os
 import pathlib
@@ -14,7 +17,7 @@ import threading
 import time
 import types
 import warnings
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Literal
 
 import pytest
 import torch
@@ -23,10 +26,19 @@ if TYPE_CHECKING:
     import pytest_mock
 
 import charonload
+from charonload._cpu import _cpu_features
+from charonload._fingerprint import _read_cmake_cache_variable
+from charonload._runner import _StepStatus
 
 VSCODE_STUBS_DIRECTORY = pathlib.Path(__file__).parents[1] / "typings"
 
 
+@pytest.fixture(autouse=True)
+def _disable_artifact_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Builds of previous test runs must not be restored from the artifact cache shared by all build directories
+    monkeypatch.setenv("CHARONLOAD_FORCE_ARTIFACT_CACHE", "0")
+
+
 def is_test_project_installed() -> bool:
     return importlib.util.find_spec("charonload_installed_project") is not None
 
@@ -145,6 +157,140 @@ def test_torch_common_static(shared_datadir: pathlib.Path, tmp_path: pathlib.Pat
     assert torch.equal(t_output, 2 * t_input)
 
 
+def test_torch_precompiled_headers(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    project_directory = shared_datadir / "torch_precompiled_headers"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_torch_precompiled_headers"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+    )
+
+    import test_torch_precompiled_headers as test_torch
+
+    expected_precompiled_headers = 2  # Module and static library need different visibility flags
+    pch_sources = list((build_directory / "charonload" / "torch").glob("charonload_torch_pch_*.cpp"))
+    assert len(pch_sources) == expected_precompiled_headers
+
+    t_input = torch.randint(0, 10, size=(3, 3, 3), dtype=torch.float, device="cpu")
+    t_output = test_torch.two_times(t_input)
+
+    assert t_output.device == t_input.device
+    assert t_output.shape == t_input.shape
+    assert torch.equal(t_output, 2 * t_input)
+
+
+def _unity_sources(build_directory: pathlib.Path, target: str) -> list[pathlib.Path]:
+    return list((build_directory / "CMakeFiles" / f"{target}.dir" / "Unity").glob("unity_*_cxx.cxx"))
+
+
+def test_torch_unity(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    project_directory = shared_datadir / "torch_unity"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_torch_unity"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+    )
+
+    import test_torch_unity as test_torch
+
+    assert len(_unity_sources(build_directory, "torch_unity_static")) == 1
+    assert _unity_sources(build_directory, "test_torch_unity") == []
+    assert _unity_sources(build_directory, "torch_unity_dependency") == []
+
+    t_input = torch.randint(0, 10, size=(3, 3, 3), dtype=torch.float, device="cpu")
+    assert torch.equal(test_torch.two_times(t_input), 2 * t_input)
+    assert torch.equal(test_torch.three_times(t_input), 3 * t_input)
+    assert torch.equal(test_torch.plus_one(t_input), t_input + 1)
+    assert torch.equal(test_torch.plus_two(t_input), t_input + 2)
+
+
+def test_torch_unity_build(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    project_directory = shared_datadir / "torch_unity"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_torch_unity_build"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+        unity_build=True,
+        unity_build_batch_size=1,
+    )
+
+    import test_torch_unity_build as test_torch
+
+    # The patched dependency is still linked with position-independent code, but excluded from the unity build
+    expected_unity_sources = 2
+    assert len(_unity_sources(build_directory, "torch_unity_static")) == expected_unity_sources
+    assert len(_unity_sources(build_directory, "test_torch_unity_build")) == 1
+    assert _unity_sources(build_directory, "torch_unity_dependency") == []
+
+    configure_log = (build_directory / "charonload" / "logs" / "cmake_configure.log").read_text()
+    assert 'Set property POSITION_INDEPENDENT_CODE=ON to target "torch_unity_dependency"' in configure_log
+
+    t_input = torch.randint(0, 10, size=(3, 3, 3), dtype=torch.float, device="cpu")
+    assert torch.equal(test_torch.two_times(t_input), 2 * t_input)
+    assert torch.equal(test_torch.three_times(t_input), 3 * t_input)
+    assert torch.equal(test_torch.plus_one(t_input), t_input + 1)
+    assert torch.equal(test_torch.plus_two(t_input), t_input + 2)
+
+
+def test_torch_isa_dispatch(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    project_directory = shared_datadir / "torch_isa_dispatch"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_torch_isa_dispatch"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+    )
+
+    import test_torch_isa_dispatch as test_torch
+
+    # The instruction sets are only compiled for x86-64 with GCC or Clang
+    cpu_features = _cpu_features()
+    if platform.machine().lower() not in {"x86_64", "amd64"} or platform.system() == "Windows":
+        expected_isa = "baseline"
+    elif not cpu_features:
+        expected_isa = test_torch.selected_isa()
+    elif {"avx512f", "avx512bw", "avx512cd", "avx512dq", "avx512vl"} <= cpu_features:
+        expected_isa = "avx512"
+    elif {"avx2", "fma", "bmi1", "bmi2"} <= cpu_features:
+        expected_isa = "avx2"
+    else:
+        expected_isa = "baseline"
+    assert test_torch.selected_isa() == expected_isa
+
+    t_input = torch.randint(0, 10, size=(3, 3, 3), dtype=torch.float, device="cpu")
+    assert torch.equal(test_torch.two_times(t_input), 2 * t_input)
+
+
+def test_torch_isa_dispatch_baseline(
+    shared_datadir: pathlib.Path, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    project_directory = shared_datadir / "torch_isa_dispatch"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_torch_isa_dispatch_baseline"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+    )
+
+    # The instruction set is selected when the extension is loaded
+    monkeypatch.setenv("CHARONLOAD_ISA_LIMIT", "baseline")
+
+    import test_torch_isa_dispatch_baseline as test_torch
+
+    assert test_torch.selected_isa() == "baseline"
+
+    t_input = torch.randint(0, 10, size=(3, 3, 3), dtype=torch.float, device="cpu")
+    assert torch.equal(test_torch.two_times(t_input), 2 * t_input)
+
+
 def test_torch_common_shared(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
     project_directory = shared_datadir / "torch_common_shared"
     build_directory = tmp_path / "build"
@@ -258,6 +404,52 @@ def test_torch_cxx11_abi(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -
     assert test_torch.numel_to_string_aliased(t_input) == str(t_input.numel())
 
 
+def test_torch_detection_cache(
+    shared_datadir: pathlib.Path, tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture
+) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    mocker.patch("charonload._finder._user_directory", return_value=tmp_path / "user")
+
+    for i in range(2):
+        charonload.module_config[f"test_torch_detection_cache_{i}"] = charonload.Config(
+            project_directory,
+            tmp_path / f"build_{i}",
+            stubs_directory=VSCODE_STUBS_DIRECTORY,
+        )
+
+    import test_torch_detection_cache_0  # noqa: F401
+
+    cache_files = list((tmp_path / "user" / "detection_cache").glob("torch_*.cmake"))
+    assert len(cache_files) == 1
+    assert "CHARONLOAD_TORCH_STANDARD" in cache_files[0].read_text()
+
+    import test_torch_detection_cache_1  # noqa: F401
+
+    configure_log = (tmp_path / "build_1" / "charonload" / "logs" / "cmake_configure.log").read_text()
+    assert "Loaded detection results of Torch from cache" in configure_log
+    assert "Detecting minimum C++ standard for Torch" not in configure_log
+    assert not (tmp_path / "build_1" / "charonload" / "torch").exists()
+
+
+def test_torch_in_process_detection(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_torch_in_process_detection"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+    )
+
+    import test_torch_in_process_detection  # noqa: F401
+
+    configure_log = (build_directory / "charonload" / "logs" / "cmake_configure.log").read_text()
+    assert "Determining prefix paths used for finding dependencies" not in configure_log
+    assert "Detecting CUDA version of Torch" not in configure_log
+    if platform.system() == "Linux":
+        assert "Detecting C++11 ABI version of Torch" not in configure_log
+
+
 def test_torch_pic(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
     project_directory = shared_datadir / "torch_pic"
     build_directory = tmp_path / "build"
@@ -446,7 +638,7 @@ def test_torch_reload_import(shared_datadir: pathlib.Path, tmp_path: pathlib.Pat
     import test_torch_reload_import
 
     new_num_sys_paths = len(sys.path)
-    assert new_num_sys_paths == original_num_sys_paths + 1
+    assert new_num_sys_paths == original_num_sys_paths
 
     importlib.reload(test_torch_reload_import)
 
@@ -461,6 +653,83 @@ def test_torch_reload_import(shared_datadir: pathlib.Path, tmp_path: pathlib.Pat
     assert torch.equal(t_output, 2 * t_input)
 
 
+def test_torch_extension_spec(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_torch_extension_spec"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+    )
+
+    original_sys_path = list(sys.path)
+
+    import test_torch_extension_spec as test_torch
+
+    assert sys.path == original_sys_path
+    assert isinstance(test_torch.__spec__.loader, importlib.machinery.ExtensionFileLoader)
+    assert test_torch.__spec__.origin is not None
+    assert pathlib.Path(test_torch.__spec__.origin).is_relative_to(build_directory)
+
+    t_input = torch.randint(0, 10, size=(3, 3, 3), dtype=torch.float, device="cpu")
+    t_output = test_torch.two_times(t_input)
+
+    assert t_output.device == t_input.device
+    assert t_output.shape == t_input.shape
+    assert torch.equal(t_output, 2 * t_input)
+
+
+def test_torch_warm_import_without_subprocess(
+    shared_datadir: pathlib.Path, tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture
+) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_torch_warm_import_without_subprocess"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+    )
+
+    import test_torch_warm_import_without_subprocess
+
+    popen = mocker.patch("subprocess.Popen")
+    build_lock = mocker.spy(charonload._finder, "_build_lock")  # noqa: SLF001
+
+    importlib.reload(test_torch_warm_import_without_subprocess)
+
+    popen.assert_not_called()
+    assert [c.kwargs["mode"] for c in build_lock.call_args_list] == ["read"]
+
+    t_input = torch.randint(0, 10, size=(3, 3, 3), dtype=torch.float, device="cpu")
+    t_output = test_torch_warm_import_without_subprocess.two_times(t_input)
+
+    assert t_output.device == t_input.device
+    assert t_output.shape == t_input.shape
+    assert torch.equal(t_output, 2 * t_input)
+
+
+def test_torch_warm_import_source_changed(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_torch_warm_import_source_changed"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+    )
+    config = charonload.module_config["test_torch_warm_import_source_changed"]
+
+    import test_torch_warm_import_source_changed  # noqa: F401
+
+    assert charonload._finder._load_up_to_date("test_torch_warm_import_source_changed", config)  # noqa: SLF001
+
+    (project_directory / "two_times_cpu.cpp").touch()
+
+    assert not charonload._finder._load_up_to_date("test_torch_warm_import_source_changed", config)  # noqa: SLF001
+
+
 def _torch_incremental_build_function(
     module_name: str,
     project_directory: pathlib.Path,
@@ -780,11 +1049,14 @@ def test_torch_clean_build_incompatible_version(shared_datadir: pathlib.Path, tm
         stubs_directory=VSCODE_STUBS_DIRECTORY,
     )
 
-    dirty_file = build_directory / "dirty.txt"
+    # Only the state of charonload is dropped, while unrelated files survive
+    dirty_file = build_directory / "charonload" / "dirty.txt"
+    unrelated_file = build_directory / "unrelated.txt"
 
     build_directory.mkdir(parents=True, exist_ok=True)
     (build_directory / "charonload").mkdir(parents=True, exist_ok=True)
     dirty_file.touch()
+    unrelated_file.touch()
     with (build_directory / "charonload" / "version.txt").open("w") as f:
         f.write("0.0")
 
@@ -800,6 +1072,7 @@ def test_torch_clean_build_incompatible_version(shared_datadir: pathlib.Path, tm
     assert torch.equal(t_output, 2 * t_input)
 
     assert not dirty_file.exists()
+    assert unrelated_file.exists()
 
 
 def test_torch_clean_build_incompatible_torch_version(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
@@ -813,11 +1086,14 @@ def test_torch_clean_build_incompatible_torch_version(shared_datadir: pathlib.Pa
     )
     config = charonload.module_config["test_torch_clean_build_incompatible_torch_version"]
 
-    dirty_file = build_directory / "dirty.txt"
+    # Only the objects compiled against the previous version are dropped, while unrelated files survive
+    dirty_file = build_directory / "CMakeFiles" / "dirty.dir" / config.build_type / "dirty.cpp.o"
+    unrelated_file = build_directory / "unrelated.txt"
 
-    build_directory.mkdir(parents=True, exist_ok=True)
+    dirty_file.parent.mkdir(parents=True, exist_ok=True)
     (build_directory / "charonload" / config.build_type).mkdir(parents=True, exist_ok=True)
     dirty_file.touch()
+    unrelated_file.touch()
     with (build_directory / "charonload" / config.build_type / "torch_version.txt").open("w") as f:
         f.write("0.0")
 
@@ -833,6 +1109,7 @@ def test_torch_clean_build_incompatible_torch_version(shared_datadir: pathlib.Pa
     assert torch.equal(t_output, 2 * t_input)
 
     assert not dirty_file.exists()
+    assert unrelated_file.exists()
 
 
 def test_torch_clean_build_configure_failed(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
@@ -1245,6 +1522,712 @@ def test_concurrent_thread_import(shared_datadir: pathlib.Path, tmp_path: pathli
         j.join()
 
 
+def _try_flock(lock_file: pathlib.Path, operation: int) -> bool:
+    import fcntl
+
+    fd = os.open(lock_file, os.O_RDWR)
+    try:
+        fcntl.flock(fd, operation | fcntl.LOCK_NB)
+    except BlockingIOError:
+        return False
+    else:
+        return True
+    finally:
+        os.close(fd)
+
+
+@pytest.mark.skipif(platform.system() == "Windows", reason="Shared build locks require flock")
+def test_build_lock_modes(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    import fcntl
+
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    module_config = charonload.ConfigDict()
+    module_config["test_build_lock_modes"] = charonload.Config(project_directory, build_directory)
+    config = module_config["test_build_lock_modes"]
+
+    lock_file = build_directory / "charonload" / "build.lock"
+    lock_file.parent.mkdir(parents=True)
+
+    with charonload._finder._build_lock("test_build_lock_modes", config, mode="read"):  # noqa: SLF001
+        assert _try_flock(lock_file, fcntl.LOCK_SH)
+        assert not _try_flock(lock_file, fcntl.LOCK_EX)
+
+    with charonload._finder._build_lock("test_build_lock_modes", config, mode="write"):  # noqa: SLF001
+        assert not _try_flock(lock_file, fcntl.LOCK_SH)
+        assert not _try_flock(lock_file, fcntl.LOCK_EX)
+
+    assert _try_flock(lock_file, fcntl.LOCK_EX)
+
+
+def test_build_lock_threads(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    module_config = charonload.ConfigDict()
+    module_config["test_build_lock_threads"] = charonload.Config(project_directory, build_directory)
+    config = module_config["test_build_lock_threads"]
+
+    (build_directory / "charonload").mkdir(parents=True)
+
+    def _try_build_lock(mode: Literal["read", "write"]) -> bool:
+        acquired = threading.Event()
+
+        def _acquire() -> None:
+            with charonload._finder._build_lock("test_build_lock_threads", config, mode=mode):  # noqa: SLF001
+                acquired.set()
+
+        thread = threading.Thread(target=_acquire)
+        thread.start()
+        thread.join(timeout=0.5)
+        return acquired.is_set()
+
+    with charonload._finder._build_lock("test_build_lock_threads", config, mode="read"):  # noqa: SLF001
+        assert _try_build_lock("read")
+
+    with charonload._finder._build_lock("test_build_lock_threads", config, mode="write"):  # noqa: SLF001
+        # The blocked threads finish when the lock is released
+        assert not _try_build_lock("read")
+        assert not _try_build_lock("write")
+
+
+def test_concurrent_follow_failed_build(
+    shared_datadir: pathlib.Path, tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture
+) -> None:
+    project_directory = shared_datadir / "torch_broken_cpp_code"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_concurrent_follow_failed_build"] = charonload.Config(
+        project_directory,
+        build_directory,
+    )
+    config = charonload.module_config["test_concurrent_follow_failed_build"]
+
+    step_run = mocker.spy(charonload._finder._JITCompileStep, "run")  # noqa: SLF001
+    errors: list[Exception] = []
+
+    def _follower() -> None:
+        try:
+            charonload._finder._load("test_concurrent_follow_failed_build", config)  # noqa: SLF001
+        except Exception as e:  # noqa: BLE001
+            errors.append(e)
+
+    # Emulate a leader process that fails while the followers wait for the build lock
+    (build_directory / "charonload").mkdir(parents=True)
+    with charonload._finder._build_lock("test_concurrent_follow_failed_build", config, mode="write"):  # noqa: SLF001
+        num = 5
+        jobs = [threading.Thread(target=_follower) for _ in range(num)]
+        for j in jobs:
+            j.start()
+        time.sleep(1.0)
+
+        manifest = charonload._fingerprint._FingerprintManifest(  # noqa: SLF001
+            "test_concurrent_follow_failed_build", config
+        )
+        charonload._fingerprint._BuildResultMarker(config).store_failure(  # noqa: SLF001
+            manifest.compute(external_files=[]), "BuildError", "error: leader failed", build_directory / "build.log"
+        )
+
+    for j in jobs:
+        j.join()
+
+    step_run.assert_not_called()
+    assert len(errors) == num
+    for e in errors:
+        assert type(e) is charonload.BuildError
+        assert e.log == "error: leader failed"
+        assert e.log_file == build_directory / "build.log"
+
+
+def test_build_all(shared_datadir: pathlib.Path, tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture) -> None:
+    module_names = ["test_build_all_cpu", "test_build_all_common_static"]
+    for name, project in zip(module_names, ["torch_cpu", "torch_common_static"], strict=True):
+        charonload.module_config[name] = charonload.Config(
+            shared_datadir / project,
+            tmp_path / name,
+            stubs_directory=VSCODE_STUBS_DIRECTORY,
+        )
+
+    charonload.build_all(module_names, max_workers=2, parallel_jobs=2)
+
+    popen = mocker.patch("subprocess.Popen")
+
+    import test_build_all_common_static
+    import test_build_all_cpu
+
+    popen.assert_not_called()
+
+    t_input = torch.randint(0, 10, size=(3, 3, 3), dtype=torch.float, device="cpu")
+    for test_torch in [test_build_all_cpu, test_build_all_common_static]:
+        t_output = test_torch.two_times(t_input)
+
+        assert t_output.device == t_input.device
+        assert t_output.shape == t_input.shape
+        assert torch.equal(t_output, 2 * t_input)
+
+
+def test_build_all_broken(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    module_names = ["test_build_all_broken_cpp_code", "test_build_all_broken_cpu"]
+    for name, project in zip(module_names, ["torch_broken_cpp_code", "torch_cpu"], strict=True):
+        charonload.module_config[name] = charonload.Config(
+            shared_datadir / project,
+            tmp_path / name,
+            stubs_directory=VSCODE_STUBS_DIRECTORY,
+        )
+
+    with pytest.raises(charonload.BuildError) as exc_info:
+        charonload.build_all(module_names)
+
+    assert exc_info.type is charonload.BuildError
+
+    import test_build_all_broken_cpu  # noqa: F401
+
+
+def test_build_all_not_registered() -> None:
+    with pytest.raises(KeyError) as exc_info:
+        charonload.build_all(["test_build_all_not_registered"])
+
+    assert exc_info.type is KeyError
+
+
+def test_torch_aload(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_torch_aload"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+    )
+
+    async def _main() -> list[types.ModuleType]:
+        return await asyncio.gather(*[charonload.aload("test_torch_aload") for _ in range(3)])
+
+    modules = asyncio.run(_main())
+
+    import test_torch_aload as test_torch
+
+    assert all(m is test_torch for m in modules)
+
+    t_input = torch.randint(0, 10, size=(3, 3, 3), dtype=torch.float, device="cpu")
+    t_output = test_torch.two_times(t_input)
+
+    assert t_output.device == t_input.device
+    assert t_output.shape == t_input.shape
+    assert torch.equal(t_output, 2 * t_input)
+
+
+def test_abuild_all_shared(
+    shared_datadir: pathlib.Path, tmp_path: pathlib.Path, mocker: pytest_mock.MockerFixture
+) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_abuild_all_shared"] = charonload.Config(
+        project_directory,
+        build_directory,
+    )
+
+    def _load_with_progress(*args: Any, **kwargs: Any) -> pathlib.Path:  # noqa: ANN401, ARG001
+        time.sleep(0.5)
+        return build_directory / "test_abuild_all_shared.so"
+
+    load = mocker.patch("charonload._finder._load_with_progress", side_effect=_load_with_progress)
+
+    async def _main() -> None:
+        await asyncio.gather(*[charonload.abuild_all(["test_abuild_all_shared"]) for _ in range(3)])
+
+    asyncio.run(_main())
+
+    load.assert_called_once()
+
+
+def test_aload_not_registered() -> None:
+    with pytest.raises(KeyError) as exc_info:
+        asyncio.run(charonload.aload("test_aload_not_registered"))
+
+    assert exc_info.type is KeyError
+
+
+def test_torch_spans(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_torch_spans"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+    )
+
+    import test_torch_spans  # noqa: F401
+
+    spans = [s for s in charonload.span_recorder.spans if s.module_name == "test_torch_spans"]
+    span_names = [s.name for s in spans]
+
+    assert span_names == [
+        "Lock (read)",
+        "Lock (write)",
+        "Clean",
+        "Initialize",
+        "CMake Configure",
+        "Build",
+        "Stub Generation",
+        "Import Path",
+        "Load",
+    ]
+    assert spans[span_names.index("Clean")].skipped
+    assert not spans[span_names.index("Build")].skipped
+
+    trace = json.loads(charonload.span_recorder.to_chrome_trace())
+    assert {e["name"] for e in trace["traceEvents"] if e["cat"] == "test_torch_spans"} == set(span_names)
+
+
+def test_torch_build_history(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_torch_build_history"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+    )
+
+    import test_torch_build_history  # noqa: F401
+
+    history = charonload.build_history("test_torch_build_history")
+    assert len(history) == 1
+
+    report = history[0]
+    assert report.module_name == "test_torch_build_history"
+    assert report.compile_time > 0.0
+    assert any(e.kind == "compile" and e.source is not None for e in report.entries)
+    assert any(e.kind == "link" for e in report.entries)
+    assert [e.duration for e in report.entries] == sorted((e.duration for e in report.entries), reverse=True)
+    assert report.critical_path
+    assert report.critical_path_time <= report.wall_time + 1e-3
+
+
+@pytest.mark.skipif(platform.system() == "Windows", reason="Fake compiler cache is a shell script")
+def test_torch_compiler_cache(
+    shared_datadir: pathlib.Path,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    tools_directory = tmp_path / "bin"
+    tools_directory.mkdir()
+    ccache = tools_directory / "ccache"
+    ccache.write_text(
+        '#!/bin/sh\nif [ "$1" = "--print-stats" ]; then printf "cache_miss\\t0\\n"; exit 0; fi\n'
+        'mkdir -p "$CCACHE_DIR" && touch "$CCACHE_DIR/used"\nexec "$@"\n'
+    )
+    ccache.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tools_directory.as_posix()}{os.pathsep}{os.environ['PATH']}")
+    mocker.patch("charonload._compiler_cache._user_directory", return_value=tmp_path / "user")
+
+    charonload.module_config["test_torch_compiler_cache"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+        compiler_cache="ccache",
+    )
+
+    import test_torch_compiler_cache  # noqa: F401
+
+    assert (tmp_path / "user" / "compiler_cache" / "ccache" / "used").exists()
+
+    report = charonload.build_history("test_torch_compiler_cache")[-1]
+    assert report.compiler_cache_hits == 0
+    assert report.compiler_cache_misses == 0
+
+
+def test_torch_artifact_cache(
+    shared_datadir: pathlib.Path,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+    mocker: pytest_mock.MockerFixture,
+) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    monkeypatch.setenv("CHARONLOAD_FORCE_ARTIFACT_CACHE", "1")
+    mocker.patch("charonload._artifact_cache._user_directory", return_value=tmp_path / "user")
+
+    charonload.module_config["test_torch_artifact_cache"] = charonload.Config(
+        project_directory,
+        tmp_path / "build_0",
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+    )
+
+    import test_torch_artifact_cache  # noqa: F401
+
+    assert len(list((tmp_path / "user" / "artifacts").iterdir())) == 1
+
+    # Build the same module in a fresh build directory
+    module_config = charonload.ConfigDict()
+    module_config["test_torch_artifact_cache"] = charonload.Config(
+        project_directory,
+        tmp_path / "build_1",
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+    )
+    charonload.span_recorder.clear()
+
+    config = module_config["test_torch_artifact_cache"]
+    full_extension_path = charonload._finder._load("test_torch_artifact_cache", config)  # noqa: SLF001
+
+    assert full_extension_path.is_relative_to(tmp_path / "build_1")
+    assert full_extension_path.exists()
+    assert not any(s.name in {"CMake Configure", "Build"} for s in charonload.span_recorder.spans)
+    assert not (tmp_path / "build_1" / "CMakeCache.txt").exists()
+
+
+@pytest.mark.skipif(platform.system() == "Windows", reason="Linker selection requires GCC or Clang")
+def test_torch_linker(shared_datadir: pathlib.Path, tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_torch_linker"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+        linker="auto",
+        verbose=True,
+    )
+
+    import test_torch_linker  # noqa: F401
+
+    linker = _read_cmake_cache_variable(build_directory, "CHARONLOAD_LINKER_TYPE")
+    assert linker in {"mold", "lld", "default"}
+    if shutil.which("mold") is not None:
+        assert linker == "mold"
+    assert f"[charonload] Linker: {linker}" in capsys.readouterr().out
+
+
+@pytest.mark.skipif(shutil.which("mold") is not None, reason="Requires mold to be not installed")
+def test_torch_linker_not_found(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_torch_linker_not_found"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+        linker="mold",
+    )
+
+    with pytest.raises(charonload.CMakeConfigureError) as exc_info:
+        import test_torch_linker_not_found  # noqa: F401
+
+    assert exc_info.type is charonload.CMakeConfigureError
+    assert exc_info.value.log is not None
+    assert 'Requested linker "mold" is not supported' in exc_info.value.log
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="Split debug information requires GCC or Clang on Linux")
+@pytest.mark.parametrize("split_debug_info", [True, False])
+def test_torch_split_debug_info(
+    shared_datadir: pathlib.Path,
+    tmp_path: pathlib.Path,
+    split_debug_info: bool,  # noqa: FBT001
+) -> None:
+    project_directory = shared_datadir / "torch_common_shared"
+    build_directory = tmp_path / "build"
+
+    module_name = f"test_torch_split_debug_info_{'on' if split_debug_info else 'off'}"
+    charonload.module_config[module_name] = charonload.Config(
+        project_directory,
+        build_directory,
+        build_type="RelWithDebInfo",
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+        split_debug_info=split_debug_info,
+    )
+
+    test_torch = importlib.import_module(module_name)
+
+    dwo_files = list((build_directory / "CMakeFiles").rglob("*.dwo"))
+    assert bool(dwo_files) == split_debug_info
+
+    # The extension is always stripped, but keeps a link to its debug information when split
+    assert test_torch.__file__ is not None
+    extension_path = pathlib.Path(test_torch.__file__)
+    assert b".debug_info" not in extension_path.read_bytes()
+    assert extension_path.with_name(f"{extension_path.name}.debug").exists() == split_debug_info
+
+    t_input = torch.randint(0, 10, size=(3, 3, 3), dtype=torch.float, device="cpu")
+    assert torch.equal(test_torch.two_times(t_input), 2 * t_input)
+
+
+def _torch_pgo_workload(project_directory: pathlib.Path, build_directory: pathlib.Path) -> None:
+    charonload.module_config["test_torch_pgo"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+        pgo="generate",
+    )
+
+    import test_torch_pgo as test_torch
+
+    t_input = torch.randint(0, 10, size=(3, 3, 3), dtype=torch.float, device="cpu")
+    for _ in range(10):
+        assert torch.equal(test_torch.two_times(t_input), 2 * t_input)
+
+
+@pytest.mark.skipif(platform.system() == "Windows", reason="Profile-guided optimization requires GCC or Clang")
+def test_torch_pgo(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    # The profiles are written when the process running the instrumented extension exits
+    p = multiprocessing.get_context("spawn").Process(
+        target=_torch_pgo_workload,
+        args=(project_directory, build_directory),
+    )
+    p.start()
+    p.join()
+    assert p.exitcode == 0
+
+    profile_directories = list((build_directory / "charonload" / "pgo").iterdir())
+    assert len(profile_directories) == 1
+    assert any(f.suffix in {".gcda", ".profraw"} for f in profile_directories[0].iterdir())
+
+    charonload.module_config["test_torch_pgo"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+        clean_build=True,
+        pgo="use",
+    )
+
+    import test_torch_pgo as test_torch
+
+    # Cleaning the optimized build keeps the profiles
+    assert list((build_directory / "charonload" / "pgo").iterdir()) == profile_directories
+
+    configure_log = (build_directory / "charonload" / "logs" / "cmake_configure.log").read_text()
+    assert f"Profile-guided optimization: use ({profile_directories[0].as_posix()})" in configure_log
+
+    t_input = torch.randint(0, 10, size=(3, 3, 3), dtype=torch.float, device="cpu")
+    assert torch.equal(test_torch.two_times(t_input), 2 * t_input)
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="Resolving the host CPU requires /proc/cpuinfo")
+def test_torch_cpu_target(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    charonload.module_config["test_torch_cpu_target"] = charonload.Config(
+        project_directory,
+        build_directory,
+        stubs_directory=VSCODE_STUBS_DIRECTORY,
+        cpu_target="native",
+    )
+
+    import test_torch_cpu_target as test_torch
+
+    # Each CPU target is built side by side in its own directory next to the build directory
+    cpu_target = charonload.module_config["test_torch_cpu_target"].cpu_target
+    assert cpu_target is not None
+    cpu_build_directory = build_directory.with_name(f"{build_directory.name}_cpu_{cpu_target}")
+    assert charonload.module_config["test_torch_cpu_target"].full_build_directory == cpu_build_directory
+
+    configure_log = (cpu_build_directory / "charonload" / "logs" / "cmake_configure.log").read_text()
+    assert "CPU target: " in configure_log
+
+    t_input = torch.randint(0, 10, size=(3, 3, 3), dtype=torch.float, device="cpu")
+    assert torch.equal(test_torch.two_times(t_input), 2 * t_input)
+
+
+def _cmake_configure_cuda_uninitialized(project_directory: pathlib.Path, build_directory: pathlib.Path) -> None:
+    from unittest import mock
+
+    module_config = charonload.ConfigDict()
+    module_config["test_cmake_configure_cuda"] = charonload.Config(
+        project_directory,
+        build_directory,
+    )
+    config = module_config["test_cmake_configure_cuda"]
+
+    # Pretend a CUDA build of torch whose devices must not be queried before the user initializes CUDA
+    os.environ.pop("PYTORCH_NVML_BASED_CUDA_CHECK", None)
+    with (
+        mock.patch.object(torch.version, "cuda", "12.1"),
+        mock.patch("charonload._finder._run_if", return_value=(_StepStatus.SUCCESSFUL, "")) as run_if,
+    ):
+        charonload._finder._CMakeConfigureStep("test_cmake_configure_cuda", config, (1, 1)).run()  # noqa: SLF001
+
+    configure_command_args = run_if.call_args.kwargs["command_args"]
+    assert not any(arg.startswith("-DCHARONLOAD_TORCH_CUDA_VERSION=") for arg in configure_command_args)
+    assert not torch.cuda.is_initialized()  # type: ignore[no-untyped-call]
+
+
+def test_cmake_configure_cuda_uninitialized(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    # Run in a fresh process since other tests may have initialized CUDA already
+    p = multiprocessing.get_context("spawn").Process(
+        target=_cmake_configure_cuda_uninitialized,
+        args=(
+            shared_datadir / "torch_cpu",
+            tmp_path / "build",
+        ),
+    )
+
+    p.start()
+    p.join()
+
+    assert p.exitcode == 0
+
+
+def test_read_cmake_cache_variable(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "CMakeCache.txt").write_text(
+        "// Linker used for targets created by charonload\n"
+        "CHARONLOAD_LINKER_TYPE:INTERNAL=mold\n"
+        "CMAKE_CXX_FLAGS:STRING=-O2 -DVALUE=1\n"
+    )
+
+    assert _read_cmake_cache_variable(tmp_path, "CHARONLOAD_LINKER_TYPE") == "mold"
+    assert _read_cmake_cache_variable(tmp_path, "CMAKE_CXX_FLAGS") == "-O2 -DVALUE=1"
+    assert _read_cmake_cache_variable(tmp_path, "MISSING") is None
+    assert _read_cmake_cache_variable(tmp_path / "missing", "MISSING") is None
+
+
+def test_clean_step_keeps_persistent_files(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    module_config = charonload.ConfigDict()
+    module_config["test_clean_step"] = charonload.Config(
+        project_directory,
+        build_directory,
+        clean_build=True,
+    )
+    config = module_config["test_clean_step"]
+
+    charonload_directory = config.full_build_directory / "charonload"
+    history_path = charonload_directory / config.build_type / "build_history.jsonl"
+    kept_paths = [
+        charonload_directory / "build.lock",
+        history_path,
+        charonload_directory / "pgo" / "key" / "test.gcda",
+    ]
+    removed_paths = [
+        config.full_build_directory / "CMakeFiles" / "test.dir" / "test.cpp.o",
+        config.full_build_directory / "build.ninja",
+        charonload_directory / "logs" / "build.log",
+        charonload_directory / config.build_type / "location.txt",
+    ]
+    for path in [*kept_paths, *removed_paths]:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+
+    step = charonload._finder._CleanStep("test_clean_step", config, (1, 1))  # noqa: SLF001
+    step.run()
+
+    assert step.trash_deletion is not None
+    step.trash_deletion.result()
+
+    assert all(path.exists() for path in kept_paths)
+    assert not any(path.exists() for path in removed_paths)
+    assert not list(step.trash.directory.iterdir())
+
+
+def test_clean_step_torch_version_changed(
+    shared_datadir: pathlib.Path, tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    module_config = charonload.ConfigDict()
+    module_config["test_clean_step"] = charonload.Config(
+        project_directory,
+        build_directory,
+        build_type="Release",
+        verbose=True,
+    )
+    config = module_config["test_clean_step"]
+
+    charonload_directory = config.full_build_directory / "charonload"
+    kept_paths = [
+        config.full_build_directory / "CMakeFiles" / "test.dir" / "Debug" / "test.cpp.o",
+        config.full_build_directory / "build.ninja",
+        config.full_build_directory / ".ninja_deps",
+        charonload_directory / "cmake_configure_passed.txt",
+    ]
+    removed_paths = [
+        config.full_build_directory / "CMakeFiles" / "test.dir" / "Release" / "test.cpp.o",
+        charonload_directory / "cmake_configure_command.txt",
+    ]
+    for path in [*kept_paths, *removed_paths]:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    (config.full_build_directory / "CMakeCache.txt").write_text(
+        "Torch_DIR:PATH=/site-packages/torch/share/cmake/Torch\nCMAKE_CXX_COMPILER:FILEPATH=/usr/bin/c++\n"
+    )
+
+    step = charonload._finder._CleanStep("test_clean_step", config, (1, 1))  # noqa: SLF001
+    step.cache["torch_version"] = "0.0.0"
+    step.run()
+    step.trash.empty().result()
+
+    assert all(path.exists() for path in kept_paths)
+    assert not any(path.exists() for path in removed_paths)
+    assert (config.full_build_directory / "CMakeCache.txt").read_text() == "CMAKE_CXX_COMPILER:FILEPATH=/usr/bin/c++\n"
+    assert step.cache["torch_version"] == torch.__version__
+
+    stdout = capsys.readouterr().out
+    assert "Invalidated:" in stdout
+    assert "1 CMake cache entries" in stdout
+    assert "objects of 1 targets (Release)" in stdout
+    assert f"PyTorch version changed from 0.0.0 to {torch.__version__}" in stdout
+
+
+def test_clean_step_charonload_version_incompatible(
+    shared_datadir: pathlib.Path, tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    project_directory = shared_datadir / "torch_cpu"
+    build_directory = tmp_path / "build"
+
+    module_config = charonload.ConfigDict()
+    module_config["test_clean_step"] = charonload.Config(
+        project_directory,
+        build_directory,
+        verbose=True,
+    )
+    config = module_config["test_clean_step"]
+
+    charonload_directory = config.full_build_directory / "charonload"
+    kept_paths = [
+        config.full_build_directory / "CMakeFiles" / "test.dir" / config.build_type / "test.cpp.o",
+        config.full_build_directory / "build.ninja",
+        charonload_directory / "build.lock",
+        charonload_directory / config.build_type / "build_history.jsonl",
+    ]
+    removed_paths = [
+        charonload_directory / "cmake_configure_command.txt",
+        charonload_directory / "logs" / "build.log",
+        charonload_directory / config.build_type / "location.txt",
+    ]
+    for path in [*kept_paths, *removed_paths]:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    (config.full_build_directory / "CMakeCache.txt").write_text(
+        "CHARONLOAD_LINKER_TYPE:INTERNAL=mold\nCMAKE_CXX_COMPILER:FILEPATH=/usr/bin/c++\n"
+    )
+
+    step = charonload._finder._CleanStep("test_clean_step", config, (1, 1))  # noqa: SLF001
+    step.cache["version"] = "0.0.1"
+    step.run()
+    step.trash.empty().result()
+
+    assert all(path.exists() for path in kept_paths)
+    assert not any(path.exists() for path in removed_paths)
+    assert (config.full_build_directory / "CMakeCache.txt").read_text() == "CMAKE_CXX_COMPILER:FILEPATH=/usr/bin/c++\n"
+
+    stdout = capsys.readouterr().out
+    assert "Invalidated:" in stdout
+    assert "charonload version changed from 0.0.1" in stdout
+
+
 def test_torch_no_stubs(shared_datadir: pathlib.Path, tmp_path: pathlib.Path) -> None:
     project_directory = shared_datadir / "torch_cpu"
     build_directory = tmp_path / "build"
@@ -1528,9 +2511,20 @@ def _get_ordered_charonload_modules() -> list[types.ModuleType]:
         for name in [
             "charonload",
             "charonload._finder",
+            "charonload._build_report",
+            "charonload._compiler_cache",
+            "charonload._pgo",
+            "charonload._artifact_cache",
+            "charonload._fingerprint",
+            "charonload._invalidation",
+            "charonload._jobserver",
             "charonload._persistence",
+            "charonload._remote_cache",
             "charonload._runner",
+            "charonload._telemetry",
+            "charonload._trash",
             "charonload._config",
+            "charonload._cpu",
             "charonload._errors",
             "charonload._compat",
             "charonload._compat.hashlib",
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from charonload._invalidation import (
+    _charonload_invalidation,
+    _object_directories,
+    _remove_cmake_cache_entries,
+    _torch_invalidation,
+)
+
+if TYPE_CHECKING:
+    import pathlib
+
+_CMAKE_CACHE = """\
+# This is the CMakeCache file.
+
+########################
+# EXTERNAL cache entries
+########################
+
+//Path to a program.
+CMAKE_CXX_COMPILER:FILEPATH=/usr/bin/c++
+
+//The directory containing a CMake configuration file for Torch.
+Torch_DIR:PATH=/site-packages/torch/share/cmake/Torch
+
+//Minimum C++ standard required for Torch using cxx_std_{XY}
+CHARONLOAD_TORCH_STANDARD:STRING=17
+
+//Path to a library.
+TORCH_LIBRARY:FILEPATH=/site-packages/torch/lib/libtorch.so
+
+//Linker used for targets created by charonload
+CHARONLOAD_LINKER_TYPE:INTERNAL=mold
+
+########################
+# INTERNAL cache entries
+########################
+
+//ADVANCED property for variable: TORCH_LIBRARY
+TORCH_LIBRARY-ADVANCED:INTERNAL=1
+//Have flag -fuse-ld=mold
+CHARONLOAD_LINKER_MOLD_SUPPORTED:INTERNAL=1
+"""
+
+
+def test_torch_invalidation() -> None:
+    invalidation = _torch_invalidation("2.1.0", "2.2.0", "Release")
+
+    assert "2.1.0" in invalidation.reason
+    assert "2.2.0" in invalidation.reason
+    assert invalidation.object_build_types == ("Release",)
+    assert not invalidation.charonload_state
+
+
+def test_charonload_invalidation() -> None:
+    invalidation = _charonload_invalidation("0.1.0", "0.2.0")
+
+    assert "0.1.0" in invalidation.reason
+    assert "0.2.0" in invalidation.reason
+    assert invalidation.object_build_types == ()
+    assert invalidation.charonload_state
+
+
+def test_remove_cmake_cache_entries_torch(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "CMakeCache.txt").write_text(_CMAKE_CACHE)
+
+    removed_entries = _remove_cmake_cache_entries(
+        tmp_path, _torch_invalidation("1", "2", "Release").cmake_cache_entries
+    )
+
+    assert removed_entries == ["Torch_DIR", "CHARONLOAD_TORCH_STANDARD", "TORCH_LIBRARY"]
+
+    cmake_cache = (tmp_path / "CMakeCache.txt").read_text()
+    assert "CMAKE_CXX_COMPILER:FILEPATH=/usr/bin/c++" in cmake_cache
+    assert "CHARONLOAD_LINKER_TYPE:INTERNAL=mold" in cmake_cache
+    assert "CHARONLOAD_LINKER_MOLD_SUPPORTED:INTERNAL=1" in cmake_cache
+    assert "Torch" not in cmake_cache
+    assert "TORCH" not in cmake_cache
+    assert "cxx_std_{XY}" not in cmake_cache
+
+
+def test_remove_cmake_cache_entries_charonload(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "CMakeCache.txt").write_text(_CMAKE_CACHE)
+
+    removed_entries = _remove_cmake_cache_entries(tmp_path, _charonload_invalidation("1", "2").cmake_cache_entries)
+
+    assert removed_entries == [
+        "CHARONLOAD_TORCH_STANDARD",
+        "CHARONLOAD_LINKER_TYPE",
+        "CHARONLOAD_LINKER_MOLD_SUPPORTED",
+    ]
+
+    cmake_cache = (tmp_path / "CMakeCache.txt").read_text()
+    assert "Torch_DIR:PATH=/site-packages/torch/share/cmake/Torch" in cmake_cache
+    assert "CHARONLOAD" not in cmake_cache
+    assert "charonload" not in cmake_cache
+
+
+def test_remove_cmake_cache_entries_none(tmp_path: pathlib.Path) -> None:
+    (tmp_path / "CMakeCache.txt").write_text(_CMAKE_CACHE)
+
+    assert _remove_cmake_cache_entries(tmp_path, ("MISSING_*",)) == []
+    assert (tmp_path / "CMakeCache.txt").read_text() == _CMAKE_CACHE
+
+
+def test_remove_cmake_cache_entries_missing(tmp_path: pathlib.Path) -> None:
+    assert _remove_cmake_cache_entries(tmp_path, ("TORCH_*",)) == []
+    assert not (tmp_path / "CMakeCache.txt").exists()
+
+
+def test_object_directories(tmp_path: pathlib.Path) -> None:
+    for directory in [
+        tmp_path / "CMakeFiles" / "test.dir" / "Release",
+        tmp_path / "CMakeFiles" / "test.dir" / "Debug",
+        tmp_path / "subdirectory" / "CMakeFiles" / "other.dir" / "Release",
+        tmp_path / "CMakeFiles" / "pch.dir" / "Debug",
+        tmp_path / "unrelated.dir" / "Release",
+    ]:
+        directory.mkdir(parents=True)
+
+    assert _object_directories(tmp_path, "Release") == [
+        tmp_path / "CMakeFiles" / "test.dir" / "Release",
+        tmp_path / "subdirectory" / "CMakeFiles" / "other.dir" / "Release",
+    ]
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pathlib
+
+import pytest
+
+from charonload._jobserver import _JobServer
+
+
+def test_acquire_partial(tmp_path: pathlib.Path) -> None:
+    max_jobs = 4
+    job_server = _JobServer(max_jobs, directory=tmp_path)
+
+    with job_server.acquire(max_jobs - 1) as jobs_1:
+        assert jobs_1 == max_jobs - 1
+        with job_server.acquire(2 * max_jobs) as jobs_2:
+            assert jobs_2 == 1
+
+    with job_server.acquire(2 * max_jobs) as jobs:
+        assert jobs == max_jobs
+
+
+def test_acquire_blocks_until_released(tmp_path: pathlib.Path) -> None:
+    job_server = _JobServer(1, directory=tmp_path)
+    acquired = threading.Event()
+
+    def _acquire() -> None:
+        with job_server.acquire(1, poll_interval=0.01) as jobs:
+            assert jobs == 1
+            acquired.set()
+
+    with job_server.acquire(1):
+        thread = threading.Thread(target=_acquire)
+        thread.start()
+        time.sleep(0.2)
+        assert not acquired.is_set()
+
+    thread.join(timeout=10)
+    assert acquired.is_set()
+
+
+def test_invalid_max_jobs(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(ValueError) as exc_info:
+        _JobServer(0, directory=tmp_path)
+
+    assert exc_info.type is ValueError
+
+
+def test_shared_pool_size(tmp_path: pathlib.Path) -> None:
+    small_max_jobs = 2
+    large_max_jobs = 4
+    small_job_server = _JobServer(small_max_jobs, directory=tmp_path)
+    large_job_server = _JobServer(large_max_jobs, directory=tmp_path)
+    acquired = threading.Event()
+
+    def _acquire() -> None:
+        with large_job_server.acquire(large_max_jobs, poll_interval=0.01) as jobs:
+            assert jobs == large_max_jobs
+            acquired.set()
+
+    with small_job_server.acquire(small_max_jobs) as jobs:
+        assert jobs == small_max_jobs
+        thread = threading.Thread(target=_acquire)
+        thread.start()
+        time.sleep(0.2)
+        assert not acquired.is_set()
+
+    thread.join(timeout=10)
+    assert acquired.is_set()
+
+    # The pool has been resized while being idle and keeps its size while being in use
+    with large_job_server.acquire(large_max_jobs - 1) as jobs_1:
+        assert jobs_1 == large_max_jobs - 1
+        with small_job_server.acquire(small_max_jobs) as jobs_2:
+            assert jobs_2 == 1
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import charonload
+from charonload._fingerprint import _FingerprintManifest
+from charonload._pgo import _has_profiles, _ProfileStore
+
+if TYPE_CHECKING:
+    import pathlib
+
+
+def _write_project(project_directory: pathlib.Path) -> None:
+    project_directory.mkdir(parents=True, exist_ok=True)
+    (project_directory / "CMakeLists.txt").write_text("project(test LANGUAGES CXX)\n")
+    (project_directory / "test.cpp").write_text("int test() { return 0; }\n")
+
+
+def _resolved_config(
+    project_directory: pathlib.Path, build_directory: pathlib.Path, *, pgo: str | None
+) -> charonload.ResolvedConfig:
+    module_config = charonload.ConfigDict()
+    module_config["test"] = charonload.Config(
+        project_directory,
+        build_directory,
+        pgo=pgo,
+    )
+    return module_config["test"]
+
+
+def test_generate_build_directory(tmp_path: pathlib.Path) -> None:
+    _write_project(tmp_path / "project")
+
+    generate_config = _resolved_config(tmp_path / "project", tmp_path / "build", pgo="generate")
+    use_config = _resolved_config(tmp_path / "project", tmp_path / "build", pgo="use")
+
+    assert generate_config.full_build_directory == (tmp_path / "build_pgo_generate").resolve()
+    assert use_config.full_build_directory == (tmp_path / "build").resolve()
+
+    # Cleaning either variant must not remove the other one
+    assert use_config.full_build_directory not in generate_config.full_build_directory.parents
+
+
+def test_shared_profile_directory(tmp_path: pathlib.Path) -> None:
+    _write_project(tmp_path / "project")
+
+    # The build directory is part of the project, but must not influence the key
+    build_directory = tmp_path / "project" / "build"
+    generate_config = _resolved_config(tmp_path / "project", build_directory, pgo="generate")
+    (generate_config.full_build_directory / "build.ninja").parent.mkdir(parents=True)
+    (generate_config.full_build_directory / "build.ninja").write_text("")
+    use_config = _resolved_config(tmp_path / "project", build_directory, pgo="use")
+
+    generate_store = _ProfileStore("test", generate_config)
+    use_store = _ProfileStore("test", use_config)
+
+    assert generate_store.directory == use_store.directory
+    assert generate_store.profile_directory() == use_store.profile_directory()
+    assert generate_store.profile_directory().parent == use_config.full_build_directory / "charonload" / "pgo"
+
+
+def test_profile_directory_changed_content(tmp_path: pathlib.Path) -> None:
+    _write_project(tmp_path / "project")
+    config = _resolved_config(tmp_path / "project", tmp_path / "build", pgo="use")
+
+    profile_directory = _ProfileStore("test", config).profile_directory()
+
+    (tmp_path / "project" / "test.cpp").write_text("int test() { return 1; }\n")
+
+    assert _ProfileStore("test", config).profile_directory() != profile_directory
+
+
+def test_remove_stale(tmp_path: pathlib.Path) -> None:
+    _write_project(tmp_path / "project")
+    config = _resolved_config(tmp_path / "project", tmp_path / "build", pgo="generate")
+    profile_store = _ProfileStore("test", config)
+
+    stale_profile_directory = profile_store.profile_directory()
+    stale_profile_directory.mkdir(parents=True)
+    (stale_profile_directory / "test.gcda").write_bytes(b"\0")
+
+    (tmp_path / "project" / "test.cpp").write_text("int test() { return 1; }\n")
+    profile_directory = profile_store.profile_directory()
+    profile_directory.mkdir(parents=True)
+
+    profile_store.remove_stale(profile_directory)
+
+    assert not stale_profile_directory.exists()
+    assert profile_directory.exists()
+
+
+def test_has_profiles(tmp_path: pathlib.Path) -> None:
+    profile_directory = tmp_path / "profiles"
+    assert not _has_profiles(profile_directory)
+
+    profile_directory.mkdir()
+    assert not _has_profiles(profile_directory)
+
+    (profile_directory / "CMakeFiles#test.dir#RelWithDebInfo#test.cpp.gcda").write_bytes(b"\0")
+    assert _has_profiles(profile_directory)
+
+
+def test_fingerprint_profiles_recorded_after_use(tmp_path: pathlib.Path) -> None:
+    _write_project(tmp_path / "project")
+    use_config = _resolved_config(tmp_path / "project", tmp_path / "build", pgo="use")
+    generate_config = _resolved_config(tmp_path / "project", tmp_path / "build", pgo="generate")
+
+    # Optimized build without any profiles
+    manifest = _FingerprintManifest("test", use_config)
+    fingerprint = manifest.compute()
+
+    # Profiles of the instrumented extension appear afterwards
+    profile_directory = _ProfileStore("test", generate_config).profile_directory()
+    profile_directory.mkdir(parents=True)
+    (profile_directory / "CMakeFiles#test.dir#RelWithDebInfo#test.cpp.gcda").write_bytes(b"\0")
+
+    assert manifest.compute() != fingerprint
+
+
+def test_fingerprint_merged_profiles(tmp_path: pathlib.Path) -> None:
+    _write_project(tmp_path / "project")
+    config = _resolved_config(tmp_path / "project", tmp_path / "build", pgo="use")
+
+    profile_directory = _ProfileStore("test", config).profile_directory()
+    profile_directory.mkdir(parents=True)
+    (profile_directory / "default.profraw").write_bytes(b"\0")
+
+    manifest = _FingerprintManifest("test", config)
+    fingerprint = manifest.compute()
+
+    # Merging the raw profiles is part of the optimized build itself
+    (profile_directory / "merged.profdata").write_bytes(b"\0")
+
+    assert manifest.compute() == fingerprint
+
+
+def test_fingerprint_profiles_ignored_without_use(tmp_path: pathlib.Path) -> None:
+    _write_project(tmp_path / "project")
+    config = _resolved_config(tmp_path / "project", tmp_path / "build", pgo=None)
+
+    manifest = _FingerprintManifest("test", config)
+    fingerprint = manifest.compute()
+
+    profile_directory = _ProfileStore("test", config).profile_directory()
+    profile_directory.mkdir(parents=True)
+    (profile_directory / "default.profraw").write_bytes(b"\0")
+
+    assert manifest.compute() == fingerprint
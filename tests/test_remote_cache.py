@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import hashlib
+import http.server
+import io
+import socket
+import subprocess
+import sys
+import tarfile
+import textwrap
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+import charonload
+from charonload._artifact_cache import _ArtifactCache, _ArtifactKey
+from charonload._remote_cache import (
+    _decode_action_result,
+    _encode_action_result,
+    _RemoteArtifactCache,
+)
+
+if TYPE_CHECKING:
+    import pathlib
+    from collections.abc import Iterator
+
+
+class _CacheServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self: _CacheServer) -> None:
+        super().__init__(("127.0.0.1", 0), _CacheRequestHandler)
+        self.blobs: dict[str, bytes] = {}
+        self.connections = 0
+        self.authorization: str | None = None
+        self.drop_connections = False
+
+    @property
+    def url(self: _CacheServer) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/cache"
+
+
+class _CacheRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _CacheServer
+
+    def setup(self: _CacheRequestHandler) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def handle_one_request(self: _CacheRequestHandler) -> None:
+        super().handle_one_request()
+
+        # Emulate servers which close idle keep-alive connections without notice
+        if self.server.drop_connections:
+            self.close_connection = True
+
+    def do_GET(self: _CacheRequestHandler) -> None:
+        self.server.authorization = self.headers.get("Authorization")
+        blob = self.server.blobs.get(self.path)
+        if blob is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(blob)))
+        self.end_headers()
+        self.wfile.write(blob)
+
+    def do_PUT(self: _CacheRequestHandler) -> None:
+        self.server.blobs[self.path] = self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self: _CacheRequestHandler, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def cache_server() -> Iterator[_CacheServer]:
+    server = _CacheServer()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _stored_entry(tmp_path: pathlib.Path, artifact_cache: _ArtifactCache) -> str:
+    project_directory = tmp_path / "project"
+    project_directory.mkdir()
+    (project_directory / "CMakeLists.txt").write_text("project(test LANGUAGES CXX)\n")
+
+    module_config = charonload.ConfigDict()
+    module_config["test"] = charonload.Config(project_directory, tmp_path / "build")
+    config = module_config["test"]
+
+    full_extension_path = config.full_build_directory / "test.cpython.so"
+    full_extension_path.parent.mkdir(parents=True)
+    full_extension_path.write_bytes(b"\0" * 1024)
+
+    key = _ArtifactKey("test", config).compute()
+    assert artifact_cache.store(
+        key, "test", config, full_extension_path=full_extension_path, windows_dll_directories="", external_files=[]
+    )
+    return key
+
+
+def _put_archive(cache_server: _CacheServer, key: str, archive: bytes) -> None:
+    digest = hashlib.sha256(archive).hexdigest()
+    cache_server.blobs[f"/cache/cas/{digest}"] = archive
+    cache_server.blobs[f"/cache/ac/{key}"] = _encode_action_result((digest, len(archive)))
+
+
+def _unused_url() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}/cache"
+
+
+def test_push_fetch(tmp_path: pathlib.Path, cache_server: _CacheServer) -> None:
+    artifact_cache = _ArtifactCache(1024**2, directory=tmp_path / "artifacts")
+    key = _stored_entry(tmp_path, artifact_cache)
+
+    remote_artifact_cache = _RemoteArtifactCache(cache_server.url)
+    assert remote_artifact_cache.push(key, artifact_cache).result()
+
+    # The archive is stored by its own digest and referenced by the key
+    digest = _decode_action_result(cache_server.blobs[f"/cache/ac/{key}"])
+    assert digest is not None
+    archive = cache_server.blobs[f"/cache/cas/{digest[0]}"]
+    assert digest == (hashlib.sha256(archive).hexdigest(), len(archive))
+
+    other_artifact_cache = _ArtifactCache(1024**2, directory=tmp_path / "other_artifacts")
+    assert remote_artifact_cache.fetch(key, other_artifact_cache)
+    assert (other_artifact_cache.directory / key / "entry.json").exists()
+    assert (other_artifact_cache.directory / key / "test.cpython.so").read_bytes() == b"\0" * 1024
+
+    # Only the entry itself is left behind
+    assert [p.name for p in other_artifact_cache.directory.iterdir()] == [key]
+
+
+def test_exit_during_push(tmp_path: pathlib.Path) -> None:
+    # Emulate an upload to a server which stalls
+    script = textwrap.dedent(
+        f"""
+        import pathlib
+        import time
+
+        from charonload._artifact_cache import _ArtifactCache
+        from charonload._remote_cache import _RemoteArtifactCache
+
+        def _stalled_push(self, key, artifact_cache):
+            time.sleep(60.0)
+            return True
+
+        _RemoteArtifactCache._push = _stalled_push
+        _RemoteArtifactCache.exit_timeout = 1.0
+
+        artifact_cache = _ArtifactCache(1024**2, directory=pathlib.Path({str(tmp_path / "artifacts")!r}))
+        _RemoteArtifactCache("http://127.0.0.1:1/cache").push("key", artifact_cache)
+        """
+    )
+
+    t_start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", script], check=True, timeout=30.0)  # noqa: S603
+    t_end = time.perf_counter()
+
+    max_exit_time = 20.0
+    assert t_end - t_start < max_exit_time
+
+
+def test_fetch_missing(tmp_path: pathlib.Path, cache_server: _CacheServer) -> None:
+    artifact_cache = _ArtifactCache(1024**2, directory=tmp_path / "artifacts")
+
+    assert not _RemoteArtifactCache(cache_server.url).fetch("0" * 64, artifact_cache)
+    assert list(artifact_cache.directory.iterdir()) == []
+
+
+def test_connection_reuse(tmp_path: pathlib.Path, cache_server: _CacheServer) -> None:
+    artifact_cache = _ArtifactCache(1024**2, directory=tmp_path / "artifacts")
+    remote_artifact_cache = _RemoteArtifactCache(cache_server.url)
+
+    requests = 5
+    for i in range(requests):
+        assert not remote_artifact_cache.fetch(f"{i}" * 64, artifact_cache)
+
+    assert cache_server.connections == 1
+
+
+def test_dropped_connection(tmp_path: pathlib.Path, cache_server: _CacheServer) -> None:
+    artifact_cache = _ArtifactCache(1024**2, directory=tmp_path / "artifacts")
+    key = _stored_entry(tmp_path, artifact_cache)
+    remote_artifact_cache = _RemoteArtifactCache(cache_server.url)
+
+    cache_server.drop_connections = True
+    assert remote_artifact_cache.push(key, artifact_cache).result()
+    assert remote_artifact_cache.push(key, artifact_cache).result()
+
+    # Each push uploads the archive and the reference to it
+    expected_connections = 4
+    assert cache_server.connections == expected_connections
+
+
+def test_authorization(tmp_path: pathlib.Path, cache_server: _CacheServer) -> None:
+    artifact_cache = _ArtifactCache(1024**2, directory=tmp_path / "artifacts")
+    url = cache_server.url.replace("http://", "http://user:p%40ss@")
+
+    assert not _RemoteArtifactCache(url).fetch("0" * 64, artifact_cache)
+    assert cache_server.authorization == "Basic dXNlcjpwQHNz"
+
+
+def test_unavailable(tmp_path: pathlib.Path) -> None:
+    artifact_cache = _ArtifactCache(1024**2, directory=tmp_path / "artifacts")
+    key = _stored_entry(tmp_path, artifact_cache)
+
+    remote_artifact_cache = _RemoteArtifactCache(_unused_url())
+
+    assert not remote_artifact_cache.fetch("0" * 64, artifact_cache)
+    assert not remote_artifact_cache.push(key, artifact_cache).result()
+
+
+def test_fetch_invalid_archive(tmp_path: pathlib.Path, cache_server: _CacheServer) -> None:
+    artifact_cache = _ArtifactCache(1024**2, directory=tmp_path / "artifacts")
+
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w") as tar:
+        content = b"{}"
+        info = tarfile.TarInfo("../entry.json")
+        info.size = len(content)
+        tar.addfile(info, io.BytesIO(content))
+
+    key = "0" * 64
+    _put_archive(cache_server, key, archive.getvalue())
+
+    assert not _RemoteArtifactCache(cache_server.url).fetch(key, artifact_cache)
+    assert list(artifact_cache.directory.iterdir()) == []
+    assert not (tmp_path / "entry.json").exists()
+
+
+def test_fetch_corrupted_archive(tmp_path: pathlib.Path, cache_server: _CacheServer) -> None:
+    artifact_cache = _ArtifactCache(1024**2, directory=tmp_path / "artifacts")
+    key = _stored_entry(tmp_path, artifact_cache)
+
+    remote_artifact_cache = _RemoteArtifactCache(cache_server.url)
+    assert remote_artifact_cache.push(key, artifact_cache).result()
+
+    digest = _decode_action_result(cache_server.blobs[f"/cache/ac/{key}"])
+    assert digest is not None
+    archive = cache_server.blobs[f"/cache/cas/{digest[0]}"]
+    cache_server.blobs[f"/cache/cas/{digest[0]}"] = archive[:-1] + b"\1"
+
+    other_artifact_cache = _ArtifactCache(1024**2, directory=tmp_path / "other_artifacts")
+    assert not remote_artifact_cache.fetch(key, other_artifact_cache)
+    assert list(other_artifact_cache.directory.iterdir()) == []
+
+
+def test_fetch_missing_archive(tmp_path: pathlib.Path, cache_server: _CacheServer) -> None:
+    artifact_cache = _ArtifactCache(1024**2, directory=tmp_path / "artifacts")
+
+    key = "0" * 64
+    _put_archive(cache_server, key, b"")
+    del cache_server.blobs[f"/cache/cas/{hashlib.sha256(b'').hexdigest()}"]
+
+    assert not _RemoteArtifactCache(cache_server.url).fetch(key, artifact_cache)
+
+
+def test_action_result() -> None:
+    digest = (hashlib.sha256(b"archive").hexdigest(), 2**40)
+
+    assert _decode_action_result(_encode_action_result(digest)) == digest
+    assert _decode_action_result(b"") is None
+    assert _decode_action_result(b"invalid") is None
+    assert _decode_action_result(_encode_action_result(digest)[:-1]) is None
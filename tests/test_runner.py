@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import platform
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    import pathlib
+
+    import pytest_mock
+
+    from charonload._compat.typing import Self
+
+from charonload._runner import (
+    _AsyncioProcess,
+    _event_loop,
+    _pump_output,
+    _run,
+    _StepStatus,
+    _TailBuffer,
+)
+
+
+class _ChunkedProcess:
+    def __init__(self: Self, chunks: list[bytes]) -> None:
+        self._chunks = chunks
+
+    def read(self: Self, n: int) -> bytes:
+        return self._chunks.pop(0)[:n] if self._chunks else b""
+
+
+def test_run_output() -> None:
+    status, log = _run(
+        command_args=[sys.executable, "-c", "print('first line'); print('second line')"],
+        verbose=False,
+    )
+
+    assert status == _StepStatus.SUCCESSFUL
+    assert log == "first line\nsecond line\n"
+
+
+def test_run_failed() -> None:
+    status, log = _run(
+        command_args=[sys.executable, "-c", "import sys; print('error'); sys.exit(1)"],
+        verbose=False,
+    )
+
+    assert status == _StepStatus.FAILED
+    assert log == "error\n"
+
+
+@pytest.mark.skipif(platform.system() == "Windows", reason="pty only supported on Unix")
+def test_run_output_tty(capfd: pytest.CaptureFixture[str], mocker: pytest_mock.MockerFixture) -> None:
+    mocker.patch("sys.stdout.isatty", return_value=True)
+
+    status, log = _run(
+        command_args=[sys.executable, "-c", "print('first line'); print('second line')"],
+        verbose=True,
+    )
+
+    assert status == _StepStatus.SUCCESSFUL
+    assert log is None
+    assert capfd.readouterr().out.endswith("first line\nsecond line\n")
+
+
+def test_pump_output_split_chunks() -> None:
+    text = "überprüfen\r\nline\r\n"
+    data = text.encode("utf-8")
+    chunks = [data[i : i + 1] for i in range(len(data))]
+
+    output = io.StringIO()
+    _pump_output(process=_ChunkedProcess(chunks), encoding="utf-8", output_streams=[output])  # type: ignore[arg-type]
+
+    assert output.getvalue() == "überprüfen\nline\n"
+
+
+def test_run_log_file(tmp_path: pathlib.Path) -> None:
+    log_file = tmp_path / "logs" / "step.log"
+    num_lines = 100000
+
+    status, log = _run(
+        command_args=[sys.executable, "-c", f"[print(f'line {{i}}') for i in range({num_lines})]"],
+        verbose=False,
+        log_file=log_file,
+    )
+
+    assert status == _StepStatus.SUCCESSFUL
+    assert log is not None
+    assert log.endswith(f"line {num_lines - 1}\n")
+    assert len(log) <= _TailBuffer().max_size
+    assert log_file.read_text().splitlines() == [f"line {i}" for i in range(num_lines)]
+
+
+def test_tail_buffer() -> None:
+    max_size = 10
+    buffer = _TailBuffer(max_size)
+
+    for i in range(100):
+        buffer.write(f"{i},")
+
+    assert buffer.getvalue() == "5,96,97,98,99,"[-max_size:]
+
+
+def test_run_event_loop(mocker: pytest_mock.MockerFixture) -> None:
+    read = mocker.spy(_AsyncioProcess, "read")
+
+    async def _main() -> tuple[tuple[_StepStatus, str | None], int]:
+        ticks = 0
+
+        async def _tick() -> None:
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(_tick())
+        _event_loop.set(asyncio.get_running_loop())
+        result = await asyncio.to_thread(
+            _run,
+            command_args=[
+                sys.executable,
+                "-c",
+                "import time; print('first line'); time.sleep(1); print('second line')",
+            ],
+            verbose=False,
+        )
+        ticker.cancel()
+        return result, ticks
+
+    (status, log), ticks = asyncio.run(_main())
+
+    assert status == _StepStatus.SUCCESSFUL
+    assert log == "first line\nsecond line\n"
+    assert read.call_count > 0
+    expected_minimum_ticks = 10
+    assert ticks > expected_minimum_ticks
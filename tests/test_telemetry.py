@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pathlib
+
+import charonload
+
+
+def test_record_span() -> None:
+    recorder = charonload.SpanRecorder()
+
+    with recorder._record("test_record_span", "Step") as span:  # noqa: SLF001
+        subprocess.run([sys.executable, "-c", "sum(range(10**6))"], check=True)
+        span.skipped = True
+
+    assert len(recorder.spans) == 1
+    recorded_span = recorder.spans[0]
+    assert recorded_span.module_name == "test_record_span"
+    assert recorded_span.name == "Step"
+    assert recorded_span.wall_time > 0.0
+    assert recorded_span.skipped
+    if sys.platform != "win32":
+        assert recorded_span.child_cpu_time is not None
+        assert recorded_span.child_cpu_time > 0.0
+        assert recorded_span.child_max_rss is not None
+        assert recorded_span.child_max_rss > 0
+
+    recorder.clear()
+
+    assert len(recorder.spans) == 0
+
+
+def test_export_json(tmp_path: pathlib.Path) -> None:
+    recorder = charonload.SpanRecorder()
+    for name in ["First", "Second"]:
+        with recorder._record("test_export_json", name):  # noqa: SLF001
+            pass
+
+    file = tmp_path / "spans.json"
+    recorder.export_json(file)
+    spans = json.loads(file.read_text())
+
+    assert [s["name"] for s in spans] == ["First", "Second"]
+    assert all(s["module_name"] == "test_export_json" for s in spans)
+    assert all(not s["skipped"] for s in spans)
+
+
+def test_export_chrome_trace(tmp_path: pathlib.Path) -> None:
+    recorder = charonload.SpanRecorder()
+    with (
+        recorder._record("test_export_chrome_trace", "Outer"),  # noqa: SLF001
+        recorder._record("test_export_chrome_trace", "Inner"),  # noqa: SLF001
+    ):
+        pass
+
+    file = tmp_path / "trace.json"
+    recorder.export_chrome_trace(file)
+    trace = json.loads(file.read_text())
+
+    events = {e["name"]: e for e in trace["traceEvents"]}
+    assert set(events) == {"Outer", "Inner"}
+    assert all(e["ph"] == "X" for e in events.values())
+    assert events["Outer"]["ts"] <= events["Inner"]["ts"]
+    assert events["Inner"]["ts"] + events["Inner"]["dur"] <= events["Outer"]["ts"] + events["Outer"]["dur"]
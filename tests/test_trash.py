@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+import textwrap
+from typing import TYPE_CHECKING
+
+from charonload._trash import _Trash
+
+if TYPE_CHECKING:
+    import pathlib
+
+
+def _write_tree(directory: pathlib.Path) -> None:
+    (directory / "subdirectory").mkdir(parents=True)
+    (directory / "file.txt").write_text("file")
+    (directory / "subdirectory" / "file.txt").write_text("file")
+
+
+def test_move(tmp_path: pathlib.Path) -> None:
+    _write_tree(tmp_path / "build")
+    trash = _Trash(tmp_path / "trash")
+
+    trash.move(tmp_path / "build")
+
+    assert not (tmp_path / "build").exists()
+    assert len(list(trash.directory.iterdir())) == 1
+
+
+def test_move_missing(tmp_path: pathlib.Path) -> None:
+    trash = _Trash(tmp_path / "trash")
+
+    trash.move(tmp_path / "missing")
+
+    assert not list(trash.directory.iterdir())
+
+
+def test_empty(tmp_path: pathlib.Path) -> None:
+    _write_tree(tmp_path / "build")
+    (tmp_path / "other.txt").write_text("other")
+    trash = _Trash(tmp_path / "trash")
+
+    trash.move(tmp_path / "build")
+    trash.move(tmp_path / "other.txt")
+
+    expected_number_removed_entries = 2
+    assert trash.empty().result() == expected_number_removed_entries
+    assert trash.directory.exists()
+    assert not list(trash.directory.iterdir())
+
+
+def test_empty_stale(tmp_path: pathlib.Path) -> None:
+    # Left behind by a process which exited before finishing the deletion
+    _write_tree(tmp_path / "trash" / "1234.5678.stale")
+    trash = _Trash(tmp_path / "trash")
+
+    assert trash.empty().result() == 1
+    assert not list(trash.directory.iterdir())
+
+
+def test_empty_missing(tmp_path: pathlib.Path) -> None:
+    trash = _Trash(tmp_path / "trash")
+
+    assert trash.empty().result() == 0
+    assert not trash.directory.exists()
+
+
+def test_exit_during_empty(tmp_path: pathlib.Path) -> None:
+    _write_tree(tmp_path / "build")
+
+    # Emulate the deletion of a huge build directory which takes much longer than the remaining script
+    script = textwrap.dedent(
+        f"""
+        import pathlib
+        import time
+
+        import charonload._trash
+
+        def _slow_remove(path):
+            time.sleep(60.0)
+
+        charonload._trash._remove = _slow_remove
+
+        trash = charonload._trash._Trash(pathlib.Path({str(tmp_path / "trash")!r}))
+        trash.move(pathlib.Path({str(tmp_path / "build")!r}))
+        trash.empty()
+        time.sleep(0.5)
+        """
+    )
+
+    subprocess.run([sys.executable, "-c", script], check=True, timeout=30.0)  # noqa: S603
+
+    # The entry is left behind for the next build
+    assert len(list((tmp_path / "trash").iterdir())) == 1
+
+
+def test_empty_without_entries(tmp_path: pathlib.Path) -> None:
+    trash = _Trash(tmp_path / "trash")
+    trash.directory.mkdir()
+
+    future = trash.empty()
+
+    # No deletion is queued
+    assert future.done()
+    assert future.result() == 0
+
+
+def test_empty_in_order(tmp_path: pathlib.Path) -> None:
+    trash = _Trash(tmp_path / "trash")
+    futures = []
+    for i in range(10):
+        _write_tree(tmp_path / f"build_{i}")
+        trash.move(tmp_path / f"build_{i}")
+        futures.append(trash.empty())
+
+    # Deletions are processed one after another, so waiting for the last one also waits for all previous ones
+    futures[-1].result()
+    assert all(f.done() for f in futures)
+    assert not list(trash.directory.iterdir())